@@ -2,39 +2,60 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+from collections.abc import Callable, Iterable, Mapping
+from datetime import datetime, timedelta
 import logging
+from typing import Any
 
-from aiohttp.client_exceptions import ClientResponseError
+from aiohttp import ClientError
 from pyalko import Alko
-from pyalko.exceptions import AlkoAuthenticationException, AlkoException
+from pyalko.exceptions import AlkoException
 from pyalko.objects.device import AlkoDevice
-import async_timeout
 import voluptuous as vol
 
 from homeassistant.const import Platform
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import aiohttp_client, config_entry_oauth2_flow
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers import device_registry as dr
 from homeassistant.util.dt import now as dt_now
 
+from .analytics import async_remove_blade_wear
 from .api import (
     ConfigEntryAlkoClient,
     AlkoLocalOAuth2Implementation,
-    OAuth2SessionAlko
+    OAuth2SessionAlko,
+    is_outage,
 )
 
-from .const import DOMAIN
+from .capture import AlkoTrafficRecorder
+from .const import (
+    CONF_CAPTURE_TRAFFIC,
+    CONF_EXPORT_INTERVAL,
+    CONF_HEDGE_REQUESTS,
+    DEFAULT_EXPORT_INTERVAL,
+    DOMAIN,
+)
+from .coordinator import AlkoDataUpdateCoordinator
+from .metrics import PHASE_COMMAND
+from .outbox import async_remove_outbox
+from .profiler import async_profile_refresh
+from .sessions import async_remove_sessions
+from .snapshot import AlkoDeviceSnapshot, AlkoEntityDescription
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,6 +69,69 @@ PLATFORMS = [
     Platform.CALENDAR,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+SERVICE_EXPORT_FLEET_STATE = "export_fleet_state"
+EXPORT_FLEET_STATE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("config_entry_id"): cv.string,
+        vol.Optional("compress", default=True): cv.boolean,
+    }
+)
+
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional("config_entry_id"): cv.string,
+        vol.Optional("cycles", default=3): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=20)
+        ),
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the AL-KO integration services."""
+
+    async def async_profile_refresh_service(call: ServiceCall) -> ServiceResponse:
+        """Profile coordinator refreshes of a config entry."""
+        coordinators: dict[str, AlkoDataUpdateCoordinator] = hass.data.get(DOMAIN, {})
+        entry_id = call.data.get("config_entry_id") or next(iter(coordinators), None)
+        if entry_id not in coordinators:
+            raise HomeAssistantError("No loaded AL-KO config entry to profile")
+
+        return await async_profile_refresh(
+            hass, coordinators[entry_id], call.data["cycles"]
+        )
+
+    async def async_export_fleet_state_service(call: ServiceCall) -> ServiceResponse:
+        """Append the state of every device of a config entry to its export."""
+        coordinators: dict[str, AlkoDataUpdateCoordinator] = hass.data.get(DOMAIN, {})
+        entry_id = call.data.get("config_entry_id") or next(iter(coordinators), None)
+        if entry_id not in coordinators:
+            raise HomeAssistantError("No loaded AL-KO config entry to export")
+
+        coordinator = coordinators[entry_id]
+        return await coordinator.exporter.async_export(
+            coordinator.data, dt_now(), call.data["compress"]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_FLEET_STATE,
+        async_export_fleet_state_service,
+        schema=EXPORT_FLEET_STATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        async_profile_refresh_service,
+        schema=PROFILE_REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up ALKO from a config entry."""
@@ -63,35 +147,55 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     session = aiohttp_client.async_get_clientsession(hass)
     oauth_session = OAuth2SessionAlko(hass, entry, implementation)
 
-    client = ConfigEntryAlkoClient(session, oauth_session)
+    recorder = None
+    if entry.options.get(CONF_CAPTURE_TRAFFIC, False):
+        recorder = AlkoTrafficRecorder(hass)
+        _LOGGER.warning("Recording AL-KO cloud traffic to %s", recorder.path)
+        entry.async_on_unload(recorder.async_flush)
+
+    client = ConfigEntryAlkoClient(
+        session,
+        oauth_session,
+        hedge=entry.options.get(CONF_HEDGE_REQUESTS, False),
+        recorder=recorder,
+    )
     client_id = implementation.client_id
     alko = Alko(client, client_id)
 
-    async def async_update_data() -> Alko:
-        """Fetch data from Alko."""
-        try:
-            async with async_timeout.timeout(60):
-                await alko.get_devices()
-                return alko
-        except AlkoAuthenticationException as exception:
-            raise ConfigEntryAuthFailed from exception
-        except (AlkoException, ClientResponseError) as exception:
-            raise UpdateFailed(exception) from exception
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="alko_coordinator",
-        update_method=async_update_data,
-        # Polling interval. Will only be polled if there are subscribers.
-        update_interval=timedelta(seconds=60),
-    )
+    coordinator = AlkoDataUpdateCoordinator(hass, entry, alko, client)
+    await coordinator.outbox.async_load()
+    await coordinator.blade_wear.async_load()
+    entry.async_on_unload(coordinator.blade_wear.async_save)
+    await coordinator.sessions.async_load()
+    entry.async_on_unload(coordinator.sessions.async_save)
 
     # Fetch initial data so we have data when entities subscribe
     await coordinator.async_config_entry_first_refresh()
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(coordinator.async_track_devices())
+    entry.async_on_unload(
+        coordinator.async_add_listener(coordinator.async_schedule_outbox_flush)
+    )
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    export_interval = entry.options.get(CONF_EXPORT_INTERVAL, DEFAULT_EXPORT_INTERVAL)
+    if export_interval:
+
+        async def _async_export(now: datetime) -> None:
+            """Export the fleet state on the configured interval."""
+            await coordinator.exporter.async_export(coordinator.data, now)
+
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass,
+                _async_export,
+                timedelta(minutes=export_interval),
+                name="alko fleet export",
+                cancel_on_shutdown=True,
+            )
+        )
 
     return True
 
@@ -105,50 +209,145 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
-class AlkoEntity(CoordinatorEntity[DataUpdateCoordinator[Alko]]):
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove writes still queued, estimates and sessions of a removed entry."""
+    await async_remove_outbox(hass, entry)
+    await async_remove_blade_wear(hass, entry)
+    await async_remove_sessions(hass, entry)
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change.
+
+    Update listeners also run when a refreshed token is written to the
+    entry data, which must not rebuild the coordinator and its state.
+    """
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if coordinator is not None and coordinator.options == entry.options:
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+@callback
+def async_add_device_entities(
+    coordinator: AlkoDataUpdateCoordinator,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    entity_factory: Callable[[AlkoDeviceSnapshot], Iterable[AlkoEntity]],
+) -> None:
+    """Add entities for current devices and for devices that show up later."""
+    added: set[tuple[str, str]] = set()
+
+    @callback
+    def _async_add_entities(snapshots: Iterable[AlkoDeviceSnapshot]) -> None:
+        entities = []
+        for snapshot in snapshots:
+            for entity in entity_factory(snapshot):
+                if (entity.thing_name, entity.key) not in added:
+                    added.add((entity.thing_name, entity.key))
+                    entities.append(entity)
+        if entities:
+            async_add_entities(entities)
+
+    @callback
+    def _async_forget_device(thing_name: str) -> None:
+        # Let a removed device get its entities again if it comes back
+        added.difference_update(
+            [key for key in added if key[0] == thing_name]
+        )
+
+    _async_add_entities(coordinator.data.values())
+    entry.async_on_unload(
+        coordinator.async_add_device_callback(_async_add_entities)
+    )
+    entry.async_on_unload(
+        coordinator.async_add_removal_callback(_async_forget_device)
+    )
+
+
+class AlkoEntity(CoordinatorEntity[AlkoDataUpdateCoordinator]):
     """Defines a base AL-KO entity."""
 
+    # Keep the entity available while the mower reports it is offline
+    _available_offline = False
+
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator[Alko],
-        device: AlkoDevice,
+        coordinator: AlkoDataUpdateCoordinator,
+        snapshot: AlkoDeviceSnapshot,
         key: str,
         name: str,
     ) -> None:
         """Initialize the AL-KO entity."""
         super().__init__(coordinator)
         self._key = key
-        self._name = name
-        self._device_name = device.thingAttributes.thingName
-        self._device_type = device.thingAttributes.thingType
-        self._device_model = device.thingAttributes.thingModel
-        self._firmware_main = device.thingAttributes.firmwareMain
-        self._hardware_main = device.thingAttributes.hardwareVersionMain
-        self._serial_number = device.thingAttributes.serialNumber
-        self._update_device = coordinator.data.update_device
-
-    def _normalize_model(self, model: str) -> str:
-        """Normalize the device model for use in entity IDs."""
-        # Convert to lowercase and replace spaces with underscores
-        normalized = model.lower().replace(" ", "_")
-        # Remove any special characters except underscores
-        normalized = "".join(c for c in normalized if c.isalnum() or c == "_")
-        return normalized
+        self._thing_name = snapshot.thing_name
+        self._attr_unique_id = f"{snapshot.meta.model_slug}_{key}"
+        self._attr_name = f"{snapshot.meta.model} {name}"
+
+    async def _update_device(self, device: AlkoDevice, **kwargs: Any) -> bool:
+        """Write desired state, queueing it while the device or cloud is down.
+
+        Returns True if the write was sent, False if it was queued.
+        """
+        outbox = self.coordinator.outbox
+        # Writes queue behind earlier ones so they are never applied out of order
+        if not self.snapshot.is_offline and not outbox.has_pending(self._thing_name):
+            metrics = self.coordinator.metrics
+            metrics.commands += 1
+            try:
+                with metrics.time(PHASE_COMMAND):
+                    await self.coordinator.alko.update_device(device, **kwargs)
+            except (AlkoException, ClientError, TimeoutError) as exception:
+                metrics.command_errors += 1
+                if not is_outage(exception):
+                    raise
+                _LOGGER.debug("Writing to %s failed: %s", self._thing_name, exception)
+            else:
+                return True
+        outbox.async_queue(self._thing_name, kwargs)
+        return False
+
+    @property
+    def thing_name(self) -> str:
+        """Return the thing name of the device this entity belongs to."""
+        return self._thing_name
 
     @property
-    def unique_id(self) -> str:
-        """Return the unique ID for this entity."""
-        return f"{self._normalize_model(self._device_model)}_{self._key}"
+    def key(self) -> str:
+        """Return the key of this entity within its device."""
+        return self._key
 
     @property
-    def name(self) -> str:
-        """Return the name of the entity."""
-        return f"{self._device_model} {self._name}"
+    def available(self) -> bool:
+        """Return True if the device is part of the fleet and reachable."""
+        if not super().available or self._thing_name not in self.coordinator.data:
+            return False
+        snapshot = self.snapshot
+        if self.coordinator.is_stale(snapshot):
+            return False
+        return self._available_offline or not snapshot.is_offline
+
+    @property
+    def snapshot(self) -> AlkoDeviceSnapshot:
+        """Get the latest snapshot of the AL-KO device."""
+        return self.coordinator.data[self._thing_name]
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if self._thing_name in self.coordinator.data:
+            self._async_update_from_snapshot(self.snapshot)
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_update_from_snapshot(self, snapshot: AlkoDeviceSnapshot) -> None:
+        """Update cached state from a new snapshot."""
 
     @property
     def device(self) -> AlkoDevice:
         """Get the AL-KO Device."""
-        return self.coordinator.data.devices_dict[self._device_name]
+        return self.snapshot.device
 
 
 class AlkoDeviceEntity(AlkoEntity):
@@ -157,12 +356,31 @@ class AlkoDeviceEntity(AlkoEntity):
     @property
     def device_info(self) -> DeviceInfo:
         """Return device information about this AL-KO instance."""
-        return {
-            "identifiers": {(DOMAIN, self._device_name)},
-            "manufacturer": "AL-KO",
-            "model": self._device_model,
-            "name": self._device_model,
-            "sw_version": self._firmware_main,
-            "hw_version": self._hardware_main,
-            "serial_number": self._serial_number
-        }
+        return self.snapshot.meta.device_info
+
+
+class AlkoDescriptionEntity(AlkoDeviceEntity):
+    """Defines an AL-KO entity backed by an entity description."""
+
+    entity_description: AlkoEntityDescription
+
+    def __init__(
+        self,
+        coordinator: AlkoDataUpdateCoordinator,
+        snapshot: AlkoDeviceSnapshot,
+        description: AlkoEntityDescription,
+    ) -> None:
+        """Initialize the AL-KO description entity."""
+        super().__init__(coordinator, snapshot, description.key, description.name)
+        self.entity_description = description
+        self._available_offline = description.available_offline
+
+    @property
+    def value(self) -> Any:
+        """Return the value precomputed by the coordinator."""
+        return self.snapshot.values.get(self.entity_description.key)
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return the attributes precomputed by the coordinator."""
+        return self.snapshot.attributes.get(self.entity_description.key)
@@ -0,0 +1,288 @@
+"""Incremental estimators derived from the AL-KO telemetry buffers."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import math
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .telemetry import AlkoTelemetryBuffer
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+# Seconds it takes an estimate to mostly follow a change in the rate
+BATTERY_TIME_CONSTANT = 1800
+BLADE_TIME_CONSTANT = 7 * 86400
+
+# Blade usage is measured over windows of at least this many seconds,
+# as the operation time counter only moves in whole hours
+BLADE_WINDOW = 86400
+
+# Samples further apart than this are not used to derive a rate
+MAX_SAMPLE_GAP = 900
+
+STATE_WORKING = "WORKING"
+STATE_CHARGING = "CHARGING"
+
+
+class Ewma:
+    """Exponentially weighted moving average for irregular samples.
+
+    The weight of a sample depends on the time since the previous one,
+    so a missed poll does not skew the average.
+    """
+
+    def __init__(self, time_constant: float) -> None:
+        """Initialize the average."""
+        self.time_constant = time_constant
+        self.value: float | None = None
+
+    def update(self, sample: float, elapsed: float) -> float:
+        """Add a sample taken elapsed seconds after the previous one."""
+        if self.value is None:
+            self.value = sample
+        else:
+            alpha = 1 - math.exp(-elapsed / self.time_constant)
+            self.value += alpha * (sample - self.value)
+        return self.value
+
+
+class AlkoBatteryEstimator:
+    """Learn discharge and charge rates of one mower from its telemetry.
+
+    The battery level is reported in whole percent, so rates are taken
+    between level changes rather than between polls, looking back through
+    the current state in the buffer. The first change after a state change
+    only marks the start of a measurement, as the level may have been
+    about to tick over.
+    """
+
+    def __init__(
+        self,
+        buffer: AlkoTelemetryBuffer,
+        time_constant: float = BATTERY_TIME_CONSTANT,
+    ) -> None:
+        """Initialize the estimator."""
+        self.buffer = buffer
+        self.discharge = Ewma(time_constant)
+        self.charge = Ewma(time_constant)
+        # Time of the sample before the last measured level change, so a
+        # newer sample replacing the newest slot does not count it twice
+        self._measured: float | None = None
+
+    @property
+    def level(self) -> float | None:
+        """Return the newest battery level."""
+        return self.buffer.last("batteryLevel")
+
+    @property
+    def state(self) -> str | None:
+        """Return the newest operation state."""
+        return self.buffer.state
+
+    def update(self) -> None:
+        """Add the rate of a level change in the newest sample of the buffer."""
+        if self.state == STATE_WORKING:
+            average, direction = self.discharge, -1
+        elif self.state == STATE_CHARGING:
+            average, direction = self.charge, 1
+        else:
+            return
+
+        samples = (
+            (timestamp, level)
+            for timestamp, level in self.buffer.run(
+                "batteryLevel", max_gap=MAX_SAMPLE_GAP
+            )
+            if not math.isnan(level)
+        )
+        newest = next(samples, None)
+        previous = next(samples, None)
+        if (
+            newest is None
+            or previous is None
+            or previous[0] == self._measured
+            or (newest[1] - previous[1]) * direction <= 0
+        ):
+            return
+
+        # The previous level has to have started with a change the same
+        # way, a level moving against the state, like a swapped battery,
+        # starts the measurement over
+        anchor = previous
+        for sample in samples:
+            if sample[1] != previous[1]:
+                if (previous[1] - sample[1]) * direction <= 0:
+                    return
+                break
+            anchor = sample
+        else:
+            return
+
+        self._measured = previous[0]
+        elapsed = newest[0] - anchor[0]
+        average.update(abs(newest[1] - anchor[1]) / elapsed * 3600, elapsed)
+
+    @property
+    def discharge_rate(self) -> float | None:
+        """Return the battery use while mowing in percent per hour."""
+        return _rounded(self.discharge.value)
+
+    @property
+    def charge_rate(self) -> float | None:
+        """Return the charge speed in percent per hour."""
+        return _rounded(self.charge.value)
+
+    @property
+    def time_to_full(self) -> float | None:
+        """Return the minutes until the battery is full, while charging."""
+        if self.state != STATE_CHARGING or self.level is None:
+            return None
+        return _minutes(100 - self.level, self.charge.value)
+
+    @property
+    def mowing_time_left(self) -> float | None:
+        """Return the minutes of mowing the current charge allows."""
+        if self.level is None:
+            return None
+        return _minutes(self.level, self.discharge.value)
+
+
+class AlkoBladeEstimator:
+    """Learn the blade usage per day of one mower from its counters.
+
+    Usage is measured over windows of a day or more, which outlast the
+    telemetry buffer, so the start of the current window is kept here
+    and persisted.
+    """
+
+    def __init__(self, time_constant: float = BLADE_TIME_CONSTANT) -> None:
+        """Initialize the estimator."""
+        self.usage = Ewma(time_constant)
+        self.remaining: float | None = None
+        self.last_time: float | None = None
+        # Time and blade operation time at the start of the current window
+        self._window: tuple[float, float] | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> AlkoBladeEstimator:
+        """Restore an estimator saved with as_dict."""
+        estimator = cls()
+        estimator.usage.value = data.get("usage")
+        if window := data.get("window"):
+            estimator._window = (window[0], window[1])
+        return estimator
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state to persist."""
+        return {"usage": self.usage.value, "window": self._window}
+
+    def update(self, buffer: AlkoTelemetryBuffer) -> bool:
+        """Update the usage from the newest sample, True if it is worth saving."""
+        counter = buffer.last("operationTimeBlade")
+        timestamp = buffer.last_time
+        if counter is None or timestamp is None:
+            return False
+        self.remaining = buffer.last("remainingBladeLifetime")
+        self.last_time = timestamp
+
+        # A counter going back means the blades were reset, start over
+        if self._window is None or counter < self._window[1]:
+            self._window = (timestamp, counter)
+            return True
+        start, start_counter = self._window
+        elapsed = timestamp - start
+        if elapsed < BLADE_WINDOW:
+            return False
+        self.usage.update((counter - start_counter) / elapsed * 86400, elapsed)
+        self._window = (timestamp, counter)
+        return True
+
+    @property
+    def usage_rate(self) -> float | None:
+        """Return the blade operation hours per day."""
+        return _rounded(self.usage.value, 2)
+
+    @property
+    def replacement_date(self) -> datetime | None:
+        """Return when the remaining blade life runs out at the learnt usage."""
+        if not self.usage.value or self.remaining is None or self.last_time is None:
+            return None
+        days = max(0, self.remaining) / self.usage.value
+        return datetime.fromtimestamp(self.last_time, UTC) + timedelta(days=days)
+
+
+def _blade_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict[str, Any]]:
+    """Return the store holding the blade estimators of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.blades")
+
+
+async def async_remove_blade_wear(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persisted blade estimators of a config entry."""
+    await _blade_store(hass, entry).async_remove()
+
+
+class AlkoBladeWear:
+    """Blade estimators of all mowers of a config entry, kept across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the blade wear tracking."""
+        self._store = _blade_store(hass, entry)
+        self.estimators: dict[str, AlkoBladeEstimator] = {}
+
+    async def async_load(self) -> None:
+        """Load the estimators saved before a restart."""
+        data = await self._store.async_load() or {}
+        self.estimators = {
+            thing_name: AlkoBladeEstimator.from_dict(state)
+            for thing_name, state in data.items()
+        }
+
+    @callback
+    def async_update(self, thing_name: str, buffer: AlkoTelemetryBuffer) -> None:
+        """Feed the newest sample of a mower to its estimator."""
+        if buffer.last("operationTimeBlade") is None:
+            return
+        estimator = self.estimators.setdefault(thing_name, AlkoBladeEstimator())
+        if estimator.update(buffer):
+            self._async_save()
+
+    @callback
+    def async_remove(self, thing_name: str) -> None:
+        """Forget the estimator of a mower that left the account."""
+        if self.estimators.pop(thing_name, None) is not None:
+            self._async_save()
+
+    async def async_save(self) -> None:
+        """Persist the estimators now, like when the entry is unloaded."""
+        await self._store.async_save(self._data())
+
+    @callback
+    def _async_save(self) -> None:
+        """Persist the estimators after a short delay."""
+        self._store.async_delay_save(self._data, SAVE_DELAY)
+
+    def _data(self) -> dict[str, dict[str, Any]]:
+        """Return the state of all estimators to persist."""
+        return {
+            thing_name: estimator.as_dict()
+            for thing_name, estimator in self.estimators.items()
+        }
+
+
+def _minutes(percent: float, per_hour: float | None) -> float | None:
+    """Return the minutes a change of percent takes at a rate."""
+    if not per_hour:
+        return None
+    return round(max(0, percent) / per_hour * 60)
+
+
+def _rounded(value: float | None, digits: int = 1) -> float | None:
+    """Round a rate for display."""
+    return None if value is None else round(value, digits)
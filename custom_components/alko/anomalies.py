@@ -0,0 +1,131 @@
+"""Incremental detection of AL-KO mowers that stop making progress."""
+
+from __future__ import annotations
+
+from collections import deque
+
+from .snapshot import AlkoDeviceSnapshot
+from .telemetry import AlkoTelemetryBuffer
+
+ANOMALY_STUCK = "stuck"
+ANOMALY_LOOPING_HOME = "looping_home"
+ANOMALY_CHARGING_STALLED = "charging_stalled"
+ANOMALY_FREQUENT_ERRORS = "frequent_errors"
+ANOMALIES = (
+    ANOMALY_STUCK,
+    ANOMALY_LOOPING_HOME,
+    ANOMALY_CHARGING_STALLED,
+    ANOMALY_FREQUENT_ERRORS,
+)
+
+# Seconds working without the battery draining or the mowing time growing
+STUCK_AFTER = 1800
+
+# Seconds heading home, or trips home started, without reaching the base
+HOMING_AFTER = 1200
+HOMING_TRIPS = 3
+
+# Seconds charging below this level without the battery rising
+CHARGING_AFTER = 2700
+CHARGING_FULL = 95
+
+# Errors or requests for user interaction within a window of seconds
+ERROR_COUNT = 3
+ERROR_WINDOW = 3600
+
+DOCKED_STATES = {"CHARGING", "IDLE_BASE_STATION"}
+
+
+class AlkoAnomalyDetector:
+    """Follow one mower through its telemetry and flag stalled progress.
+
+    Progress and the time in the current state are read back from the
+    telemetry buffer, at most as far as the longest check needs, so a
+    poll costs the same however long the mower has been watched. Trips
+    home and errors are counted here, as they span state changes.
+    """
+
+    def __init__(self, buffer: AlkoTelemetryBuffer) -> None:
+        """Initialize the detector."""
+        self.buffer = buffer
+        self.active: dict[str, float] = {}
+        self.changes: list[tuple[str, bool]] = []
+        self._state: str | None = None
+        self._homing_trips = 0
+        self._trouble = False
+        self._errors: deque[float] = deque(maxlen=ERROR_COUNT)
+
+    def update(self, snapshot: AlkoDeviceSnapshot) -> list[tuple[str, bool]]:
+        """Run the checks on a fresh snapshot, return the anomalies that flipped."""
+        timestamp = snapshot.last_updated.timestamp()
+        state = self.buffer.state
+        battery = self.buffer.last("batteryLevel")
+
+        if state != self._state:
+            if state == "HOMING":
+                self._homing_trips += 1
+            elif state in DOCKED_STATES:
+                self._homing_trips = 0
+        self._state = state
+
+        # Count errors and requests for interaction when they appear
+        trouble = snapshot.has_error or bool(snapshot.flag("userInteraction"))
+        if trouble and not self._trouble:
+            self._errors.append(timestamp)
+        self._trouble = trouble
+
+        in_state, stalled = self._progress(state, timestamp)
+        checks = {
+            ANOMALY_STUCK: state == "WORKING" and stalled >= STUCK_AFTER,
+            ANOMALY_LOOPING_HOME: state == "HOMING"
+            and (in_state >= HOMING_AFTER or self._homing_trips >= HOMING_TRIPS),
+            ANOMALY_CHARGING_STALLED: state == "CHARGING"
+            and battery is not None
+            and battery < CHARGING_FULL
+            and stalled >= CHARGING_AFTER,
+            ANOMALY_FREQUENT_ERRORS: len(self._errors) == ERROR_COUNT
+            and timestamp - self._errors[0] <= ERROR_WINDOW,
+        }
+
+        self.changes = []
+        for anomaly, detected in checks.items():
+            if detected and anomaly not in self.active:
+                self.active[anomaly] = timestamp
+                self.changes.append((anomaly, True))
+            elif not detected and anomaly in self.active:
+                del self.active[anomaly]
+                self.changes.append((anomaly, False))
+        return self.changes
+
+    def _progress(self, state: str | None, timestamp: float) -> tuple[float, float]:
+        """Return the seconds in the current state and since it made progress.
+
+        Progress is the battery moving the way the state should move it or
+        the mowing time growing. Both are capped at the longest threshold.
+        """
+        limit = max(STUCK_AFTER, HOMING_AFTER, CHARGING_AFTER)
+        newer: tuple[float, ...] | None = None
+        progress: float | None = None
+        start = timestamp
+        for sample in self.buffer.run("batteryLevel", "operationTimeMowing"):
+            if (
+                progress is None
+                and newer is not None
+                and (_moved(state, sample[1], newer[1]) or newer[2] > sample[2])
+            ):
+                progress = newer[0]
+            start = sample[0]
+            if timestamp - start >= limit:
+                break
+            newer = sample
+        return timestamp - start, timestamp - (start if progress is None else progress)
+
+
+def _moved(state: str | None, previous: float, battery: float) -> bool:
+    """Return True if the battery moved the way the state should move it.
+
+    Missing levels are NaN, which never compare as moved.
+    """
+    if state == "CHARGING":
+        return battery > previous
+    return battery < previous
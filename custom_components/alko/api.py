@@ -1,16 +1,174 @@
 """API for AL-KO bound to Home Assistant OAuth."""
+import asyncio
 import logging
-from typing import cast
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, cast
 
-from aiohttp import BasicAuth, ClientSession
+from aiohttp import BasicAuth, ClientError, ClientResponse, ClientSession
 from pyalko import AlkoClient
+from pyalko.const import BASE_URL as PYALKO_BASE_URL
+from pyalko.exceptions import AlkoAuthenticationException, AlkoException
 
 from homeassistant.components.application_credentials import AuthImplementation
 from homeassistant.helpers import config_entry_oauth2_flow
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+
+from .capture import AlkoTrafficRecorder, decode_body
+from .const import (
+    BASE_URL,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    HEDGE_BUDGET,
+    HEDGE_PERCENTILE,
+)
+from .metrics import PHASE_HTTP, PHASE_TOKEN, AlkoMetrics, RollingHistogram
 
 _LOGGER = logging.getLogger(__name__)
 
+# Cheapest call that proves the cloud answers: the thing list without state
+PROBE_URL = f"{BASE_URL}?thingCategory=ALKO-ROBOLINHO"
+
+
+class AlkoCircuitOpenError(AlkoException):
+    """Raise this when requests fail fast during an AL-KO cloud outage."""
+
+
+def is_outage(exception: Exception) -> bool:
+    """Return True if the error means the cloud itself is failing."""
+    if isinstance(exception, AlkoAuthenticationException):
+        return False
+    if isinstance(exception, AlkoException):
+        details = exception.args[0] if exception.args else None
+        status = details.get("status") if isinstance(details, dict) else None
+        return status is None or status == 429 or status >= 500
+    return isinstance(exception, (ClientError, TimeoutError))
+
+
+class AlkoCircuitBreaker:
+    """Stop calling the AL-KO cloud after repeated failures.
+
+    Once open, every request fails fast until the reset timeout passes.
+    The next request then sends a single probe and either closes the
+    circuit or keeps it open for another reset timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probe_lock = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Return True if requests currently fail fast."""
+        return self.opened_at is not None
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds left until the next probe."""
+        if self.opened_at is None:
+            return 0
+        return max(0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        if self.opened_at is not None:
+            _LOGGER.info("AL-KO cloud reachable again, closing circuit")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failed request and open the circuit at the threshold."""
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                _LOGGER.warning(
+                    "AL-KO cloud failed %s times in a row, pausing requests for %ss",
+                    self.failures,
+                    self.reset_timeout,
+                )
+            self.opened_at = time.monotonic()
+
+    async def async_before_request(
+        self, probe: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Fail fast while open, or let one caller probe once it is due."""
+        if self.opened_at is None:
+            return
+        if self.retry_in > 0 or self._probe_lock.locked():
+            raise self.error()
+
+        async with self._probe_lock:
+            _LOGGER.debug("Probing AL-KO cloud")
+            try:
+                await probe()
+            except Exception as exception:
+                if not is_outage(exception):
+                    raise
+                self.record_failure()
+                raise self.error() from exception
+            self.record_success()
+
+    def error(self) -> AlkoCircuitOpenError:
+        """Return the error raised while the circuit is open."""
+        return AlkoCircuitOpenError(
+            "AL-KO cloud is unavailable after repeated failures, "
+            f"retrying in {round(self.retry_in)}s"
+        )
+
+
+class AlkoHedgePolicy:
+    """Decide when a slow GET request gets a second, hedged copy.
+
+    The hedge delay is a percentile of recent latencies. Every request
+    earns a fraction of a hedge token, so hedges never exceed that share
+    of the traffic.
+    """
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        budget: float = HEDGE_BUDGET,
+        samples: int = 100,
+        min_samples: int = 20,
+    ) -> None:
+        """Initialize the hedge policy."""
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.latencies = RollingHistogram(samples)
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._tokens = 0.0
+
+    @property
+    def delay(self) -> float | None:
+        """Return the seconds to wait before hedging, if known yet."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        return self.latencies.percentile(self.percentile)
+
+    def record(self, latency: float) -> None:
+        """Track the latency of a completed request."""
+        self.latencies.add(latency)
+        self._tokens = min(self._tokens + self.budget, 1 / self.budget)
+
+    def try_acquire(self) -> bool:
+        """Take a hedge token if the budget allows another hedge."""
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self.hedged += 1
+        return True
+
 
 class OAuth2SessionAlko(config_entry_oauth2_flow.OAuth2Session):
     """OAuth2Session for Alko."""
@@ -32,18 +190,148 @@ class ConfigEntryAlkoClient(AlkoClient):
         self,
         websession: ClientSession,
         oauth_session: config_entry_oauth2_flow.OAuth2Session,
+        hedge: bool = False,
+        recorder: AlkoTrafficRecorder | None = None,
     ) -> None:
         """Initialize AL-KO auth."""
         super().__init__(websession)
         self._oauth_session = oauth_session
+        self.metrics = AlkoMetrics()
+        self.breaker = AlkoCircuitBreaker()
+        self.hedge_policy = AlkoHedgePolicy() if hedge else None
+        self.recorder = recorder
 
     async def async_get_access_token(self):
         """Return a valid access token."""
         if not self._oauth_session.valid_token:
-            await self._oauth_session.async_ensure_token_valid()
+            with self.metrics.time(PHASE_TOKEN):
+                await self._oauth_session.async_ensure_token_valid()
 
         return self._oauth_session.token["access_token"]
 
+    async def request(self, method, url, **kwargs) -> ClientResponse:
+        """Make a request unless the circuit is open."""
+        # pyalko builds its URLs from its own constant, honour our override
+        if BASE_URL != PYALKO_BASE_URL and url.startswith(PYALKO_BASE_URL):
+            url = BASE_URL + url.removeprefix(PYALKO_BASE_URL)
+
+        await self.breaker.async_before_request(self._async_probe)
+
+        self.metrics.requests += 1
+        try:
+            # Refresh the token up front so it is not counted as HTTP time
+            await self.async_get_access_token()
+            if self.hedge_policy is not None and method == "GET":
+                response = await self._async_hedged_request(method, url, **kwargs)
+            else:
+                response = await self._async_send(method, url, **kwargs)
+        except Exception as exception:
+            self.metrics.request_errors += 1
+            if is_outage(exception):
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response
+
+    async def _async_send(
+        self, method, url, *, hedged: bool = False, probe: bool = False, **kwargs
+    ) -> ClientResponse:
+        """Make a request and read its body, tracking latency and size."""
+        started = dt_util.utcnow()
+        start = time.perf_counter()
+        status = None
+        size = None
+        body: Any = None
+        try:
+            response = await super().request(method, url, **kwargs)
+            status = response.status
+            # The body is cached on the response, so decoding it later is free
+            body = await response.read()
+            size = len(body)
+        except Exception as exception:
+            details = exception.args[0] if exception.args else None
+            if isinstance(details, dict):
+                status = details.get("status")
+                body = details.get("response")
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            endpoint = url.removeprefix(BASE_URL) or "/"
+            self.metrics.log_request(
+                time=started.isoformat(),
+                method=method,
+                endpoint=endpoint,
+                status=status,
+                duration_ms=round(latency * 1000, 1),
+                bytes=size,
+                hedged=hedged,
+                probe=probe,
+            )
+            if self.recorder is not None:
+                self.recorder.record(
+                    method=method,
+                    endpoint=endpoint,
+                    status=status,
+                    latency=latency,
+                    request=kwargs.get("json"),
+                    response=decode_body(body) if isinstance(body, bytes) else body,
+                )
+
+        self.metrics.record(PHASE_HTTP, latency)
+        self.metrics.bytes_received += size
+        if self.hedge_policy is not None:
+            self.hedge_policy.record(latency)
+        return response
+
+    async def _async_hedged_request(self, method, url, **kwargs) -> ClientResponse:
+        """Make a request, racing a second copy if the first is slow.
+
+        Only GET requests are hedged: desired state writes carry the
+        mower clock and one-shot commands, so they must not be sent twice.
+        """
+        policy = self.hedge_policy
+        primary = asyncio.ensure_future(
+            self._async_send(method, url, **kwargs)
+        )
+        tasks = [primary]
+        # Cancel the copies still running on any way out, including when
+        # the caller is cancelled, so none keeps recording outcomes
+        try:
+            delay = policy.delay
+            if delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not policy.try_acquire():
+                return await primary
+
+            _LOGGER.debug("Hedging %s after %.2fs", url, delay)
+            hedge = asyncio.ensure_future(
+                self._async_send(method, url, hedged=True, **kwargs)
+            )
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            policy.hedge_wins += 1
+                        return task.result()
+            # Both copies failed, surface the error of the original request
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _async_probe(self) -> None:
+        """Send a single lightweight request to check if the cloud is back."""
+        response = await self._async_send("GET", PROBE_URL, probe=True)
+        response.release()
+
 
 class AlkoLocalOAuth2Implementation(
     AuthImplementation,
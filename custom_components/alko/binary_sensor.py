@@ -1,253 +1,219 @@
 """Support for AL-KO binary sensor platform."""
-import logging
+from __future__ import annotations
 
-from pyalko import Alko
-from pyalko.objects.device import AlkoDevice
+from dataclasses import dataclass
+import logging
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
+    BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-
-from . import AlkoDeviceEntity
+from homeassistant.util import dt as dt_util
+
+from . import AlkoDescriptionEntity, AlkoDeviceEntity, async_add_device_entities
+from .anomalies import (
+    ANOMALY_CHARGING_STALLED,
+    ANOMALY_FREQUENT_ERRORS,
+    ANOMALY_LOOPING_HOME,
+    ANOMALY_STUCK,
+)
 from .const import DOMAIN
+from .coordinator import AlkoDataUpdateCoordinator
+from .snapshot import AlkoDeviceSnapshot, AlkoEntityDescription
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class AlkoBinarySensorEntityDescription(
+    AlkoEntityDescription, BinarySensorEntityDescription
+):
+    """Describes an AL-KO binary sensor."""
+
+
+def _flag_description(
+    key: str, name: str, flag: str, **kwargs
+) -> AlkoBinarySensorEntityDescription:
+    """Describe a binary sensor backed by a situation flag."""
+    return AlkoBinarySensorEntityDescription(
+        key=key,
+        name=name,
+        value_fn=lambda snapshot: snapshot.flag(flag),
+        exists_fn=lambda snapshot: snapshot.has_flag(flag),
+        **kwargs,
+    )
+
+
+def _user_interaction(snapshot: AlkoDeviceSnapshot) -> bool:
+    """Return true if user interaction is required."""
+    # Check if the device is locked or reports any error code other than 999
+    if snapshot.is_locked or snapshot.has_error:
+        return True
+
+    # Check for critical issues that require attention
+    flags = snapshot.situation_flags
+    return bool(
+        flags.get("batteryFailure") or
+        flags.get("chargerFailure") or
+        flags.get("bladeService") or
+        flags.get("wheelMotorTemperatureHigh") or
+        flags.get("stopAfterIssue") or
+        not flags.get("operationPermitted")
+    )
+
+
+BINARY_SENSORS: tuple[AlkoBinarySensorEntityDescription, ...] = (
+    _flag_description(
+        "rain_detected",
+        "Rain Detected",
+        "rainDetected",
+        device_class=BinarySensorDeviceClass.MOISTURE,
+        icon="mdi:water",
+    ),
+    _flag_description(
+        "frost_detected",
+        "Frost Detected",
+        "frostDetected",
+        device_class=BinarySensorDeviceClass.COLD,
+        icon="mdi:snowflake",
+    ),
+    _flag_description(
+        "charger_contact",
+        "Charger Contact",
+        "chargerContact",
+        device_class=BinarySensorDeviceClass.PLUG,
+        icon="mdi:power-plug",
+    ),
+    _flag_description(
+        "day_cancelled",
+        "Day Cancelled",
+        "dayCancelled",
+        icon="mdi:calendar-remove",
+    ),
+    _flag_description(
+        "is_active",
+        "Is Active",
+        "robotIsActive",
+        icon="mdi:robot-mower-outline",
+    ),
+    AlkoBinarySensorEntityDescription(
+        key="is_connected",
+        name="Is Connected",
+        icon="mdi:signal",
+        value_fn=lambda snapshot: snapshot.is_connected,
+        available_offline=True,
+        exists_fn=lambda snapshot: (
+            snapshot.has("situationFlags") and snapshot.has("isConnected")
+        ),
+    ),
+    AlkoBinarySensorEntityDescription(
+        key="user_interaction",
+        name="User Interaction",
+        icon="mdi:hand-wave",
+        value_fn=_user_interaction,
+        exists_fn=lambda snapshot: snapshot.has_flag("userInteraction"),
+    ),
+)
+
+
+ANOMALY_SENSORS: tuple[BinarySensorEntityDescription, ...] = (
+    BinarySensorEntityDescription(
+        key=ANOMALY_STUCK,
+        name="Stuck",
+        icon="mdi:robot-mower-outline",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+    ),
+    BinarySensorEntityDescription(
+        key=ANOMALY_LOOPING_HOME,
+        name="Looping Home",
+        icon="mdi:home-alert",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+    ),
+    BinarySensorEntityDescription(
+        key=ANOMALY_CHARGING_STALLED,
+        name="Charging Stalled",
+        icon="mdi:battery-alert",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+    ),
+    BinarySensorEntityDescription(
+        key=ANOMALY_FREQUENT_ERRORS,
+        name="Frequent Errors",
+        icon="mdi:alert-circle-outline",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the AL-KO binary sensor platform based on a config entry."""
-    coordinator: DataUpdateCoordinator[Alko] = hass.data[DOMAIN][entry.entry_id]
-
-    entities = []
-
-    for device in coordinator.data.devices:
-        cls_list = []
-        if hasattr(device.thingState.state.reported, "situationFlags"):
-            if hasattr(device.thingState.state.reported.situationFlags, "rainDetected"):
-                cls_list.append(AlkoRainDetectedSensor)
-            if hasattr(device.thingState.state.reported.situationFlags, "frostDetected"):
-                cls_list.append(AlkoFrostDetectedSensor)
-            if hasattr(device.thingState.state.reported.situationFlags, "chargerContact"):
-                cls_list.append(AlkoChargerContactBinarySensor)
-            if hasattr(device.thingState.state.reported.situationFlags, "dayCancelled"):
-                cls_list.append(AlkoDayCancelledBinarySensor)
-            if hasattr(device.thingState.state.reported.situationFlags, "robotIsActive"):
-                cls_list.append(AlkoRobotIsActiveBinarySensor)
-            if hasattr(device.thingState.state.reported, "isConnected"):
-                cls_list.append(AlkoIsConnectedBinarySensor)
-            if hasattr(device.thingState.state.reported.situationFlags, "userInteraction"):
-                cls_list.append(AlkoUserInteractionBinarySensor)
-
-        for cls in cls_list:
-            entities.append(
-                cls(
-                    coordinator,
-                    device,
-                )
+    coordinator: AlkoDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_add_descriptions(BINARY_SENSORS)
+
+    def _binary_sensors(snapshot: AlkoDeviceSnapshot) -> list[BinarySensorEntity]:
+        entities: list[BinarySensorEntity] = [
+            AlkoBinarySensor(coordinator, snapshot, description)
+            for description in BINARY_SENSORS
+            if snapshot.supports(description)
+        ]
+        if snapshot.has("operationState"):
+            entities.extend(
+                AlkoAnomalyBinarySensor(coordinator, snapshot, description)
+                for description in ANOMALY_SENSORS
             )
+        return entities
 
-    async_add_entities(entities, True)
-
-
-class AlkoRainDetectedSensor(AlkoDeviceEntity, BinarySensorEntity):
-    """Defines an AL-KO rain detected binary sensor."""
-
-    _attr_device_class = BinarySensorDeviceClass.MOISTURE
-    _attr_icon = "mdi:water"
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO rain detected sensor."""
-        super().__init__(
-            coordinator,
-            device,
-            "rain_detected",
-            "Rain Detected",
-        )
-
-    @property
-    def is_on(self) -> bool:
-        """Return true if rain is detected."""
-        return self.device.thingState.state.reported.situationFlags.rainDetected
-
+    async_add_device_entities(coordinator, entry, async_add_entities, _binary_sensors)
 
-class AlkoFrostDetectedSensor(AlkoDeviceEntity, BinarySensorEntity):
-    """Defines an AL-KO frost detected binary sensor."""
 
-    _attr_device_class = BinarySensorDeviceClass.COLD
-    _attr_icon = "mdi:snowflake"
+class AlkoBinarySensor(AlkoDescriptionEntity, BinarySensorEntity):
+    """Defines an AL-KO binary sensor."""
 
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO frost detected sensor."""
-        super().__init__(
-            coordinator,
-            device,
-            "frost_detected",
-            "Frost Detected",
-        )
-
-    @property
-    def is_on(self) -> bool:
-        """Return true if frost is detected."""
-        return self.device.thingState.state.reported.situationFlags.frostDetected
-
-
-class AlkoChargerContactBinarySensor(AlkoDeviceEntity, BinarySensorEntity):
-    """Defines an AL-KO Charger Contact binary sensor."""
-
-    _attr_icon = "mdi:power-plug"
-    _attr_device_class = BinarySensorDeviceClass.PLUG
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO binary sensor."""
-        super().__init__(
-            coordinator,
-            device,
-            "charger_contact",
-            "Charger Contact",
-        )
+    entity_description: AlkoBinarySensorEntityDescription
 
     @property
     def is_on(self) -> bool:
         """Return the state of the binary sensor."""
-        return self.device.thingState.state.reported.situationFlags.chargerContact
+        return self.value
 
 
-class AlkoDayCancelledBinarySensor(AlkoDeviceEntity, BinarySensorEntity):
-    """Defines an AL-KO Day Cancelled binary sensor."""
-
-    _attr_icon = "mdi:calendar-remove"
+class AlkoAnomalyBinarySensor(AlkoDeviceEntity, BinarySensorEntity):
+    """Defines an AL-KO binary sensor for a detected anomaly."""
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
+        coordinator: AlkoDataUpdateCoordinator,
+        snapshot: AlkoDeviceSnapshot,
+        description: BinarySensorEntityDescription,
     ) -> None:
-        """Initialize AL-KO binary sensor."""
-        super().__init__(
-            coordinator,
-            device,
-            "day_cancelled",
-            "Day Cancelled",
-        )
+        """Initialize the AL-KO anomaly binary sensor."""
+        super().__init__(coordinator, snapshot, description.key, description.name)
+        self.entity_description = description
 
     @property
-    def is_on(self) -> bool:
-        """Return the state of the binary sensor."""
-        return self.device.thingState.state.reported.situationFlags.dayCancelled
-
-
-class AlkoRobotIsActiveBinarySensor(AlkoDeviceEntity, BinarySensorEntity):
-    """Defines an AL-KO Robot Is Active binary sensor."""
-
-    _attr_icon = "mdi:robot-mower-outline"
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO robot is active sensor."""
-        super().__init__(
-            coordinator,
-            device,
-            "is_active",
-            "Is Active",
-        )
+    def _since(self) -> float | None:
+        """Return when the anomaly was detected, if it is active."""
+        detector = self.coordinator.anomalies.get(self.thing_name)
+        if detector is None:
+            return None
+        return detector.active.get(self.entity_description.key)
 
     @property
     def is_on(self) -> bool:
-        """Return true if robot is active."""
-        return self.device.thingState.state.reported.situationFlags.robotIsActive
-
-
-class AlkoIsConnectedBinarySensor(AlkoDeviceEntity, BinarySensorEntity):
-    """Defines an AL-KO Is Connected sensor."""
-
-    _attr_icon = "mdi:signal"
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO is connected binary sensor."""
-        super().__init__(
-            coordinator,
-            device,
-            "is_connected",
-            "Is Connected"
-        )
+        """Return True if the anomaly is detected."""
+        return self._since is not None
 
     @property
-    def is_on(self) -> bool:
-        """Return the state of the binary sensor."""
-        return self.device.thingState.state.reported.isConnected
-
-
-class AlkoUserInteractionBinarySensor(AlkoDeviceEntity, BinarySensorEntity):
-    """Defines an AL-KO User Interaction sensor."""
-
-    _attr_icon = "mdi:hand-wave"
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO user interaction binary sensor."""
-        super().__init__(
-            coordinator,
-            device,
-            "user_interaction",
-            "User Interaction"
-        )
-
-    @property
-    def is_on(self) -> bool:
-        """Return true if user interaction is required."""
-        reported = self.device.thingState.state.reported
-
-        # Check if the device is locked
-        if reported.operationSubState == "LOCKED_PIN":
-            return True
-
-        # Check for any error code other than 999
-        if reported.operationError.code != 999:
-            return True
-
-        # Check for critical issues that require attention
-        flags = reported.situationFlags
-        if (
-            flags.batteryFailure or
-            flags.chargerFailure or
-            flags.bladeService or
-            flags.wheelMotorTemperatureHigh or
-            flags.stopAfterIssue or
-            not flags.operationPermitted
-        ):
-            return True
-
-        # Check operation situation for critical states
-        if reported.operationSituation == "OPERATION_NOT_PERMITTED_LOCKED":
-            return True
-
-        return False
+    def extra_state_attributes(self) -> dict[str, str | None]:
+        """Return when the anomaly was detected."""
+        since = self._since
+        return {
+            "since": None
+            if since is None
+            else dt_util.utc_from_timestamp(since).isoformat()
+        }
@@ -1,17 +1,17 @@
 """Support for AL-KO button platform."""
 import logging
 
-from pyalko import Alko
 from pyalko.exceptions import AlkoException
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from . import AlkoDeviceEntity
+from . import AlkoDeviceEntity, async_add_device_entities
 from .const import DOMAIN
+from .coordinator import AlkoDataUpdateCoordinator
+from .snapshot import AlkoDeviceSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,25 +20,14 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the AL-KO button platform based on a config entry."""
-    coordinator: DataUpdateCoordinator[Alko] = hass.data[DOMAIN][entry.entry_id]
+    coordinator: AlkoDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities = []
+    def _buttons(snapshot: AlkoDeviceSnapshot) -> list[AlkoResetBladeLifeButton]:
+        if snapshot.has("resetBladesService"):
+            return [AlkoResetBladeLifeButton(coordinator, snapshot)]
+        return []
 
-    for device in coordinator.data.devices:
-        cls_list = []
-        if device.thingState.state.reported is not None:
-            if hasattr(device.thingState.state.reported, "resetBladesService"):
-                cls_list.append(AlkoResetBladeLifeButton)
-
-        for cls in cls_list:
-            entities.append(
-                cls(
-                    coordinator,
-                    device,
-                )
-            )
-
-    async_add_entities(entities, True)
+    async_add_device_entities(coordinator, entry, async_add_entities, _buttons)
 
 
 class AlkoResetBladeLifeButton(AlkoDeviceEntity, ButtonEntity):
@@ -47,10 +36,10 @@ class AlkoResetBladeLifeButton(AlkoDeviceEntity, ButtonEntity):
     _attr_name = "Reset Blade Life"
     _attr_icon = "mdi:restart"
 
-    def __init__(self, coordinator, device):
+    def __init__(self, coordinator, snapshot):
         super().__init__(
             coordinator,
-            device,
+            snapshot,
             "reset_blade_life",
             "Reset Blade Life"
         )
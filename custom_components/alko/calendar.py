@@ -2,49 +2,30 @@
 import logging
 from datetime import datetime, timedelta
 
-from pyalko import Alko
-from pyalko.objects.device import AlkoDevice
-
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
-from . import AlkoDeviceEntity
-from .const import DOMAIN
-
-DAYS_OF_WEEK = [
-    "monday",
-    "tuesday",
-    "wednesday",
-    "thursday",
-    "friday",
-    "saturday",
-    "sunday",
-]
+from . import AlkoDeviceEntity, async_add_device_entities
+from .const import DAYS_OF_WEEK, DOMAIN
+from .coordinator import AlkoDataUpdateCoordinator
+from .snapshot import AlkoDeviceSnapshot
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the AL-KO calendar platform based on a config entry."""
-    coordinator: DataUpdateCoordinator[Alko] = hass.data[DOMAIN][entry.entry_id]
+    coordinator: AlkoDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities = []
-
-    for device in coordinator.data.devices:
-        if device.thingState.state.reported is not None:
-            if hasattr(device.thingState.state.reported, "mowingWindows"):
-                entities.append(
-                    AlkoMowingCalendar(
-                        coordinator,
-                        device,
-                    )
-                )
+    def _calendars(snapshot: AlkoDeviceSnapshot) -> list[AlkoMowingCalendar]:
+        if snapshot.has("mowingWindows"):
+            return [AlkoMowingCalendar(coordinator, snapshot)]
+        return []
 
-    async_add_entities(entities, True)
+    async_add_device_entities(coordinator, entry, async_add_entities, _calendars)
 
 
 class AlkoMowingCalendar(AlkoDeviceEntity, CalendarEntity):
@@ -55,13 +36,13 @@ class AlkoMowingCalendar(AlkoDeviceEntity, CalendarEntity):
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
+        coordinator: AlkoDataUpdateCoordinator,
+        snapshot: AlkoDeviceSnapshot,
     ) -> None:
         """Initialize AL-KO mowing calendar."""
         super().__init__(
             coordinator,
-            device,
+            snapshot,
             "mowing_calendar",
             "Mowing Schedule",
         )
@@ -96,11 +77,12 @@ class AlkoMowingCalendar(AlkoDeviceEntity, CalendarEntity):
         """Return calendar events within a datetime range."""
         events: list[CalendarEvent] = []
 
-        if not hasattr(self.device.thingState.state.reported, "mowingWindows"):
+        snapshot = self.snapshot
+        if not snapshot.has("mowingWindows"):
             return events
 
-        mowing_windows = self.device.thingState.state.reported.mowingWindows
-        is_day_cancelled = self.device.thingState.state.reported.situationFlags.dayCancelled
+        mowing_windows = snapshot.get("mowingWindows") or {}
+        is_day_cancelled = snapshot.flag("dayCancelled")
 
         # Get current date and ensure we start from today
         today = dt_util.now().date()
@@ -110,17 +92,17 @@ class AlkoMowingCalendar(AlkoDeviceEntity, CalendarEntity):
         for _ in range(7):
             day_name = DAYS_OF_WEEK[current_date.weekday()]
 
-            # Get the day's windows using getattr
-            day_windows = getattr(mowing_windows, day_name, None)
+            # Get the day's windows
+            day_windows = mowing_windows.get(day_name)
             if day_windows is not None:
                 # Get window attributes
-                window_1 = getattr(day_windows, "window_1", None)
-                window_2 = getattr(day_windows, "window_2", None)
+                window_1 = day_windows.get("window_1")
+                window_2 = day_windows.get("window_2")
 
                 for window_name, window in [("Window 1", window_1), ("Window 2", window_2)]:
                     if window is not None:
                         # Check if window is active
-                        activity_mode = getattr(window, "activityMode", False)
+                        activity_mode = window.get("activityMode", False)
                         is_window_active = activity_mode and not (
                             current_date == today and is_day_cancelled)
 
@@ -130,8 +112,8 @@ class AlkoMowingCalendar(AlkoDeviceEntity, CalendarEntity):
                             start_time = datetime.combine(
                                 current_date,
                                 datetime.min.time().replace(
-                                    hour=getattr(window, "startHour", 0),
-                                    minute=getattr(window, "startMinute", 0),
+                                    hour=window.get("startHour", 0),
+                                    minute=window.get("startMinute", 0),
                                 ),
                             )
                             # Convert to local timezone
@@ -139,15 +121,14 @@ class AlkoMowingCalendar(AlkoDeviceEntity, CalendarEntity):
 
                             # Calculate end time based on duration (in minutes)
                             end_time = start_time + \
-                                timedelta(minutes=getattr(
-                                    window, "duration", 0))
+                                timedelta(minutes=window.get("duration", 0))
 
                             # Only add events that fall within the requested range
                             if start_time <= end_date and end_time >= start_date:
                                 # Create a concise summary with mutually exclusive modes
-                                if getattr(window, 'marginMode', False):
+                                if window.get("marginMode", False):
                                     summary = "Mowing Border & Area"
-                                elif getattr(window, 'narrowPassageMode', False):
+                                elif window.get("narrowPassageMode", False):
                                     summary = "Mowing Narrow Passage"
                                 else:
                                     summary = "Mowing"
@@ -161,15 +142,15 @@ class AlkoMowingCalendar(AlkoDeviceEntity, CalendarEntity):
                                 )
 
             # Add manual mowing event if it exists and it's today
-            if current_date == today and hasattr(self.device.thingState.state.reported, "manualMowing"):
-                manual_mowing = self.device.thingState.state.reported.manualMowing
-                if manual_mowing is not None and getattr(manual_mowing, "activityMode", False):
+            if current_date == today:
+                manual_mowing = snapshot.get("manualMowing")
+                if manual_mowing is not None and manual_mowing.get("activityMode", False):
                     # Create event start time
                     start_time = datetime.combine(
                         current_date,
                         datetime.min.time().replace(
-                            hour=getattr(manual_mowing, "startHour", 0),
-                            minute=getattr(manual_mowing, "startMinute", 0),
+                            hour=manual_mowing.get("startHour", 0),
+                            minute=manual_mowing.get("startMinute", 0),
                         ),
                     )
                     # Convert to local timezone
@@ -177,15 +158,14 @@ class AlkoMowingCalendar(AlkoDeviceEntity, CalendarEntity):
 
                     # Calculate end time based on duration (in minutes)
                     end_time = start_time + \
-                        timedelta(minutes=getattr(
-                            manual_mowing, "duration", 0))
+                        timedelta(minutes=manual_mowing.get("duration", 0))
 
                     # Only add if it falls within the requested range
                     if start_time <= end_date and end_time >= start_date:
                         # Create a concise summary for manual mowing
-                        if getattr(manual_mowing, 'marginMode', False):
+                        if manual_mowing.get("marginMode", False):
                             summary = "Manual Mowing Border & Area"
-                        elif getattr(manual_mowing, 'narrowPassageMode', False):
+                        elif manual_mowing.get("narrowPassageMode", False):
                             summary = "Manual Mowing Narrow Passage"
                         else:
                             summary = "Manual Mowing"
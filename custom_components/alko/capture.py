@@ -0,0 +1,111 @@
+"""Record AL-KO cloud traffic for offline replay."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import TO_REDACT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bumped when the record layout changes, scripts/replay.py checks it
+CAPTURE_VERSION = 1
+
+# Records buffered in memory before they are appended to the file
+CAPTURE_BATCH = 20
+
+
+class AlkoTrafficRecorder:
+    """Append request/response pairs to a gzipped NDJSON file.
+
+    Every line is one exchange with its offset from the start of the
+    capture and its latency, so a replay can reproduce the timing. The
+    bearer token is never recorded and credentials, tokens, serial
+    numbers and account identifiers in bodies are redacted like in the
+    diagnostics.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.path = hass.config.path(
+            f"alko_capture_{dt_util.utcnow().strftime('%Y%m%d_%H%M%S')}.ndjson.gz"
+        )
+        self.records = 0
+        self._lock = asyncio.Lock()
+        self._start = time.monotonic()
+        self._buffer: list[dict[str, Any]] = [
+            {"capture": CAPTURE_VERSION, "started": dt_util.utcnow().isoformat()}
+        ]
+
+    @callback
+    def record(
+        self,
+        *,
+        method: str,
+        endpoint: str,
+        status: int | None,
+        latency: float,
+        request: Any,
+        response: Any,
+    ) -> None:
+        """Buffer one exchange and write the batch once it is full."""
+        self.records += 1
+        self._buffer.append(
+            {
+                "t": round(time.monotonic() - self._start - latency, 3),
+                "method": method,
+                "endpoint": endpoint,
+                "status": status,
+                "ms": round(latency * 1000, 1),
+                "request": _redact(request),
+                "response": _redact(response),
+            }
+        )
+        if len(self._buffer) >= CAPTURE_BATCH:
+            self.hass.async_create_background_task(
+                self.async_flush(), "alko capture flush"
+            )
+
+    async def async_flush(self) -> None:
+        """Append the buffered exchanges to the capture file."""
+        # Batch and unload flushes append to the same file one at a time
+        async with self._lock:
+            if not self._buffer:
+                return
+            records, self._buffer = self._buffer, []
+            await self.hass.async_add_executor_job(_append, self.path, records)
+        _LOGGER.debug("Wrote %s AL-KO exchanges to %s", len(records), self.path)
+
+
+def decode_body(body: bytes | None) -> Any:
+    """Return a response body as JSON, or as text if it is not JSON."""
+    if body is None:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body.decode(errors="replace")
+
+
+def _redact(data: Any) -> Any:
+    """Redact credentials, tokens, serial numbers and accounts from a body."""
+    if isinstance(data, (dict, list)):
+        return async_redact_data(data, TO_REDACT)
+    return data
+
+
+def _append(path: str, records: list[dict[str, Any]]) -> None:
+    """Append records as one more gzip member, readable as a single stream."""
+    with gzip.open(path, "at", encoding="utf-8") as file:
+        for record in records:
+            file.write(json.dumps(record, separators=(",", ":")) + "\n")
@@ -5,11 +5,24 @@ from typing import Any
 
 import voluptuous as vol
 
+from homeassistant.config_entries import ConfigEntry, ConfigFlowResult, OptionsFlow
+from homeassistant.core import callback
 from homeassistant.helpers import config_entry_oauth2_flow
 from homeassistant.util import dt as dt_util
 from homeassistant.helpers import aiohttp_client
 
-from .const import DOMAIN
+from .const import (
+    CONF_CAPTURE_TRAFFIC,
+    CONF_EXPORT_INTERVAL,
+    CONF_HEDGE_REQUESTS,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_STALE_AFTER,
+    DEFAULT_EXPORT_INTERVAL,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_STALE_AFTER,
+    DOMAIN,
+    OAUTH2_TOKEN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +45,12 @@ class OAuth2FlowHandler(
         self._username = None
         self._password = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return AlkoOptionsFlowHandler()
+
     @property
     def logger(self) -> logging.Logger:
         """Return logger."""
@@ -100,7 +119,7 @@ class OAuth2FlowHandler(
                           {k: v if k != "password" else "***" for k, v in token_data.items()})
 
             token_response = await aiohttp_client.async_get_clientsession(self.hass).post(
-                "https://idp.al-ko.com/connect/token", data=token_data
+                OAUTH2_TOKEN, data=token_data
             )
 
             if not token_response.ok:
@@ -168,3 +187,43 @@ class OAuth2FlowHandler(
         self._auth_implementation = entry.data["auth_implementation"]
 
         return await self.async_oauth_create_entry(self)
+
+
+class AlkoOptionsFlowHandler(OptionsFlow):
+    """Handle AL-KO options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the AL-KO options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_STALE_AFTER,
+                    default=options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+                vol.Required(
+                    CONF_MIN_WRITE_INTERVAL,
+                    default=options.get(
+                        CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=60)),
+                vol.Required(
+                    CONF_HEDGE_REQUESTS,
+                    default=options.get(CONF_HEDGE_REQUESTS, False),
+                ): bool,
+                vol.Required(
+                    CONF_CAPTURE_TRAFFIC,
+                    default=options.get(CONF_CAPTURE_TRAFFIC, False),
+                ): bool,
+                vol.Required(
+                    CONF_EXPORT_INTERVAL,
+                    default=options.get(CONF_EXPORT_INTERVAL, DEFAULT_EXPORT_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1440)),
+            }),
+        )
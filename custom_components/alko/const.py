@@ -1,8 +1,11 @@
 """Constants for the AL-KO integration."""
 
+import os
+
 DOMAIN = "alko"
 
-BASE_URL = "https://api.al-ko.com/v1/iot/things"
+# The cloud endpoints can be pointed elsewhere, e.g. at scripts/mock_cloud.py
+BASE_URL = os.environ.get("ALKO_BASE_URL", "https://api.al-ko.com/v1/iot/things")
 
 DATA_ALKO = "alko"
 DATA_ALKO_CONFIG = "alko_config"
@@ -13,4 +16,77 @@ CONF_CLIENT_SECRET = "client_secret"
 ALKO_SCOPES = "alkoCulture alkoCustomerId introspection offline_access"
 
 OAUTH2_AUTHORIZE = "https://idp.al-ko.com/connect/token"
-OAUTH2_TOKEN = "https://idp.al-ko.com/connect/token"
+OAUTH2_TOKEN = os.environ.get("ALKO_OAUTH2_TOKEN", "https://idp.al-ko.com/connect/token")
+
+# Keys of the mowing windows in the reported schedule, Monday first
+DAYS_OF_WEEK = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+
+# Operation error code reported when the mower has no error
+ERROR_CODE_NONE = 999
+
+# Successful refreshes a device has to be missing from the device list
+# before it is removed, so one partial response does not drop it
+DEVICE_REMOVE_AFTER = 3
+
+# Minutes a device keeps serving its last good snapshot after failed polls
+CONF_STALE_AFTER = "stale_after"
+DEFAULT_STALE_AFTER = 10
+
+# Minutes noisy sensors hold back small changes before writing them again,
+# 0 disables the limit
+CONF_MIN_WRITE_INTERVAL = "min_write_interval"
+DEFAULT_MIN_WRITE_INTERVAL = 5
+
+# Consecutive cloud failures before requests fail fast, and the seconds to
+# wait before a single probe request checks whether the cloud is back
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_TIMEOUT = 120
+
+# Hedge GET requests that run past this latency percentile, spending at
+# most this share of extra requests
+CONF_HEDGE_REQUESTS = "hedge_requests"
+HEDGE_PERCENTILE = 95
+HEDGE_BUDGET = 0.1
+
+# Keys redacted from diagnostics and traffic captures
+TO_REDACT = {
+    "access_token",
+    "refresh_token",
+    "client_id",
+    "client_secret",
+    "username",
+    "password",
+    "serialNumber",
+    "serialNumberMain",
+    "serialNumberWifi",
+    "serial_number",
+    "userEmail",
+    "userId",
+    "idpAccountId",
+}
+
+# Record cloud traffic to a file in the config directory for offline replay
+CONF_CAPTURE_TRAFFIC = "capture_traffic"
+
+# Minutes between exports of the fleet state to the config directory,
+# 0 disables the periodic export
+CONF_EXPORT_INTERVAL = "export_interval"
+DEFAULT_EXPORT_INTERVAL = 0
+
+# Seconds between polls, shorter while any mower is moving, randomized by
+# this fraction so several instances on one account drift apart
+UPDATE_INTERVAL = 60
+ACTIVE_UPDATE_INTERVAL = 30
+UPDATE_JITTER = 0.1
+
+# Days and number of mowing sessions kept per device
+SESSION_RETENTION_DAYS = 90
+SESSION_LIMIT = 1000
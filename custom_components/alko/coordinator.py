@@ -0,0 +1,431 @@
+"""Data update coordinator for the AL-KO integration."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+import logging
+import random
+import time
+
+from aiohttp.client_exceptions import ClientError
+from pyalko import Alko
+from pyalko.exceptions import AlkoAuthenticationException, AlkoException
+from pyalko.objects.device import AlkoDevice
+import async_timeout
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
+
+from .analytics import AlkoBatteryEstimator, AlkoBladeWear
+from .anomalies import AlkoAnomalyDetector
+from .api import ConfigEntryAlkoClient
+from .const import (
+    ACTIVE_UPDATE_INTERVAL,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_STALE_AFTER,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_STALE_AFTER,
+    DEVICE_REMOVE_AFTER,
+    DOMAIN,
+    UPDATE_INTERVAL,
+    UPDATE_JITTER,
+)
+from .events import anomaly_events, transition_events
+from .export import AlkoFleetExporter
+from .metrics import (
+    PHASE_BUILD,
+    PHASE_DECODE,
+    PHASE_FANOUT,
+    PHASE_FETCH,
+    PHASE_HTTP,
+    PHASE_TOKEN,
+)
+from .outbox import AlkoCommandOutbox
+from .sessions import AlkoMowingSessions
+from .snapshot import AlkoDeviceMeta, AlkoDeviceSnapshot, AlkoEntityDescription
+from .telemetry import AlkoTelemetryBuffer
+
+_LOGGER = logging.getLogger(__name__)
+
+# Mower states that are polled at the active interval
+ACTIVE_MOWER_STATES = ("mowing", "returning")
+
+
+class AlkoDataUpdateCoordinator(DataUpdateCoordinator[dict[str, AlkoDeviceSnapshot]]):
+    """Fetch AL-KO devices and turn them into per-device snapshots."""
+
+    config_entry: ConfigEntry
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        alko: Alko,
+        client: ConfigEntryAlkoClient,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name="alko_coordinator",
+            # Polling interval. Will only be polled if there are subscribers.
+            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+        )
+        self.alko = alko
+        self.client = client
+        # Options the entry was set up with, to tell option changes apart
+        self.options = dict(entry.options)
+        self.metrics = client.metrics
+        self.outbox = AlkoCommandOutbox(hass, entry, alko)
+        self._meta: dict[str, AlkoDeviceMeta] = {}
+        self._descriptions: dict[str, AlkoEntityDescription] = {}
+        self._known_devices: dict[str, frozenset[str]] = {}
+        self._missing_devices: dict[str, int] = {}
+        self._device_callbacks: list[
+            Callable[[Iterable[AlkoDeviceSnapshot]], None]
+        ] = []
+        self._removal_callbacks: list[Callable[[str], None]] = []
+        self.failed_updates = 0
+        self.interval_history: deque[tuple[datetime, float]] = deque(maxlen=50)
+        self.telemetry: dict[str, AlkoTelemetryBuffer] = {}
+        self.battery: dict[str, AlkoBatteryEstimator] = {}
+        self.anomalies: dict[str, AlkoAnomalyDetector] = {}
+        self.blade_wear = AlkoBladeWear(hass, entry)
+        self.sessions = AlkoMowingSessions(hass, entry)
+        self.exporter = AlkoFleetExporter(hass, entry)
+
+    @property
+    def stale_after(self) -> timedelta:
+        """Return how long a snapshot may be served after failed polls."""
+        return timedelta(
+            minutes=self.config_entry.options.get(
+                CONF_STALE_AFTER, DEFAULT_STALE_AFTER
+            )
+        )
+
+    @property
+    def min_write_interval(self) -> timedelta:
+        """Return how long throttled sensors wait between state writes."""
+        return timedelta(
+            minutes=self.config_entry.options.get(
+                CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL
+            )
+        )
+
+    def is_stale(self, snapshot: AlkoDeviceSnapshot) -> bool:
+        """Return True if the snapshot is older than the staleness threshold."""
+        return dt_util.utcnow() - snapshot.last_updated > self.stale_after
+
+    @callback
+    def async_add_descriptions(
+        self, descriptions: Iterable[AlkoEntityDescription]
+    ) -> None:
+        """Register entity descriptions to evaluate on every refresh."""
+        for description in descriptions:
+            self._descriptions[description.key] = description
+
+        # Platforms are set up after the first refresh, so re-evaluate the
+        # current snapshots to make the new values available right away.
+        if self.data is not None:
+            self.data = {
+                thing_name: snapshot.with_descriptions(self._descriptions.values())
+                for thing_name, snapshot in self.data.items()
+            }
+
+    @callback
+    def async_add_device_callback(
+        self, device_callback: Callable[[Iterable[AlkoDeviceSnapshot]], None]
+    ) -> CALLBACK_TYPE:
+        """Call back with devices that were added or gained fields."""
+        self._device_callbacks.append(device_callback)
+
+        @callback
+        def remove_callback() -> None:
+            self._device_callbacks.remove(device_callback)
+
+        return remove_callback
+
+    @callback
+    def async_add_removal_callback(
+        self, removal_callback: Callable[[str], None]
+    ) -> CALLBACK_TYPE:
+        """Call back with the thing name of every device that was removed."""
+        self._removal_callbacks.append(removal_callback)
+
+        @callback
+        def remove_callback() -> None:
+            self._removal_callbacks.remove(removal_callback)
+
+        return remove_callback
+
+    @callback
+    def async_track_devices(self) -> CALLBACK_TYPE:
+        """Start reconciling the fleet after every refresh.
+
+        The listener also keeps the coordinator polling when the account
+        has no devices yet, so a newly paired mower is still picked up.
+        """
+        self._known_devices = {
+            thing_name: _capabilities(snapshot)
+            for thing_name, snapshot in self.data.items()
+        }
+        return self.async_add_listener(self._async_sync_devices)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, timing the entity fan-out."""
+        with self.metrics.time(PHASE_FANOUT):
+            super().async_update_listeners()
+
+    @callback
+    def _async_sync_devices(self) -> None:
+        """Add entities for new devices and remove vanished ones.
+
+        A device is only removed once it has been missing from the device
+        list for DEVICE_REMOVE_AFTER fresh refreshes, polls served from
+        the last good snapshots do not count.
+        """
+        if not self.last_update_success:
+            return
+
+        changed: list[AlkoDeviceSnapshot] = []
+        for thing_name, snapshot in self.data.items():
+            self._missing_devices.pop(thing_name, None)
+            capabilities = _capabilities(snapshot)
+            if self._known_devices.get(thing_name) != capabilities:
+                self._known_devices[thing_name] = capabilities
+                changed.append(snapshot)
+
+        if not self.failed_updates:
+            for thing_name in self._known_devices.keys() - self.data.keys():
+                missing = self._missing_devices.get(thing_name, 0) + 1
+                if missing < DEVICE_REMOVE_AFTER:
+                    self._missing_devices[thing_name] = missing
+                    continue
+                del self._missing_devices[thing_name]
+                del self._known_devices[thing_name]
+                self._async_remove_device(thing_name)
+
+        if changed:
+            _LOGGER.debug(
+                "Adding entities for %s", [s.thing_name for s in changed]
+            )
+            for device_callback in list(self._device_callbacks):
+                device_callback(changed)
+
+    @callback
+    def async_schedule_outbox_flush(self) -> None:
+        """Send queued writes in the background after a fresh refresh.
+
+        Failed polls are served from the last snapshots and still count as
+        successful updates, so only a poll that reached the cloud sends.
+        """
+        if (
+            not self.outbox.pending
+            or not self.last_update_success
+            or self.failed_updates
+        ):
+            return
+        self.config_entry.async_create_background_task(
+            self.hass, self._async_flush_outbox(), "alko outbox flush"
+        )
+
+    async def _async_flush_outbox(self) -> None:
+        """Send queued writes and pick up the resulting state."""
+        if await self.outbox.async_flush(self.data):
+            await self.async_request_refresh()
+
+    @callback
+    def _async_remove_device(self, thing_name: str) -> None:
+        """Detach a device that is no longer on the account."""
+        self.telemetry.pop(thing_name, None)
+        self.battery.pop(thing_name, None)
+        self.anomalies.pop(thing_name, None)
+        self.blade_wear.async_remove(thing_name)
+        self.sessions.async_remove(thing_name)
+        self.outbox.async_remove(thing_name)
+        for removal_callback in list(self._removal_callbacks):
+            removal_callback(thing_name)
+        meta = self._meta.pop(thing_name, None)
+        if meta is None:
+            return
+
+        device_registry = dr.async_get(self.hass)
+        device = device_registry.async_get_device(
+            identifiers={(DOMAIN, meta.thing_name)}
+        )
+        if device is not None:
+            _LOGGER.debug("Removing device %s", thing_name)
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=self.config_entry.entry_id
+            )
+
+    async def _async_update_data(self) -> dict[str, AlkoDeviceSnapshot]:
+        """Fetch data from Alko.
+
+        A failed poll keeps serving the last good snapshots; entities go
+        unavailable on their own once those are older than stale_after.
+        """
+        start = time.perf_counter()
+        # Totals before the fetch, to take out what it spent on requests
+        # and token refreshes and keep only the decoding
+        spent = self._request_time()
+        try:
+            async with async_timeout.timeout(60):
+                await self.alko.get_devices()
+        except AlkoAuthenticationException as exception:
+            raise ConfigEntryAuthFailed from exception
+        except (AlkoException, ClientError, TimeoutError) as exception:
+            if not self.data:
+                raise UpdateFailed(exception) from exception
+
+            self.failed_updates += 1
+            if self.failed_updates == 1:
+                _LOGGER.warning(
+                    "Error fetching AL-KO devices, serving last known state: %s",
+                    exception,
+                )
+            self.update_interval = self._next_interval(self.data)
+            return self.data
+
+        fetch_time = time.perf_counter() - start
+        self.metrics.record(PHASE_FETCH, fetch_time)
+        # Whatever get_devices spent beyond requests and tokens is decoding
+        decode_time = fetch_time - (self._request_time() - spent)
+        self.metrics.record(PHASE_DECODE, max(0, decode_time))
+
+        if self.failed_updates:
+            _LOGGER.info(
+                "Fetching AL-KO devices recovered after %s failed attempts",
+                self.failed_updates,
+            )
+            self.failed_updates = 0
+
+        now = dt_util.utcnow()
+        with self.metrics.time(PHASE_BUILD):
+            snapshots = self._build_snapshots(now)
+            self._record_samples(snapshots, now)
+            self._async_fire_transitions(snapshots, now)
+        self.update_interval = self._next_interval(snapshots)
+        return snapshots
+
+    def _request_time(self) -> float:
+        """Return the seconds spent on requests and token refreshes so far."""
+        totals = self.metrics.totals
+        return totals.get(PHASE_HTTP, 0.0) + totals.get(PHASE_TOKEN, 0.0)
+
+    def _next_interval(self, snapshots: dict[str, AlkoDeviceSnapshot]) -> timedelta:
+        """Return the delay until the next poll.
+
+        The whole fleet comes back in one request, so the most active
+        mower decides how soon that is. Jitter spreads the polls of
+        several instances on one account over the interval.
+        """
+        seconds = UPDATE_INTERVAL
+        if any(
+            snapshot.mower_state in ACTIVE_MOWER_STATES
+            for snapshot in snapshots.values()
+        ):
+            seconds = ACTIVE_UPDATE_INTERVAL
+        seconds *= random.uniform(1 - UPDATE_JITTER, 1 + UPDATE_JITTER)
+        self.interval_history.append((dt_util.utcnow(), round(seconds, 1)))
+        return timedelta(seconds=seconds)
+
+    @property
+    def capabilities(self) -> dict[str, list[str]]:
+        """Return the fields and descriptions each device supports."""
+        return {
+            thing_name: sorted(_capabilities(snapshot))
+            for thing_name, snapshot in (self.data or {}).items()
+        }
+
+    def _build_snapshots(self, now: datetime) -> dict[str, AlkoDeviceSnapshot]:
+        """Build one snapshot per device, reusing unchanged metadata.
+
+        A device that comes back without a reported state keeps its
+        previous snapshot, so a partial response only ages that device.
+        """
+        previous = self.data or {}
+        snapshots: dict[str, AlkoDeviceSnapshot] = {}
+        descriptions = tuple(self._descriptions.values())
+        for device in self.alko.devices:
+            if device.thingName in previous and not _has_reported_state(device):
+                snapshots[device.thingName] = previous[device.thingName]
+                continue
+
+            meta = self._meta.get(device.thingName)
+            if meta is None or not meta.matches(device):
+                meta = self._meta[device.thingName] = AlkoDeviceMeta.from_device(
+                    device
+                )
+            snapshots[device.thingName] = AlkoDeviceSnapshot.from_device(
+                device, meta, now, descriptions
+            )
+        return snapshots
+
+    def _record_samples(
+        self, snapshots: dict[str, AlkoDeviceSnapshot], now: datetime
+    ) -> None:
+        """Feed every device updated in this refresh to telemetry and estimators."""
+        for thing_name, snapshot in snapshots.items():
+            if snapshot.last_updated != now:
+                continue
+            if thing_name not in self.telemetry:
+                buffer = self.telemetry[thing_name] = AlkoTelemetryBuffer()
+                self.battery[thing_name] = AlkoBatteryEstimator(buffer)
+                self.anomalies[thing_name] = AlkoAnomalyDetector(buffer)
+            # The estimators read the sample back from the buffer
+            self.telemetry[thing_name].append(snapshot)
+            self.battery[thing_name].update()
+            self.anomalies[thing_name].update(snapshot)
+            self.blade_wear.async_update(thing_name, self.telemetry[thing_name])
+            self.sessions.async_update(snapshot)
+
+    @callback
+    def _async_fire_transitions(
+        self, snapshots: dict[str, AlkoDeviceSnapshot], now: datetime
+    ) -> None:
+        """Fire events for what changed on every device updated in this refresh."""
+        previous = self.data or {}
+        device_registry = dr.async_get(self.hass)
+        for thing_name, snapshot in snapshots.items():
+            if snapshot.last_updated != now:
+                continue
+            events = anomaly_events(self.anomalies[thing_name].changes)
+            if thing_name in previous:
+                events[:0] = transition_events(previous[thing_name], snapshot)
+            if not events:
+                continue
+            device = device_registry.async_get_device(
+                identifiers={(DOMAIN, snapshot.meta.thing_name)}
+            )
+            for event_type, data in events:
+                self.hass.bus.async_fire(
+                    event_type,
+                    {
+                        "thing_name": thing_name,
+                        "device_id": device and device.id,
+                        **data,
+                    },
+                )
+
+
+def _has_reported_state(device: AlkoDevice) -> bool:
+    """Return True if the device came back with a reported shadow."""
+    thing_state = device.attributes.get("thingState") or {}
+    return bool((thing_state.get("state") or {}).get("reported"))
+
+
+def _capabilities(snapshot: AlkoDeviceSnapshot) -> frozenset[str]:
+    """Return the fields and descriptions a device currently supports."""
+    return frozenset(snapshot.reported).union(snapshot.values)
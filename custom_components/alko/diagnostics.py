@@ -0,0 +1,92 @@
+"""Diagnostics support for AL-KO."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, TO_REDACT
+from .coordinator import AlkoDataUpdateCoordinator
+from .telemetry import AlkoTelemetryBuffer
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: AlkoDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    metrics = coordinator.metrics
+    client = coordinator.client
+    hedge_policy = client.hedge_policy
+
+    return async_redact_data(
+        {
+            "entry": {
+                "data": dict(entry.data),
+                "options": dict(entry.options),
+            },
+            "coordinator": {
+                "last_update_success": coordinator.last_update_success,
+                "failed_updates": coordinator.failed_updates,
+                "update_interval": coordinator.update_interval.total_seconds(),
+                "interval_history": [
+                    {"time": when.isoformat(), "seconds": seconds}
+                    for when, seconds in coordinator.interval_history
+                ],
+            },
+            "circuit_breaker": {
+                "open": client.breaker.is_open,
+                "failures": client.breaker.failures,
+                "retry_in": round(client.breaker.retry_in),
+            },
+            "hedging": None
+            if hedge_policy is None
+            else {
+                "delay": hedge_policy.delay,
+                "hedged": hedge_policy.hedged,
+                "hedge_wins": hedge_policy.hedge_wins,
+            },
+            "capture": None
+            if client.recorder is None
+            else {"path": client.recorder.path, "records": client.recorder.records},
+            "metrics": {
+                "timings": {
+                    phase: metrics.summary(phase) for phase in metrics.timings
+                },
+                "requests": metrics.requests,
+                "request_errors": metrics.request_errors,
+                "bytes_received": metrics.bytes_received,
+                "commands": metrics.commands,
+                "command_errors": metrics.command_errors,
+            },
+            "requests": list(metrics.request_log),
+            "capabilities": coordinator.capabilities,
+            "outbox": dict(coordinator.outbox.pending),
+            "devices": {
+                thing_name: {
+                    "last_updated": snapshot.last_updated.isoformat(),
+                    "stale": coordinator.is_stale(snapshot),
+                    "telemetry": _telemetry(coordinator.telemetry.get(thing_name)),
+                    "attributes": snapshot.device.attributes.get("thingAttributes"),
+                    "reported": dict(snapshot.reported),
+                }
+                for thing_name, snapshot in coordinator.data.items()
+            },
+        },
+        TO_REDACT,
+    )
+
+
+def _telemetry(buffer: AlkoTelemetryBuffer | None) -> dict[str, Any] | None:
+    """Summarize the telemetry held for a device."""
+    if buffer is None:
+        return None
+    return {
+        "samples": len(buffer),
+        "capacity": buffer.capacity,
+        "span_hours": round(buffer.span / 3600, 2),
+        "bytes": buffer.nbytes,
+    }
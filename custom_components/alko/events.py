@@ -0,0 +1,114 @@
+"""Typed events for transitions between AL-KO snapshots."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .snapshot import AlkoDeviceSnapshot
+
+EVENT_STATE_TRANSITION = "alko_state_transition"
+EVENT_ERROR_RAISED = "alko_error_raised"
+EVENT_ERROR_CLEARED = "alko_error_cleared"
+EVENT_LOCK_CHANGED = "alko_lock_changed"
+EVENT_CONNECTION_CHANGED = "alko_connection_changed"
+EVENT_FLAG_CHANGED = "alko_flag_changed"
+EVENT_ANOMALY_DETECTED = "alko_anomaly_detected"
+EVENT_ANOMALY_CLEARED = "alko_anomaly_cleared"
+
+# Reported fields compared between snapshots, the operation state decides
+# whether a state transition is fired and the others ride along in its diff
+TRACKED_FIELDS = (
+    "operationState",
+    "operationSubState",
+    "operationSituation",
+)
+
+
+def field_diff(
+    previous: AlkoDeviceSnapshot, current: AlkoDeviceSnapshot
+) -> dict[str, list[Any]]:
+    """Return the tracked fields and situation flags that changed.
+
+    Each change is a [previous, current] pair, situation flags are keyed
+    by their flag name.
+    """
+    diff = {
+        key: [previous.get(key), current.get(key)]
+        for key in TRACKED_FIELDS
+        if previous.get(key) != current.get(key)
+    }
+    for flag in previous.situation_flags.keys() | current.situation_flags.keys():
+        if previous.flag(flag) != current.flag(flag):
+            diff[flag] = [previous.flag(flag), current.flag(flag)]
+    return diff
+
+
+def transition_events(
+    previous: AlkoDeviceSnapshot, current: AlkoDeviceSnapshot
+) -> list[tuple[str, dict[str, Any]]]:
+    """Return the events for the step from one snapshot of a device to the next.
+
+    Event data holds flat values so automations can match on them, e.g.
+    an event trigger on alko_flag_changed with flag rainDetected and
+    value true.
+    """
+    diff = field_diff(previous, current)
+    events: list[tuple[str, dict[str, Any]]] = []
+
+    if "operationState" in diff:
+        events.append(
+            (
+                EVENT_STATE_TRANSITION,
+                {
+                    "from_state": previous.get("operationState"),
+                    "to_state": current.get("operationState"),
+                    "from_mower_state": previous.mower_state,
+                    "to_mower_state": current.mower_state,
+                    "diff": diff,
+                },
+            )
+        )
+
+    if previous.has_error != current.has_error or (
+        current.has_error
+        and previous.operation_error.get("code") != current.operation_error.get("code")
+    ):
+        if previous.has_error:
+            events.append((EVENT_ERROR_CLEARED, _error(previous)))
+        if current.has_error:
+            events.append((EVENT_ERROR_RAISED, _error(current)))
+
+    if previous.is_locked != current.is_locked:
+        events.append((EVENT_LOCK_CHANGED, {"locked": current.is_locked}))
+
+    if previous.is_connected != current.is_connected:
+        events.append((EVENT_CONNECTION_CHANGED, {"connected": current.is_connected}))
+
+    for flag, (old, new) in diff.items():
+        if flag not in TRACKED_FIELDS:
+            events.append(
+                (EVENT_FLAG_CHANGED, {"flag": flag, "value": new, "previous": old})
+            )
+    return events
+
+
+def anomaly_events(
+    changes: list[tuple[str, bool]],
+) -> list[tuple[str, dict[str, Any]]]:
+    """Return the events for anomalies that were detected or cleared."""
+    return [
+        (
+            EVENT_ANOMALY_DETECTED if detected else EVENT_ANOMALY_CLEARED,
+            {"anomaly": name},
+        )
+        for name, detected in changes
+    ]
+
+
+def _error(snapshot: AlkoDeviceSnapshot) -> dict[str, Any]:
+    """Return the event data describing the operation error of a snapshot."""
+    return {
+        "code": snapshot.operation_error.get("code"),
+        "type": snapshot.operation_error.get("type"),
+        "description": snapshot.operation_error.get("description"),
+    }
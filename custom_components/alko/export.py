@@ -0,0 +1,99 @@
+"""Export the reported state of an AL-KO fleet as NDJSON."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from datetime import datetime
+import gzip
+import json
+import logging
+import os
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .snapshot import AlkoDeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Size an export file grows to before it is rotated, and the number of
+# rotated files kept next to it
+EXPORT_MAX_BYTES = 20 * 1024 * 1024
+EXPORT_BACKUPS = 3
+
+
+class AlkoFleetExporter:
+    """Append one line per device snapshot to an export file.
+
+    Lines are serialized and appended in the executor, a compressed
+    export gets one more gzip member per run, so the cost of a run only
+    depends on the fleet size and never on what was exported before.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the exporter."""
+        self.hass = hass
+        self.base_path = hass.config.path(f"alko_export_{entry.entry_id}.ndjson")
+        self.exports = 0
+        self._lock = asyncio.Lock()
+
+    async def async_export(
+        self,
+        snapshots: Mapping[str, AlkoDeviceSnapshot],
+        now: datetime,
+        compress: bool = True,
+    ) -> dict[str, Any]:
+        """Append the snapshots of all devices and return where they went."""
+        path = f"{self.base_path}.gz" if compress else self.base_path
+        # Snapshots are never changed once built, the executor only reads them
+        rows = [
+            {
+                "exported": now.isoformat(),
+                "thing_name": thing_name,
+                "last_updated": snapshot.last_updated.isoformat(),
+                "mower_state": snapshot.mower_state,
+                "reported": snapshot.reported,
+            }
+            for thing_name, snapshot in snapshots.items()
+        ]
+        async with self._lock:
+            written, rotated = await self.hass.async_add_executor_job(
+                _append, path, rows, compress
+            )
+        self.exports += 1
+        _LOGGER.debug("Exported %s AL-KO devices to %s", len(rows), path)
+        return {
+            "path": path,
+            "devices": len(rows),
+            "bytes": written,
+            "rotated": rotated,
+        }
+
+
+def _append(path: str, rows: list[dict[str, Any]], compress: bool) -> tuple[int, bool]:
+    """Append rows to an export file, rotating it first when it is full."""
+    rotated = _rotate(path)
+    data = "".join(
+        json.dumps(row, separators=(",", ":"), default=dict) + "\n" for row in rows
+    ).encode()
+    if compress:
+        data = gzip.compress(data)
+    with open(path, "ab") as file:
+        file.write(data)
+    return len(data), rotated
+
+
+def _rotate(path: str) -> bool:
+    """Shift a full export file to .1, .2 and so on, dropping the oldest."""
+    try:
+        if os.path.getsize(path) < EXPORT_MAX_BYTES:
+            return False
+    except FileNotFoundError:
+        return False
+    for index in range(EXPORT_BACKUPS - 1, 0, -1):
+        if os.path.exists(f"{path}.{index}"):
+            os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+    os.replace(path, f"{path}.1")
+    return True
@@ -1,27 +1,38 @@
 """Support for AL-KO mower platform."""
+from collections.abc import Callable
+from datetime import datetime, timedelta
 import logging
 from typing import Any
 import json
 
 import voluptuous as vol
 
-from pyalko import Alko
 from pyalko.exceptions import AlkoException
-from pyalko.objects.device import AlkoDevice
 
+from homeassistant.components import persistent_notification
 from homeassistant.components.lawn_mower import (
     LawnMowerEntity,
     LawnMowerEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers import entity_platform
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
-from . import AlkoDeviceEntity
+from . import AlkoDeviceEntity, async_add_device_entities
 from .const import DOMAIN
+from .coordinator import AlkoDataUpdateCoordinator
+from .schedule import device_state, next_operations, schedule
+from .sessions import AlkoSessionLog, session_report
+from .snapshot import AlkoDeviceSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,18 +41,15 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the AL-KO mower platform based on a config entry."""
-    coordinator: DataUpdateCoordinator[Alko] = hass.data[DOMAIN][entry.entry_id]
-
-    entities = []
+    coordinator: AlkoDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    for device in coordinator.data.devices:
+    def _mowers(snapshot: AlkoDeviceSnapshot) -> list[AlkoMower]:
         # Only add mower entities for devices that have operation state
-        if device.thingState.state.reported.operationState is not None:
-            entities.append(
-                AlkoMower(coordinator, device)
-            )
+        if snapshot.get("operationState") is not None:
+            return [AlkoMower(coordinator, snapshot)]
+        return []
 
-    async_add_entities(entities, True)
+    async_add_device_entities(coordinator, entry, async_add_entities, _mowers)
 
     # Register services
     platform = entity_platform.async_get_current_platform()
@@ -79,6 +87,40 @@ async def async_setup_entry(
         {},
         "async_show_device_state",
     )
+    platform.async_register_entity_service(
+        "get_device_state",
+        {},
+        "async_get_device_state",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        "get_schedule",
+        {},
+        "async_get_schedule",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        "get_next_operations",
+        {
+            vol.Optional("days", default=7): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=28)
+            ),
+        },
+        "async_get_next_operations",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        "get_mowing_sessions",
+        {
+            vol.Optional("start"): cv.datetime,
+            vol.Optional("end"): cv.datetime,
+            vol.Optional("group_by", default="session"): vol.In(
+                ["session", "day", "week"]
+            ),
+        },
+        "async_get_mowing_sessions",
+        supports_response=SupportsResponse.ONLY,
+    )
 
 
 class AlkoMower(AlkoDeviceEntity, LawnMowerEntity):
@@ -93,46 +135,18 @@ class AlkoMower(AlkoDeviceEntity, LawnMowerEntity):
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
+        coordinator: AlkoDataUpdateCoordinator,
+        snapshot: AlkoDeviceSnapshot,
     ) -> None:
         """Initialize AL-KO mower."""
         super().__init__(
             coordinator,
-            device,
+            snapshot,
             "mower",
             "Mower",
         )
-        self._state = self._get_state_from_device()
-
-    def _get_state_from_device(self) -> str:
-        """Get state from device."""
-        if not self.device.thingState.state.reported.isConnected:
-            return "unavailable"
-
-        if self.device.thingState.state.reported.operationError.code != 999:
-            return "error"
-
-        state = self.device.thingState.state.reported.operationState
-        substate = self.device.thingState.state.reported.operationSubState
-        situation = self.device.thingState.state.reported.operationSituation
-
-        # Check if mower is locked
-        if substate == "LOCKED_PIN" or situation == "OPERATION_NOT_PERMITTED_LOCKED":
-            return "error"
-
-        if state == "IDLE":
-            return "paused"
-        if state == "WORKING":
-            return "mowing"
-        if state == "HOMING":
-            return "returning"
-        if state == "CHARGING":
-            return "docked"
-        if state == "IDLE_BASE_STATION":
-            return "docked"
-
-        return "unknown"
+        self._state = snapshot.mower_state
+        self._responses: tuple[AlkoDeviceSnapshot, dict[str, Any]] | None = None
 
     @property
     def state(self) -> str:
@@ -142,25 +156,28 @@ class AlkoMower(AlkoDeviceEntity, LawnMowerEntity):
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
-        self._state = self._get_state_from_device()
+        self._state = self.snapshot.mower_state
 
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._state = self._get_state_from_device()
-        self.async_schedule_update_ha_state()
+    @callback
+    def _async_update_from_snapshot(self, snapshot: AlkoDeviceSnapshot) -> None:
+        """Take the mower state from a new snapshot."""
+        self._state = snapshot.mower_state
 
     async def async_start_mowing(self) -> None:
         """Start mowing."""
         try:
             # Check if mower is locked
-            if (self.device.thingState.state.reported.operationSubState == "LOCKED_PIN" or
-                    self.device.thingState.state.reported.operationSituation == "OPERATION_NOT_PERMITTED_LOCKED"):
+            if self.snapshot.is_locked:
                 _LOGGER.error("Cannot start mower: Mower is locked")
                 return
 
             # Make API call first
             rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, operationState="WORKING", rtc=rtc)
+            if not await self._update_device(
+                self.device, operationState="WORKING", rtc=rtc
+            ):
+                # Queued, keep showing what the mower reports
+                return
             await self.coordinator.async_refresh()
 
             # Update state last
@@ -174,7 +191,11 @@ class AlkoMower(AlkoDeviceEntity, LawnMowerEntity):
         try:
             # Make API call first
             rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, operationState="IDLE", rtc=rtc)
+            if not await self._update_device(
+                self.device, operationState="IDLE", rtc=rtc
+            ):
+                # Queued, keep showing what the mower reports
+                return
             await self.coordinator.async_refresh()
 
             # Update state last
@@ -188,7 +209,11 @@ class AlkoMower(AlkoDeviceEntity, LawnMowerEntity):
         try:
             # Make API call first
             rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, operationState="HOMING", rtc=rtc)
+            if not await self._update_device(
+                self.device, operationState="HOMING", rtc=rtc
+            ):
+                # Queued, keep showing what the mower reports
+                return
             await self.coordinator.async_refresh()
 
             # Update state last
@@ -276,16 +301,55 @@ class AlkoMower(AlkoDeviceEntity, LawnMowerEntity):
 
     async def async_show_device_state(self) -> None:
         """Show the current device state as a notification."""
-        try:
-            state_data = self.device.thingState.state.reported.__dict__
-            await self.hass.services.async_call(
-                "persistent_notification",
-                "create",
-                {
-                    "title": "AL-KO Device State",
-                    "message": f"```json\n{json.dumps(state_data, indent=2)}\n```",
-                },
-            )
-            _LOGGER.info("Device state shown in notification")
-        except Exception as e:
-            _LOGGER.error("Failed to show device state: %s", e)
+        state_data = self._response("device_state", device_state)["reported"]
+        persistent_notification.async_create(
+            self.hass,
+            f"```json\n{json.dumps(state_data, indent=2)}\n```",
+            title="AL-KO Device State",
+        )
+
+    async def async_get_device_state(self) -> ServiceResponse:
+        """Return the current device state and reported shadow."""
+        return self._response("device_state", device_state)
+
+    async def async_get_schedule(self) -> ServiceResponse:
+        """Return the weekly mowing schedule and manual mowing."""
+        return self._response("schedule", schedule)
+
+    async def async_get_next_operations(self, days: int) -> ServiceResponse:
+        """Return the mowing operations of the coming days."""
+        return {"operations": next_operations(self.snapshot, dt_util.now(), days)}
+
+    def _response(
+        self, name: str, build: Callable[[AlkoDeviceSnapshot], dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Return response data built once per snapshot."""
+        snapshot = self.snapshot
+        if self._responses is None or self._responses[0] is not snapshot:
+            self._responses = (snapshot, {})
+        responses = self._responses[1]
+        if name not in responses:
+            responses[name] = build(snapshot)
+        return responses[name]
+
+    async def async_get_mowing_sessions(
+        self,
+        group_by: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> ServiceResponse:
+        """Return the mowing sessions of a period, a week by default."""
+        end = _aware(end) if end is not None else dt_util.now()
+        start = _aware(start) if start is not None else end - timedelta(days=7)
+        if start >= end:
+            raise ServiceValidationError("The start must be before the end")
+
+        log = self.coordinator.sessions.logs.get(self.thing_name) or AlkoSessionLog()
+        return session_report(log, start, end, group_by)
+
+
+def _aware(value: datetime) -> datetime:
+    """Return a datetime in the local time zone if it has none."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.get_default_time_zone())
+    return value
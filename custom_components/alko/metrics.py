@@ -0,0 +1,103 @@
+"""Request and refresh instrumentation for the AL-KO integration."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+import time
+from typing import Any
+
+# Phases timed on every refresh or command
+PHASE_TOKEN = "token"
+PHASE_HTTP = "http"
+PHASE_DECODE = "decode"
+PHASE_BUILD = "build"
+PHASE_FANOUT = "fanout"
+PHASE_FETCH = "fetch"
+PHASE_COMMAND = "command"
+
+# Requests kept for the diagnostics download
+REQUEST_LOG_SIZE = 50
+
+
+class RollingHistogram:
+    """Keep the most recent samples and answer percentile queries."""
+
+    def __init__(self, size: int = 256) -> None:
+        """Initialize the histogram."""
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self.samples)
+
+    @property
+    def last(self) -> float | None:
+        """Return the most recent sample."""
+        return self.samples[-1] if self.samples else None
+
+    def add(self, value: float) -> None:
+        """Add a sample, dropping the oldest once the window is full."""
+        self.samples.append(value)
+
+    def percentile(self, percentile: float) -> float | None:
+        """Return the nearest-rank percentile of the window."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[round(percentile / 100 * (len(ordered) - 1))]
+
+
+class AlkoMetrics:
+    """Per config entry timings and counters."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.timings: dict[str, RollingHistogram] = {}
+        self.totals: dict[str, float] = {}
+        self.requests = 0
+        self.request_errors = 0
+        self.bytes_received = 0
+        self.commands = 0
+        self.command_errors = 0
+        self.request_log: deque[dict[str, Any]] = deque(maxlen=REQUEST_LOG_SIZE)
+
+    def histogram(self, phase: str) -> RollingHistogram:
+        """Return the histogram of a phase."""
+        if phase not in self.timings:
+            self.timings[phase] = RollingHistogram()
+        return self.timings[phase]
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Record the duration of a phase."""
+        self.histogram(phase).add(seconds)
+        self.totals[phase] = self.totals.get(phase, 0.0) + seconds
+
+    def log_request(self, **request: Any) -> None:
+        """Remember a request, dropping the oldest once the log is full."""
+        self.request_log.append(request)
+
+    @contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """Time the wrapped block, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def summary(self, phase: str) -> dict[str, float | int | None]:
+        """Return p50/p95/p99 of a phase in milliseconds."""
+        histogram = self.histogram(phase)
+        return {
+            "p50": _ms(histogram.percentile(50)),
+            "p95": _ms(histogram.percentile(95)),
+            "p99": _ms(histogram.percentile(99)),
+            "samples": len(histogram),
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Convert seconds to rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
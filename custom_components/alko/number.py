@@ -1,223 +1,137 @@
 """Support for AL-KO number platform."""
+from __future__ import annotations
+
+from dataclasses import dataclass
 import logging
+from typing import Any
 
-from pyalko import Alko
 from pyalko.exceptions import AlkoException
-from pyalko.objects.device import AlkoDevice
 
 from homeassistant.components.number import (
     NumberEntity,
+    NumberEntityDescription,
     NumberMode,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTime, UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from . import AlkoDeviceEntity
+from . import AlkoDescriptionEntity, async_add_device_entities
 from .const import DOMAIN
+from .coordinator import AlkoDataUpdateCoordinator
+from .snapshot import AlkoEntityDescription
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class AlkoNumberEntityDescription(AlkoEntityDescription, NumberEntityDescription):
+    """Describes an AL-KO number."""
+
+    # Desired state field written when the value is set
+    update_key: str
+
+
+def _as_float(value: Any) -> float | None:
+    """Return the reported value as a float."""
+    return None if value is None else float(value)
+
+
+def _field_description(
+    key: str, name: str, field: str, **kwargs
+) -> AlkoNumberEntityDescription:
+    """Describe a number backed by a reported field."""
+    return AlkoNumberEntityDescription(
+        key=key,
+        name=name,
+        update_key=field,
+        native_step=1,
+        value_fn=lambda snapshot: _as_float(snapshot.get(field)),
+        exists_fn=lambda snapshot: snapshot.has(field),
+        **kwargs,
+    )
+
+
+NUMBERS: tuple[AlkoNumberEntityDescription, ...] = (
+    _field_description(
+        "rain_sensitivity",
+        "Rain Sensitivity",
+        "rainSensitivity",
+        icon="mdi:water-percent",
+        native_min_value=1,
+        native_max_value=10,
+        mode=NumberMode.SLIDER,
+    ),
+    _field_description(
+        "rain_delay",
+        "Rain Delay",
+        "rainDelay",
+        icon="mdi:timer-outline",
+        native_min_value=0,
+        native_max_value=240,  # Assuming 4 hours max, adjust if needed
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        mode=NumberMode.BOX,
+    ),
+    _field_description(
+        "frost_threshold",
+        "Frost Threshold",
+        "frostThreshold",
+        icon="mdi:snowflake-thermometer",
+        native_min_value=-10,  # Assuming minimum temperature, adjust if needed
+        native_max_value=10,  # Assuming maximum temperature, adjust if needed
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        mode=NumberMode.BOX,
+    ),
+    _field_description(
+        "frost_delay",
+        "Frost Delay",
+        "frostDelay",
+        icon="mdi:timer",
+        native_min_value=0,
+        native_max_value=240,  # Assuming 4 hours max, adjust if needed
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        mode=NumberMode.BOX,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the AL-KO number platform based on a config entry."""
-    coordinator: DataUpdateCoordinator[Alko] = hass.data[DOMAIN][entry.entry_id]
-
-    entities = []
-
-    for device in coordinator.data.devices:
-        cls_list = []
-        if device.thingState.state.reported is not None:
-            # Check if device supports rain sensitivity
-            if hasattr(device.thingState.state.reported, "rainSensitivity"):
-                cls_list.append(AlkoRainSensitivity)
-            # Check if device supports rain delay
-            if hasattr(device.thingState.state.reported, "rainDelay"):
-                cls_list.append(AlkoRainDelay)
-            # Check if device supports frost threshold
-            if hasattr(device.thingState.state.reported, "frostThreshold"):
-                cls_list.append(AlkoFrostThreshold)
-            # Check if device supports frost delay
-            if hasattr(device.thingState.state.reported, "frostDelay"):
-                cls_list.append(AlkoFrostDelay)
-
-        for cls in cls_list:
-            entities.append(
-                cls(
-                    coordinator,
-                    device,
-                )
-            )
-
-    async_add_entities(entities, True)
-
-
-class AlkoRainSensitivity(AlkoDeviceEntity, NumberEntity):
-    """Defines an AL-KO rain sensitivity number."""
-
-    _attr_icon = "mdi:water-percent"
-    _attr_native_min_value = 1
-    _attr_native_max_value = 10
-    _attr_native_step = 1
-    _attr_mode = NumberMode.SLIDER
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO rain sensitivity number."""
-        super().__init__(
-            coordinator,
-            device,
-            "rain_sensitivity",
-            "Rain Sensitivity",
-        )
-
-    @property
-    def native_value(self) -> float:
-        """Return the current rain sensitivity value."""
-        return float(self.device.thingState.state.reported.rainSensitivity)
+    coordinator: AlkoDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_add_descriptions(NUMBERS)
 
-    async def async_set_native_value(self, value: float) -> None:
-        """Set the value."""
-        try:
-            # Make API call first
-            await self._update_device(self.device, rainSensitivity=int(value))
-            await self.coordinator.async_refresh()
+    async_add_device_entities(
+        coordinator,
+        entry,
+        async_add_entities,
+        lambda snapshot: (
+            AlkoNumber(coordinator, snapshot, description)
+            for description in NUMBERS
+            if snapshot.supports(description)
+        ),
+    )
 
-            # Update state immediately
-            self._value = value
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error("Failed to set value: %s", exception)
 
+class AlkoNumber(AlkoDescriptionEntity, NumberEntity):
+    """Defines an AL-KO number."""
 
-class AlkoRainDelay(AlkoDeviceEntity, NumberEntity):
-    """Defines an AL-KO rain delay number."""
-
-    _attr_icon = "mdi:timer-outline"
-    _attr_native_min_value = 0
-    _attr_native_max_value = 240  # Assuming 4 hours max, adjust if needed
-    _attr_native_step = 1
-    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
-    _attr_mode = NumberMode.BOX
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO rain delay number."""
-        super().__init__(
-            coordinator,
-            device,
-            "rain_delay",
-            "Rain Delay",
-        )
+    entity_description: AlkoNumberEntityDescription
 
     @property
-    def native_value(self) -> float:
-        """Return the current rain delay value."""
-        return float(self.device.thingState.state.reported.rainDelay)
+    def native_value(self) -> float | None:
+        """Return the current value."""
+        return self.value
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the value."""
         try:
             # Make API call first
-            await self._update_device(self.device, rainDelay=int(value))
-            await self.coordinator.async_refresh()
-
-            # Update state immediately
-            self._value = value
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error("Failed to set value: %s", exception)
-
-
-class AlkoFrostThreshold(AlkoDeviceEntity, NumberEntity):
-    """Defines an AL-KO frost threshold number."""
-
-    _attr_icon = "mdi:snowflake-thermometer"
-    _attr_native_min_value = -10  # Assuming minimum temperature, adjust if needed
-    _attr_native_max_value = 10   # Assuming maximum temperature, adjust if needed
-    _attr_native_step = 1
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_mode = NumberMode.BOX
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO frost threshold number."""
-        super().__init__(
-            coordinator,
-            device,
-            "frost_threshold",
-            "Frost Threshold",
-        )
-
-    @property
-    def native_value(self) -> float:
-        """Return the current frost threshold value."""
-        return float(self.device.thingState.state.reported.frostThreshold)
-
-    async def async_set_native_value(self, value: float) -> None:
-        """Set the value."""
-        try:
-            # Make API call first
-            await self._update_device(self.device, frostThreshold=int(value))
-            await self.coordinator.async_refresh()
-
-            # Update state immediately
-            self._value = value
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error("Failed to set value: %s", exception)
-
-
-class AlkoFrostDelay(AlkoDeviceEntity, NumberEntity):
-    """Defines an AL-KO frost delay number."""
-
-    _attr_icon = "mdi:timer"
-    _attr_native_min_value = 0
-    _attr_native_max_value = 240  # Assuming 4 hours max, adjust if needed
-    _attr_native_step = 1
-    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
-    _attr_mode = NumberMode.BOX
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO frost delay number."""
-        super().__init__(
-            coordinator,
-            device,
-            "frost_delay",
-            "Frost Delay",
-        )
-
-    @property
-    def native_value(self) -> float:
-        """Return the current frost delay value."""
-        return float(self.device.thingState.state.reported.frostDelay)
-
-    async def async_set_native_value(self, value: float) -> None:
-        """Set the value."""
-        try:
-            # Make API call first
-            await self._update_device(self.device, frostDelay=int(value))
+            await self._update_device(
+                self.device, **{self.entity_description.update_key: int(value)}
+            )
             await self.coordinator.async_refresh()
-
-            # Update state immediately
-            self._value = value
-            self.async_write_ha_state()
         except AlkoException as exception:
             _LOGGER.error("Failed to set value: %s", exception)
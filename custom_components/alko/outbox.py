@@ -0,0 +1,187 @@
+"""Durable outbox for AL-KO desired state writes."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from copy import deepcopy
+import logging
+from types import MappingProxyType
+from typing import Any
+
+from aiohttp import ClientError
+from pyalko import Alko
+from pyalko.exceptions import AlkoException
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import is_outage
+from .const import DOMAIN
+from .snapshot import AlkoDeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 1
+
+# Seconds a queued setting is kept before it is dropped as outdated
+INTENT_TTL = 6 * 3600
+
+# Commands that only make sense right away, and the seconds they may be
+# sent late before they are dropped instead of replayed
+ONE_SHOT_KEYS = frozenset({"operationState", "manualMowing", "resetBladesService"})
+ONE_SHOT_TTL = 300
+
+
+def _store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict[str, Any]]:
+    """Return the store holding the outbox of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.outbox")
+
+
+async def async_remove_outbox(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persisted outbox of a config entry."""
+    await _store(hass, entry).async_remove()
+
+
+def merge_payload(pending: dict[str, Any], update: Mapping[str, Any]) -> None:
+    """Merge a desired state write into a pending one, newest value wins."""
+    for key, value in update.items():
+        if isinstance(value, Mapping) and isinstance(pending.get(key), dict):
+            merge_payload(pending[key], value)
+        else:
+            pending[key] = deepcopy(value)
+
+
+class AlkoCommandOutbox:
+    """Hold writes per device while the device or the cloud is unreachable.
+
+    Writes to the same device are merged into one desired state payload,
+    so a later intent replaces an earlier one for the same field. Each
+    field expires on its own, one-shot commands after ONE_SHOT_TTL and
+    settings after INTENT_TTL. The payloads are persisted and sent once
+    per device when it is back.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, alko: Alko) -> None:
+        """Initialize the outbox."""
+        self._alko = alko
+        self._store = _store(hass, entry)
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._queued: dict[str, dict[str, float]] = {}
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> Mapping[str, Mapping[str, Any]]:
+        """Return the queued payloads by thing name."""
+        return MappingProxyType(self._pending)
+
+    def has_pending(self, thing_name: str) -> bool:
+        """Return True if writes are queued for the device."""
+        return thing_name in self._pending
+
+    async def async_load(self) -> None:
+        """Load writes queued before a restart."""
+        data = await self._store.async_load() or {}
+        self._pending = data.get("pending") or {}
+        self._queued = data.get("queued") or {}
+        self._expire(dt_util.utcnow().timestamp())
+        if self._pending:
+            _LOGGER.debug("Loaded queued writes for %s", list(self._pending))
+
+    @callback
+    def async_queue(self, thing_name: str, payload: Mapping[str, Any]) -> None:
+        """Queue a write, merging it with earlier writes to the device."""
+        # The mower clock is set again when the write is actually sent
+        payload = {key: value for key, value in payload.items() if key != "rtc"}
+        _LOGGER.warning(
+            "Queued %s for %s until AL-KO and the device are reachable",
+            ", ".join(payload),
+            thing_name,
+        )
+        merge_payload(self._pending.setdefault(thing_name, {}), payload)
+        now = dt_util.utcnow().timestamp()
+        self._queued.setdefault(thing_name, {}).update(dict.fromkeys(payload, now))
+        self._async_save()
+
+    @callback
+    def async_remove(self, thing_name: str) -> None:
+        """Drop the queued writes of a device that left the account."""
+        if self._pending.pop(thing_name, None) is not None:
+            _LOGGER.warning("Dropping queued writes for %s, device is gone", thing_name)
+            self._queued.pop(thing_name, None)
+            self._async_save()
+
+    async def async_flush(self, snapshots: Mapping[str, AlkoDeviceSnapshot]) -> bool:
+        """Send one merged write per reachable device.
+
+        Returns True if anything was sent.
+        """
+        if not self._pending or self._flush_lock.locked():
+            return False
+
+        sent = False
+        async with self._flush_lock:
+            self._expire(dt_util.utcnow().timestamp())
+            for thing_name in list(self._pending):
+                snapshot = snapshots.get(thing_name)
+                # A device missing from one refresh may be back in the next,
+                # its writes are dropped once the device is removed
+                if snapshot is None or snapshot.is_offline:
+                    continue
+
+                payload = self._pending.pop(thing_name)
+                queued = self._queued.pop(thing_name, {})
+                rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
+                try:
+                    await self._alko.update_device(snapshot.device, rtc=rtc, **payload)
+                except (AlkoException, ClientError, TimeoutError) as exception:
+                    if is_outage(exception):
+                        # Keep the write, merged under anything queued meanwhile
+                        merge_payload(payload, self._pending.get(thing_name, {}))
+                        self._pending[thing_name] = payload
+                        queued.update(self._queued.get(thing_name, {}))
+                        self._queued[thing_name] = queued
+                        break
+                    _LOGGER.error(
+                        "Dropping queued writes for %s: %s", thing_name, exception
+                    )
+                else:
+                    _LOGGER.debug("Sent queued writes for %s: %s", thing_name, payload)
+                    sent = True
+
+            self._async_save()
+        return sent
+
+    def _expire(self, now: float) -> None:
+        """Drop queued fields that are too old to be sent."""
+        for thing_name in list(self._pending):
+            payload = self._pending[thing_name]
+            queued = self._queued.setdefault(thing_name, {})
+            expired = [
+                key
+                for key in payload
+                if now - queued.get(key, 0)
+                > (ONE_SHOT_TTL if key in ONE_SHOT_KEYS else INTENT_TTL)
+            ]
+            if expired:
+                _LOGGER.warning(
+                    "Dropping queued %s for %s, queued too long ago",
+                    ", ".join(expired),
+                    thing_name,
+                )
+            for key in expired:
+                del payload[key]
+                queued.pop(key, None)
+            if not payload:
+                del self._pending[thing_name]
+                del self._queued[thing_name]
+
+    @callback
+    def _async_save(self) -> None:
+        """Persist the queued writes and when each field was queued."""
+        self._store.async_delay_save(
+            lambda: {"pending": self._pending, "queued": self._queued}, SAVE_DELAY
+        )
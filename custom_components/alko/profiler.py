@@ -0,0 +1,93 @@
+"""On-demand profiling of AL-KO coordinator cycles."""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .coordinator import AlkoDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Functions listed in the service response
+TOP_FUNCTIONS = 15
+
+
+async def async_profile_refresh(
+    hass: HomeAssistant, coordinator: AlkoDataUpdateCoordinator, cycles: int
+) -> dict[str, Any]:
+    """Profile a number of coordinator refreshes and write the results.
+
+    The profiler covers the whole event loop while it runs, so entity
+    updates and any command sent meanwhile are attributed as well.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as exception:
+        # Only one profiler can be active per interpreter
+        raise HomeAssistantError(f"Cannot start profiler: {exception}") from exception
+
+    start = time.perf_counter()
+    try:
+        for _ in range(cycles):
+            await coordinator.async_refresh()
+    finally:
+        profiler.disable()
+    duration = time.perf_counter() - start
+
+    base_path = hass.config.path(
+        f"alko_profile_{dt_util.utcnow().strftime('%Y%m%d_%H%M%S')}"
+    )
+    functions = await hass.async_add_executor_job(_write_results, profiler, base_path)
+    _LOGGER.info("Wrote AL-KO profile to %s.pstats", base_path)
+
+    return {
+        "cycles": cycles,
+        "duration_ms": round(duration * 1000, 1),
+        "pstats": f"{base_path}.pstats",
+        "collapsed": f"{base_path}.collapsed",
+        "functions": functions,
+    }
+
+
+def _write_results(profiler: cProfile.Profile, base_path: str) -> list[dict[str, Any]]:
+    """Write pstats and collapsed stacks, return the hottest functions."""
+    profiler.dump_stats(f"{base_path}.pstats")
+    stats = pstats.Stats(profiler)
+
+    # cProfile only records caller/callee pairs, so each stack is two frames
+    with open(f"{base_path}.collapsed", "w", encoding="utf-8") as file:
+        for function, (_, _, _, _, callers) in stats.stats.items():
+            for caller, (_, _, tottime, _) in callers.items():
+                microseconds = round(tottime * 1_000_000)
+                if microseconds:
+                    file.write(
+                        f"{_label(caller)};{_label(function)} {microseconds}\n"
+                    )
+
+    hottest = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [
+        {
+            "function": _label(function),
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 2),
+            "cumtime_ms": round(cumtime * 1000, 2),
+        }
+        for function, (_, calls, tottime, cumtime, _) in hottest[:TOP_FUNCTIONS]
+    ]
+
+
+def _label(function: tuple[str, int, str]) -> str:
+    """Return a readable frame label for a pstats function key."""
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{filename}:{line}({name})"
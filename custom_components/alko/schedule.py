@@ -0,0 +1,133 @@
+"""Plain data views of an AL-KO snapshot for service responses."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from .const import DAYS_OF_WEEK
+from .snapshot import AlkoDeviceSnapshot
+
+WINDOWS = ("window_1", "window_2")
+
+
+def plain(value: Any) -> Any:
+    """Return a copy of shadow data made of plain dicts and lists."""
+    if isinstance(value, Mapping):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    return value
+
+
+def device_state(snapshot: AlkoDeviceSnapshot) -> dict[str, Any]:
+    """Return the state of a device with its full reported shadow."""
+    return {
+        "thing_name": snapshot.thing_name,
+        "model": snapshot.meta.model,
+        "last_updated": snapshot.last_updated.isoformat(),
+        "mower_state": snapshot.mower_state,
+        "connected": snapshot.is_connected,
+        "locked": snapshot.is_locked,
+        "error": plain(snapshot.operation_error) if snapshot.has_error else None,
+        "reported": plain(snapshot.reported),
+    }
+
+
+def schedule(snapshot: AlkoDeviceSnapshot) -> dict[str, Any]:
+    """Return the weekly schedule and manual mowing of a device.
+
+    Windows use the fields of the update_mowing_window service, so an
+    entry can be edited and sent back.
+    """
+    mowing_windows = snapshot.get("mowingWindows") or {}
+    manual = snapshot.get("manualMowing") or {}
+    return {
+        "day_cancelled": bool(snapshot.flag("dayCancelled")),
+        "days": {
+            day: [
+                _window(window, window_number)
+                for window_number, name in enumerate(WINDOWS, start=1)
+                if (window := (mowing_windows.get(day) or {}).get(name))
+            ]
+            for day in DAYS_OF_WEEK
+        },
+        "manual_mowing": _window(manual) if manual.get("activityMode") else None,
+    }
+
+
+def next_operations(
+    snapshot: AlkoDeviceSnapshot, now: datetime, days: int
+) -> list[dict[str, Any]]:
+    """Return the mowing operations running or starting within a number of days.
+
+    Manual mowing and a cancelled day only apply to the current day.
+    """
+    mowing_windows = snapshot.get("mowingWindows") or {}
+    manual = snapshot.get("manualMowing") or {}
+    today = now.date()
+    end = now + timedelta(days=days)
+
+    operations = []
+    # Start a day early for windows running past midnight
+    for offset in range(-1, days + 1):
+        day = today + timedelta(days=offset)
+        day_name = DAYS_OF_WEEK[day.weekday()]
+        candidates = []
+        if not (day == today and snapshot.flag("dayCancelled")):
+            day_windows = mowing_windows.get(day_name) or {}
+            candidates = [
+                (f"{day_name} {name}", window)
+                for name in WINDOWS
+                if (window := day_windows.get(name)) and window.get("activityMode")
+            ]
+        if day == today and manual.get("activityMode"):
+            candidates.append(("manual", manual))
+
+        for label, window in candidates:
+            start = datetime.combine(
+                day,
+                time(window.get("startHour", 0), window.get("startMinute", 0)),
+                tzinfo=now.tzinfo,
+            )
+            stop = start + timedelta(minutes=window.get("duration", 0))
+            if stop > now and start < end:
+                operations.append((start, stop, label, window))
+    return [
+        {
+            "start": start.isoformat(),
+            "end": stop.isoformat(),
+            "window": label,
+            "type": _type(window),
+            "running": start <= now,
+        }
+        for start, stop, label, window in sorted(operations, key=lambda item: item[0])
+    ]
+
+
+def _window(
+    window: Mapping[str, Any], window_number: int | None = None
+) -> dict[str, Any]:
+    """Return a window in the fields of the mowing services."""
+    data = {
+        "start_hour": window.get("startHour", 0),
+        "start_minute": window.get("startMinute", 0),
+        "duration": window.get("duration", 0),
+        "type": _type(window),
+        "entry_point": window.get("entryPoint"),
+    }
+    if window_number is not None:
+        data = {"window_number": window_number, **data}
+    return data
+
+
+def _type(window: Mapping[str, Any]) -> str:
+    """Return the mowing service type matching a window's modes."""
+    if not window.get("activityMode", False):
+        return "deactivated"
+    if window.get("marginMode", False):
+        return "first_mow_border_then_area"
+    if window.get("narrowPassageMode", False):
+        return "narrow_passage"
+    return "mow"
@@ -1,220 +1,547 @@
 """Support for AL-KO sensor platform."""
-import logging
-from datetime import timedelta
+from __future__ import annotations
 
-from pyalko import Alko
-from pyalko.objects.device import AlkoDevice
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+import logging
+from datetime import datetime, timedelta
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
     UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
-from . import AlkoDeviceEntity
+from . import AlkoDescriptionEntity, AlkoDeviceEntity, async_add_device_entities
+from .analytics import AlkoBatteryEstimator, AlkoBladeEstimator
 from .const import DOMAIN
+from .coordinator import AlkoDataUpdateCoordinator
+from .metrics import (
+    PHASE_BUILD,
+    PHASE_COMMAND,
+    PHASE_DECODE,
+    PHASE_FANOUT,
+    PHASE_FETCH,
+    PHASE_HTTP,
+    PHASE_TOKEN,
+    AlkoMetrics,
+)
+from .sessions import AlkoSessionLog
+from .snapshot import AlkoDeviceSnapshot, AlkoEntityDescription
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class AlkoSensorEntityDescription(AlkoEntityDescription, SensorEntityDescription):
+    """Describes an AL-KO sensor."""
+
+    # Numeric changes smaller than this are not written, they add up instead
+    deadband: float | None = None
+    # Hold numeric and attribute-only changes for the minimum write interval
+    throttled: bool = False
+
+
+SENSORS: tuple[AlkoSensorEntityDescription, ...] = (
+    AlkoSensorEntityDescription(
+        key="operation_state",
+        name="Operation State",
+        value_fn=lambda snapshot: snapshot.get("operationState"),
+        exists_fn=lambda snapshot: snapshot.has("operationState"),
+        attributes_fn=lambda snapshot: {
+            "substate": snapshot.get("operationSubState"),
+            "situation": snapshot.get("operationSituation"),
+        },
+        throttled=True,
+    ),
+    AlkoSensorEntityDescription(
+        key="operation_error",
+        name="Operation Error",
+        translation_key="error",
+        value_fn=lambda snapshot: str(snapshot.operation_error.get("code")),
+        exists_fn=lambda snapshot: snapshot.has("operationError"),
+        attributes_fn=lambda snapshot: {
+            "type": snapshot.operation_error.get("type"),
+            "description": snapshot.operation_error.get("description"),
+        },
+    ),
+    AlkoSensorEntityDescription(
+        key="blade_remaining",
+        name="Remaining Blade Life",
+        icon="mdi:fan",
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda snapshot: snapshot.get("remainingBladeLifetime"),
+        exists_fn=lambda snapshot: snapshot.has("operationTimeBlade"),
+        attributes_fn=lambda snapshot: {
+            "operation_time": snapshot.get("operationTimeBlade"),
+        },
+    ),
+    AlkoSensorEntityDescription(
+        key="battery_level",
+        name="Battery Level",
+        device_class=SensorDeviceClass.BATTERY,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda snapshot: snapshot.get("batteryLevel"),
+        exists_fn=lambda snapshot: snapshot.has("batteryLevel"),
+        deadband=2,
+        throttled=True,
+    ),
+    AlkoSensorEntityDescription(
+        key="rssi",
+        name="RSSI",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        native_unit_of_measurement="dBm",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda snapshot: snapshot.get("rssi"),
+        exists_fn=lambda snapshot: snapshot.has("rssi"),
+        deadband=3,
+        throttled=True,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class AlkoEstimateSensorEntityDescription(SensorEntityDescription):
+    """Describes an AL-KO sensor derived from successive snapshots."""
+
+    estimator_fn: Callable[[AlkoDataUpdateCoordinator, str], Any]
+    value_fn: Callable[[Any], Any]
+
+
+def _battery(
+    coordinator: AlkoDataUpdateCoordinator, thing_name: str
+) -> AlkoBatteryEstimator | None:
+    """Return the battery estimator of a device."""
+    return coordinator.battery.get(thing_name)
+
+
+def _blades(
+    coordinator: AlkoDataUpdateCoordinator, thing_name: str
+) -> AlkoBladeEstimator | None:
+    """Return the blade estimator of a device."""
+    return coordinator.blade_wear.estimators.get(thing_name)
+
+
+def _sessions(
+    coordinator: AlkoDataUpdateCoordinator, thing_name: str
+) -> AlkoSessionLog | None:
+    """Return the mowing session log of a device."""
+    return coordinator.sessions.logs.get(thing_name)
+
+
+def _last_session_minutes(log: AlkoSessionLog) -> int | None:
+    """Return the length of the last finished session in minutes."""
+    session = log.last_session
+    return None if session is None else round(session.duration / 60)
+
+
+BATTERY_SENSORS: tuple[AlkoEstimateSensorEntityDescription, ...] = (
+    AlkoEstimateSensorEntityDescription(
+        key="battery_discharge_rate",
+        name="Battery Discharge Rate",
+        icon="mdi:battery-arrow-down",
+        native_unit_of_measurement=f"{PERCENTAGE}/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        estimator_fn=_battery,
+        value_fn=lambda estimator: estimator.discharge_rate,
+    ),
+    AlkoEstimateSensorEntityDescription(
+        key="battery_time_to_full",
+        name="Time to Full Charge",
+        icon="mdi:battery-clock",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        estimator_fn=_battery,
+        value_fn=lambda estimator: estimator.time_to_full,
+    ),
+    AlkoEstimateSensorEntityDescription(
+        key="mowing_time_left",
+        name="Remaining Mowing Time",
+        icon="mdi:timer-sand",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        estimator_fn=_battery,
+        value_fn=lambda estimator: estimator.mowing_time_left,
+    ),
+)
+
+BLADE_SENSORS: tuple[AlkoEstimateSensorEntityDescription, ...] = (
+    AlkoEstimateSensorEntityDescription(
+        key="blade_usage_rate",
+        name="Blade Usage",
+        icon="mdi:fan-clock",
+        native_unit_of_measurement=f"{UnitOfTime.HOURS}/d",
+        state_class=SensorStateClass.MEASUREMENT,
+        estimator_fn=_blades,
+        value_fn=lambda estimator: estimator.usage_rate,
+    ),
+    AlkoEstimateSensorEntityDescription(
+        key="blade_replacement",
+        name="Blade Replacement Forecast",
+        icon="mdi:calendar-clock",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        estimator_fn=_blades,
+        value_fn=lambda estimator: estimator.replacement_date,
+    ),
+)
+
+SESSION_SENSORS: tuple[AlkoEstimateSensorEntityDescription, ...] = (
+    AlkoEstimateSensorEntityDescription(
+        key="last_session_duration",
+        name="Last Mowing Session",
+        icon="mdi:robot-mower-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        estimator_fn=_sessions,
+        value_fn=_last_session_minutes,
+    ),
+    AlkoEstimateSensorEntityDescription(
+        key="mowing_time_today",
+        name="Mowing Time Today",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        estimator_fn=_sessions,
+        value_fn=lambda log: round(
+            sum(session.duration for session in log.today()) / 60
+        ),
+    ),
+    AlkoEstimateSensorEntityDescription(
+        key="mowing_sessions_today",
+        name="Mowing Sessions Today",
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        estimator_fn=_sessions,
+        value_fn=lambda log: len(log.today()),
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class AlkoMetricSensorEntityDescription(SensorEntityDescription):
+    """Describes an AL-KO instrumentation sensor."""
+
+    value_fn: Callable[[AlkoMetrics], Any]
+    attributes_fn: Callable[[AlkoMetrics], dict[str, Any]] | None = None
+
+
+def _phase_description(
+    key: str, name: str, phase: str, **kwargs
+) -> AlkoMetricSensorEntityDescription:
+    """Describe a sensor reporting the p50 of a timed phase."""
+    return AlkoMetricSensorEntityDescription(
+        key=key,
+        name=name,
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda metrics: metrics.summary(phase)["p50"],
+        attributes_fn=lambda metrics: metrics.summary(phase),
+        **kwargs,
+    )
+
+
+def _counter_description(
+    key: str, name: str, value_fn: Callable[[AlkoMetrics], int], **kwargs
+) -> AlkoMetricSensorEntityDescription:
+    """Describe a sensor reporting a counter."""
+    return AlkoMetricSensorEntityDescription(
+        key=key,
+        name=name,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=value_fn,
+        **kwargs,
+    )
+
+
+METRIC_SENSORS: tuple[AlkoMetricSensorEntityDescription, ...] = (
+    _phase_description("refresh_duration", "Refresh Duration", PHASE_FETCH),
+    _phase_description("http_latency", "HTTP Latency", PHASE_HTTP),
+    _phase_description("command_latency", "Command Latency", PHASE_COMMAND),
+    # The finer phases are mostly useful while tuning, so start disabled
+    _phase_description(
+        "token_duration",
+        "Token Duration",
+        PHASE_TOKEN,
+        entity_registry_enabled_default=False,
+    ),
+    _phase_description(
+        "decode_duration",
+        "Decode Duration",
+        PHASE_DECODE,
+        entity_registry_enabled_default=False,
+    ),
+    _phase_description(
+        "build_duration",
+        "Build Duration",
+        PHASE_BUILD,
+        entity_registry_enabled_default=False,
+    ),
+    _phase_description(
+        "fanout_duration",
+        "Entity Update Duration",
+        PHASE_FANOUT,
+        entity_registry_enabled_default=False,
+    ),
+    _counter_description(
+        "requests", "Requests", lambda metrics: metrics.requests, icon="mdi:cloud-sync"
+    ),
+    _counter_description(
+        "request_errors",
+        "Request Errors",
+        lambda metrics: metrics.request_errors,
+        icon="mdi:cloud-alert",
+    ),
+    _counter_description(
+        "bytes_received",
+        "Bytes Received",
+        lambda metrics: metrics.bytes_received,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+    ),
+    _counter_description(
+        "commands", "Commands", lambda metrics: metrics.commands, icon="mdi:send"
+    ),
+    _counter_description(
+        "command_errors",
+        "Command Errors",
+        lambda metrics: metrics.command_errors,
+        icon="mdi:send-circle-outline",
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the AL-KO sensor platform based on a config entry."""
-    coordinator: DataUpdateCoordinator[Alko] = hass.data[DOMAIN][entry.entry_id]
-
-    entities = []
-
-    for device in coordinator.data.devices:
-        cls_list = []
-        if device.thingState.state.reported is not None:
-            if hasattr(device.thingState.state.reported, "operationState"):
-                cls_list.append(AlkoOperationSensor)
-            if hasattr(device.thingState.state.reported, "operationError"):
-                cls_list.append(AlkoErrorSensor)
-            if hasattr(device.thingState.state.reported, "operationTimeBlade"):
-                cls_list.append(AlkoBladeSensor)
-            if hasattr(device.thingState.state.reported, "batteryLevel"):
-                cls_list.append(AlkoBatterySensor)
-            if hasattr(device.thingState.state.reported, "nextOperation"):
-                cls_list.append(AlkoNextOperationSensor)
-            if hasattr(device.thingState.state.reported, "rssi"):
-                cls_list.append(AlkoRssiSensor)
-
-        for cls in cls_list:
-            entities.append(
-                cls(
-                    coordinator,
-                    device,
-                )
+    coordinator: AlkoDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_add_descriptions(SENSORS)
+
+    def _sensors(snapshot: AlkoDeviceSnapshot) -> list[SensorEntity]:
+        entities: list[SensorEntity] = [
+            AlkoSensor(coordinator, snapshot, description)
+            for description in SENSORS
+            if snapshot.supports(description)
+        ]
+        if snapshot.has("nextOperation"):
+            entities.append(AlkoNextOperationSensor(coordinator, snapshot))
+        if snapshot.has("batteryLevel") and snapshot.has("operationState"):
+            entities.extend(
+                AlkoEstimateSensor(coordinator, snapshot, description)
+                for description in BATTERY_SENSORS
             )
+        if snapshot.has("operationTimeBlade"):
+            entities.extend(
+                AlkoEstimateSensor(coordinator, snapshot, description)
+                for description in BLADE_SENSORS
+            )
+        if snapshot.has("operationState"):
+            entities.extend(
+                AlkoEstimateSensor(coordinator, snapshot, description)
+                for description in SESSION_SENSORS
+            )
+        entities.append(AlkoLastUpdatedSensor(coordinator, snapshot))
+        return entities
 
-    async_add_entities(entities, True)
+    async_add_device_entities(coordinator, entry, async_add_entities, _sensors)
+    async_add_entities(
+        AlkoMetricSensor(coordinator, description) for description in METRIC_SENSORS
+    )
 
 
-class AlkoSensor(AlkoDeviceEntity, SensorEntity):
+class AlkoSensor(AlkoDescriptionEntity, SensorEntity):
     """Defines an AL-KO sensor."""
 
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-        key: str,
-        name: str,
-        device_class: str = None,
-        unit_of_measurement: str = None,
-    ) -> None:
-        """Initialize AL-KO sensor."""
-        self._device_class = device_class
-        self._unit_of_measurement = unit_of_measurement
+    entity_description: AlkoSensorEntityDescription
 
-        super().__init__(coordinator, device, key, name)
+    # Value, attributes, availability and time of the last state write
+    _written: tuple[Any, Mapping[str, Any] | None, bool, datetime] | None = None
 
     @property
-    def device_class(self) -> str:
-        """Return the device class of the sensor."""
-        return self._device_class
+    def native_value(self):
+        """Return the state of the sensor."""
+        return self.value
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the new state unless it is a small or too frequent change."""
+        if self._should_write():
+            super()._handle_coordinator_update()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and remember what was written."""
+        super().async_write_ha_state()
+        if self.thing_name in self.coordinator.data:
+            self._written = (
+                self.value,
+                self.extra_state_attributes,
+                self.available,
+                dt_util.utcnow(),
+            )
 
-    @property
-    def unit_of_measurement(self) -> str:
-        """Return the unit this state is expressed in."""
-        return self._unit_of_measurement
+    def _should_write(self) -> bool:
+        """Return True if the change is worth a state write.
+
+        Availability and non-numeric state changes are always written.
+        Numeric changes within the deadband are dropped, other numeric and
+        attribute-only changes wait for the minimum write interval.
+        """
+        description = self.entity_description
+        if (
+            not description.throttled
+            or self._written is None
+            or self.thing_name not in self.coordinator.data
+        ):
+            return True
+
+        written_value, written_attributes, written_available, written_at = (
+            self._written
+        )
+        if self.available != written_available:
+            return True
 
-    @property
-    def state(self) -> str:
-        """Return the state of the sensor."""
-        return self.device.thingState.state.reported.operationState
+        value = self.value
+        attributes = self.extra_state_attributes
+        numeric = isinstance(value, (int, float)) and isinstance(
+            written_value, (int, float)
+        )
+        if value != written_value and not numeric:
+            return True
+        if (
+            numeric
+            and description.deadband is not None
+            and abs(value - written_value) < description.deadband
+        ):
+            value = written_value
+        if value == written_value and attributes == written_attributes:
+            return False
+        return dt_util.utcnow() - written_at >= self.coordinator.min_write_interval
 
 
-class AlkoOperationSensor(AlkoSensor):
-    """Defines an AL-KO State sensor."""
+class AlkoEstimateSensor(AlkoDeviceEntity, SensorEntity):
+    """Defines an AL-KO sensor estimated from successive snapshots."""
+
+    entity_description: AlkoEstimateSensorEntityDescription
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
+        coordinator: AlkoDataUpdateCoordinator,
+        snapshot: AlkoDeviceSnapshot,
+        description: AlkoEstimateSensorEntityDescription,
     ) -> None:
-        """Initialize AL-KO sensor."""
-
-        self._attr_extra_state_attributes = {
-            "substate": None,
-            "situation": None,
-        }
-
-        super().__init__(
-            coordinator,
-            device,
-            "operation_state",
-            "Operation State",
-        )
-
-        self._attr_extra_state_attributes["substate"] = self.device.thingState.state.reported.operationSubState
-        self._attr_extra_state_attributes["situation"] = self.device.thingState.state.reported.operationSituation
+        """Initialize the AL-KO estimate sensor."""
+        super().__init__(coordinator, snapshot, description.key, description.name)
+        self.entity_description = description
 
     @property
-    def state(self) -> str:
-        """Return the state of the sensor."""
-        return self.device.thingState.state.reported.operationState
+    def native_value(self):
+        """Return the current estimate."""
+        estimator = self.entity_description.estimator_fn(
+            self.coordinator, self.thing_name
+        )
+        if estimator is None:
+            return None
+        return self.entity_description.value_fn(estimator)
 
 
-class AlkoErrorSensor(AlkoSensor):
-    """Defines an AL-KO Error sensor."""
+class AlkoMetricSensor(CoordinatorEntity[AlkoDataUpdateCoordinator], SensorEntity):
+    """Defines an AL-KO instrumentation sensor for a config entry."""
 
-    _attr_translation_key = "error"
+    entity_description: AlkoMetricSensorEntityDescription
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
+        coordinator: AlkoDataUpdateCoordinator,
+        description: AlkoMetricSensorEntityDescription,
     ) -> None:
-        """Initialize AL-KO sensor."""
-
-        self._attr_extra_state_attributes = {
-            "type": None,
-            "description": None,
-        }
-
-        super().__init__(
-            coordinator,
-            device,
-            "operation_error",
-            "Operation Error",
+        """Initialize the AL-KO instrumentation sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        entry_id = coordinator.config_entry.entry_id
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_name = f"AL-KO Cloud {description.name}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry_id)},
+            manufacturer="AL-KO",
+            name="AL-KO Cloud",
+            entry_type=DeviceEntryType.SERVICE,
         )
 
-        if self.device.thingState.state.reported.operationError.code is not None:
-            self._attr_extra_state_attributes["type"] = self.device.thingState.state.reported.operationError.type
+    @property
+    def available(self) -> bool:
+        """Stay available through failed polls, they are part of the story."""
+        return True
 
     @property
-    def state(self) -> str:
+    def native_value(self):
         """Return the state of the sensor."""
-        return str(self.device.thingState.state.reported.operationError.code)
+        return self.entity_description.value_fn(self.coordinator.metrics)
 
+    @property
+    def extra_state_attributes(self):
+        """Return the percentiles of the sensor."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator.metrics)
 
-class AlkoBladeSensor(AlkoSensor):
-    """Defines an AL-KO Blade sensor."""
-
-    _attr_icon = "mdi:fan"
-    _attr_native_unit_of_measurement = UnitOfTime.HOURS
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_name = "Remaining Blade Life"
 
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice,
-    ) -> None:
-        """Initialize AL-KO sensor."""
+class AlkoLastUpdatedSensor(AlkoDeviceEntity, SensorEntity):
+    """Defines an AL-KO sensor for the age of the served snapshot."""
 
-        self._attr_extra_state_attributes = {
-            "operation_time": None,
-        }
+    _attr_icon = "mdi:update"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
 
+    def __init__(self, coordinator, snapshot):
         super().__init__(
             coordinator,
-            device,
-            "blade_remaining",
-            "Remaining Blade Life",
-            None,
-            UnitOfTime.HOURS,
+            snapshot,
+            "last_updated",
+            "Last Updated"
         )
 
-        self._attr_extra_state_attributes["operation_time"] = self.device.thingState.state.reported.operationTimeBlade
-
     @property
-    def state(self) -> str:
-        """Return the state of the sensor."""
-        return self.device.thingState.state.reported.remainingBladeLifetime
-
-
-class AlkoBatterySensor(AlkoDeviceEntity, SensorEntity):
-    """Defines an AL-KO Battery sensor."""
-
-    _attr_device_class = SensorDeviceClass.BATTERY
-    _attr_native_unit_of_measurement = PERCENTAGE
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_name = "Battery Level"
-
-    def __init__(self, coordinator, device):
-        super().__init__(
-            coordinator,
-            device,
-            "battery_level",
-            "Battery Level",
+    def available(self) -> bool:
+        """Stay available while serving stale data, that is what it reports."""
+        return (
+            self.coordinator.last_update_success
+            and self.thing_name in self.coordinator.data
         )
 
     @property
-    def state(self) -> int:
-        """Return the state of the sensor."""
-        return self.device.thingState.state.reported.batteryLevel
+    def native_value(self):
+        """Return when the device state was last received."""
+        return self.snapshot.last_updated
+
+    @property
+    def extra_state_attributes(self):
+        """Return the staleness of the served state."""
+        return {
+            "stale": self.coordinator.is_stale(self.snapshot),
+            "failed_updates": self.coordinator.failed_updates,
+        }
 
 
 class AlkoNextOperationSensor(AlkoDeviceEntity, SensorEntity):
@@ -223,10 +550,10 @@ class AlkoNextOperationSensor(AlkoDeviceEntity, SensorEntity):
     _attr_icon = "mdi:calendar-range"
     _attr_device_class = SensorDeviceClass.TIMESTAMP
 
-    def __init__(self, coordinator, device):
+    def __init__(self, coordinator, snapshot):
         super().__init__(
             coordinator,
-            device,
+            snapshot,
             "next_operation",
             "Next Operation"
         )
@@ -241,8 +568,9 @@ class AlkoNextOperationSensor(AlkoDeviceEntity, SensorEntity):
         """Return the state of the sensor."""
         current_time = dt_util.now()
         today = current_time.strftime("%A").lower()
-        mowing_windows = self.device.thingState.state.reported.mowingWindows
-        is_day_cancelled = self.device.thingState.state.reported.situationFlags.dayCancelled
+        snapshot = self.snapshot
+        mowing_windows = snapshot.get("mowingWindows") or {}
+        is_day_cancelled = snapshot.flag("dayCancelled")
         next_operation = None
         next_window = None
         days = ['monday', 'tuesday', 'wednesday',
@@ -250,18 +578,17 @@ class AlkoNextOperationSensor(AlkoDeviceEntity, SensorEntity):
         today_index = days.index(today)
 
         # Check for manual mowing
-        if hasattr(self.device.thingState.state.reported, "manualMowing"):
-            manual_mowing = self.device.thingState.state.reported.manualMowing
-            if manual_mowing is not None and manual_mowing.activityMode:
-                manual_time = current_time.replace(
-                    hour=manual_mowing.startHour,
-                    minute=manual_mowing.startMinute,
-                    second=0,
-                    microsecond=0
-                )
-                if manual_time > current_time:
-                    next_operation = manual_time
-                    next_window = manual_mowing
+        manual_mowing = snapshot.get("manualMowing")
+        if manual_mowing and manual_mowing.get("activityMode"):
+            manual_time = current_time.replace(
+                hour=manual_mowing.get("startHour", 0),
+                minute=manual_mowing.get("startMinute", 0),
+                second=0,
+                microsecond=0
+            )
+            if manual_time > current_time:
+                next_operation = manual_time
+                next_window = manual_mowing
 
         # Check scheduled windows
         if next_operation is None:
@@ -270,30 +597,28 @@ class AlkoNextOperationSensor(AlkoDeviceEntity, SensorEntity):
                 # Skip today if day is cancelled
                 if i == 0 and is_day_cancelled:
                     continue
-                if hasattr(mowing_windows, day):
-                    windows = getattr(mowing_windows, day)
-                    for window_num in ['window_1', 'window_2']:
-                        if hasattr(windows, window_num):
-                            window = getattr(windows, window_num)
-                            if window.activityMode:
-                                window_time = current_time.replace(
-                                    hour=window.startHour,
-                                    minute=window.startMinute,
-                                    second=0,
-                                    microsecond=0
-                                ) + timedelta(days=i)
-                                if window_time > current_time and (next_operation is None or window_time < next_operation):
-                                    next_operation = window_time
-                                    next_window = window
+                windows = mowing_windows.get(day) or {}
+                for window_num in ['window_1', 'window_2']:
+                    window = windows.get(window_num)
+                    if window and window.get("activityMode"):
+                        window_time = current_time.replace(
+                            hour=window.get("startHour", 0),
+                            minute=window.get("startMinute", 0),
+                            second=0,
+                            microsecond=0
+                        ) + timedelta(days=i)
+                        if window_time > current_time and (next_operation is None or window_time < next_operation):
+                            next_operation = window_time
+                            next_window = window
 
         if next_operation:
             next_operation = dt_util.as_local(next_operation)
 
             # Update extra state attributes
             if next_window:
-                self._attr_extra_state_attributes["duration"] = next_window.duration
-                self._attr_extra_state_attributes["margin_mode"] = next_window.marginMode
-                self._attr_extra_state_attributes["narrow_passage"] = next_window.narrowPassageMode
+                self._attr_extra_state_attributes["duration"] = next_window.get("duration")
+                self._attr_extra_state_attributes["margin_mode"] = next_window.get("marginMode")
+                self._attr_extra_state_attributes["narrow_passage"] = next_window.get("narrowPassageMode")
 
             return next_operation.isoformat()
 
@@ -303,25 +628,3 @@ class AlkoNextOperationSensor(AlkoDeviceEntity, SensorEntity):
             "margin_mode": None,
         })
         return "N/A"
-
-
-class AlkoRssiSensor(AlkoDeviceEntity, SensorEntity):
-    """Defines an AL-KO RSSI sensor."""
-
-    _attr_device_class = SensorDeviceClass.SIGNAL_STRENGTH
-    _attr_native_unit_of_measurement = "dBm"
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_name = "RSSI"
-
-    def __init__(self, coordinator, device):
-        super().__init__(
-            coordinator,
-            device,
-            "rssi",
-            "RSSI"
-        )
-
-    @property
-    def state(self) -> int:
-        """Return the state of the sensor."""
-        return self.device.thingState.state.reported.rssi
@@ -0,0 +1,355 @@
+"""Mowing sessions detected from AL-KO operation state transitions."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DAYS_OF_WEEK, DOMAIN, SESSION_LIMIT, SESSION_RETENTION_DAYS
+from .snapshot import AlkoDeviceSnapshot
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+# A session starts when the mower starts working and lasts while it works,
+# heads home or pauses, it ends once the mower is docked
+SESSION_START_STATE = "WORKING"
+SESSION_PAUSE_STATE = "IDLE"
+SESSION_STATES = {"WORKING", "HOMING", SESSION_PAUSE_STATE}
+
+# A mower paused for longer than this many seconds, like one left in the
+# lawn overnight, ended its session when the pause started
+SESSION_PAUSE_TIMEOUT = 1800
+
+# An open session not seen for this many seconds, like when Home Assistant
+# was down, ends where it was last seen
+SESSION_TIMEOUT = 3600
+
+# Situation flags recorded as interruptions of a session
+INTERRUPTION_FLAGS = {
+    "rain": "rainDetected",
+    "frost": "frostDetected",
+}
+
+
+@dataclass(slots=True)
+class AlkoMowingSession:
+    """One mowing session, from leaving the base until docking again."""
+
+    start: float
+    end: float
+    battery_start: float | None = None
+    battery_end: float | None = None
+    window: str | None = None
+    interruptions: list[str] = field(default_factory=list)
+    paused: float | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> AlkoMowingSession:
+        """Restore a session saved with as_dict."""
+        battery = data.get("battery") or (None, None)
+        return cls(
+            start=data["start"],
+            end=data["end"],
+            battery_start=battery[0],
+            battery_end=battery[1],
+            window=data.get("window"),
+            interruptions=list(data.get("interruptions", ())),
+            paused=data.get("paused"),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the compact form that is persisted."""
+        data: dict[str, Any] = {
+            "start": round(self.start),
+            "end": round(self.end),
+            "battery": [self.battery_start, self.battery_end],
+        }
+        if self.window is not None:
+            data["window"] = self.window
+        if self.interruptions:
+            data["interruptions"] = self.interruptions
+        if self.paused is not None:
+            data["paused"] = round(self.paused)
+        return data
+
+    @property
+    def duration(self) -> float:
+        """Return the length of the session in seconds."""
+        return self.end - self.start
+
+    @property
+    def battery_used(self) -> float | None:
+        """Return the battery percentage used, if known."""
+        if self.battery_start is None or self.battery_end is None:
+            return None
+        return max(0, self.battery_start - self.battery_end)
+
+    def as_response(self, ongoing: bool = False) -> dict[str, Any]:
+        """Return the session as service response data."""
+        return {
+            "start": _local(self.start).isoformat(),
+            "end": _local(self.end).isoformat(),
+            "duration_minutes": round(self.duration / 60),
+            "battery_used": self.battery_used,
+            "window": self.window,
+            "interruptions": self.interruptions,
+            "ongoing": ongoing,
+        }
+
+
+class AlkoSessionLog:
+    """Sessions of one mower, oldest first, and the one in progress."""
+
+    def __init__(self) -> None:
+        """Initialize the log."""
+        self.sessions: list[AlkoMowingSession] = []
+        self.current: AlkoMowingSession | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> AlkoSessionLog:
+        """Restore a log saved with as_dict."""
+        log = cls()
+        log.sessions = [AlkoMowingSession.from_dict(item) for item in data["log"]]
+        if current := data.get("current"):
+            log.current = AlkoMowingSession.from_dict(current)
+        return log
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the log to persist."""
+        return {
+            "log": [session.as_dict() for session in self.sessions],
+            "current": None if self.current is None else self.current.as_dict(),
+        }
+
+    def update(self, snapshot: AlkoDeviceSnapshot) -> bool:
+        """Follow the mower through a fresh snapshot, True if worth saving."""
+        timestamp = snapshot.last_updated.timestamp()
+        state = snapshot.get("operationState")
+        battery = snapshot.get("batteryLevel")
+        if not isinstance(battery, (int, float)):
+            battery = None
+
+        changed = False
+        session = self.current
+        if session is not None and timestamp - session.end > SESSION_TIMEOUT:
+            self._close()
+            session = None
+            changed = True
+
+        if session is None:
+            if state != SESSION_START_STATE:
+                return changed
+            session = self.current = AlkoMowingSession(
+                start=timestamp,
+                end=timestamp,
+                battery_start=battery,
+                battery_end=battery,
+                window=_scheduled_window(snapshot),
+            )
+            changed = True
+
+        if state == SESSION_PAUSE_STATE:
+            if session.paused is None:
+                session.paused = timestamp
+                changed = True
+            elif timestamp - session.paused > SESSION_PAUSE_TIMEOUT:
+                session.end = session.paused
+                session.paused = None
+                self._close()
+                return True
+        elif session.paused is not None:
+            session.paused = None
+            changed = True
+
+        session.end = timestamp
+        if battery is not None:
+            session.battery_end = battery
+        for interruption in _interruptions(snapshot):
+            if interruption not in session.interruptions:
+                session.interruptions.append(interruption)
+                changed = True
+
+        if state not in SESSION_STATES:
+            self._close()
+            changed = True
+        return changed
+
+    def between(
+        self, start: float, end: float, ongoing: bool = True
+    ) -> list[AlkoMowingSession]:
+        """Return the sessions started within a period, oldest first."""
+        first = bisect_left(self.sessions, start, key=lambda session: session.start)
+        sessions = []
+        for session in self.sessions[first:]:
+            if session.start >= end:
+                break
+            sessions.append(session)
+        current = self.current
+        if ongoing and current is not None and start <= current.start < end:
+            sessions.append(current)
+        return sessions
+
+    @property
+    def last_session(self) -> AlkoMowingSession | None:
+        """Return the last finished session."""
+        return self.sessions[-1] if self.sessions else None
+
+    def today(self) -> list[AlkoMowingSession]:
+        """Return the sessions started today, including one in progress."""
+        start = dt_util.start_of_local_day()
+        return self.between(
+            start.timestamp(), (start + timedelta(days=1)).timestamp()
+        )
+
+    def _close(self) -> None:
+        """Move the session in progress to the log, dropping old sessions."""
+        if self.current is None:
+            return
+        self.sessions.append(self.current)
+        self.current = None
+        oldest = self.sessions[-1].start - SESSION_RETENTION_DAYS * 86400
+        first = bisect_left(self.sessions, oldest, key=lambda session: session.start)
+        del self.sessions[: max(first, len(self.sessions) - SESSION_LIMIT)]
+
+
+def _store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict[str, Any]]:
+    """Return the store holding the session logs of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.sessions")
+
+
+async def async_remove_sessions(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persisted session logs of a config entry."""
+    await _store(hass, entry).async_remove()
+
+
+class AlkoMowingSessions:
+    """Session logs of all mowers of a config entry, kept across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the session tracking."""
+        self._store = _store(hass, entry)
+        self.logs: dict[str, AlkoSessionLog] = {}
+
+    async def async_load(self) -> None:
+        """Load the logs saved before a restart."""
+        data = await self._store.async_load() or {}
+        self.logs = {
+            thing_name: AlkoSessionLog.from_dict(log) for thing_name, log in data.items()
+        }
+
+    @callback
+    def async_update(self, snapshot: AlkoDeviceSnapshot) -> None:
+        """Feed a fresh snapshot to the log of its mower."""
+        if not snapshot.has("operationState"):
+            return
+        log = self.logs.setdefault(snapshot.thing_name, AlkoSessionLog())
+        if log.update(snapshot):
+            self._async_save()
+
+    @callback
+    def async_remove(self, thing_name: str) -> None:
+        """Forget the log of a mower that left the account."""
+        if self.logs.pop(thing_name, None) is not None:
+            self._async_save()
+
+    async def async_save(self) -> None:
+        """Persist the logs now, like when the entry is unloaded."""
+        await self._store.async_save(self._data())
+
+    @callback
+    def _async_save(self) -> None:
+        """Persist the logs after a short delay."""
+        self._store.async_delay_save(self._data, SAVE_DELAY)
+
+    def _data(self) -> dict[str, dict[str, Any]]:
+        """Return all logs to persist."""
+        return {thing_name: log.as_dict() for thing_name, log in self.logs.items()}
+
+
+def session_report(
+    log: AlkoSessionLog, start: datetime, end: datetime, group_by: str
+) -> dict[str, Any]:
+    """Return the sessions of a period, or their totals per day or week."""
+    sessions = log.between(start.timestamp(), end.timestamp())
+    current = log.current
+    if group_by == "session":
+        return {
+            "sessions": [
+                session.as_response(ongoing=session is current)
+                for session in sessions
+            ]
+        }
+
+    groups: dict[str, dict[str, Any]] = {}
+    for session in sessions:
+        local = _local(session.start)
+        if group_by == "week":
+            year, week, _ = local.isocalendar()
+            key = f"{year}-W{week:02d}"
+        else:
+            key = local.date().isoformat()
+        group = groups.setdefault(
+            key,
+            {
+                "period": key,
+                "sessions": 0,
+                "duration_minutes": 0,
+                "battery_used": 0,
+                "interruptions": {},
+            },
+        )
+        group["sessions"] += 1
+        group["duration_minutes"] += round(session.duration / 60)
+        group["battery_used"] += session.battery_used or 0
+        for interruption in session.interruptions:
+            group["interruptions"][interruption] = (
+                group["interruptions"].get(interruption, 0) + 1
+            )
+    return {f"{group_by}s": list(groups.values())}
+
+
+def _interruptions(snapshot: AlkoDeviceSnapshot) -> list[str]:
+    """Return the interruptions the mower currently reports."""
+    interruptions = [
+        name for name, flag in INTERRUPTION_FLAGS.items() if snapshot.flag(flag)
+    ]
+    if snapshot.has_error:
+        interruptions.append(f"error {snapshot.operation_error.get('code')}")
+    return interruptions
+
+
+def _scheduled_window(snapshot: AlkoDeviceSnapshot) -> str | None:
+    """Return the schedule window a session starting now belongs to."""
+    manual = snapshot.get("manualMowing") or {}
+    if manual.get("activityMode"):
+        return "manual"
+
+    now = dt_util.as_local(snapshot.last_updated)
+    day_name = DAYS_OF_WEEK[now.weekday()]
+    day_windows = (snapshot.get("mowingWindows") or {}).get(day_name) or {}
+    for name in ("window_1", "window_2"):
+        window = day_windows.get(name)
+        if not window or not window.get("activityMode"):
+            continue
+        start = now.replace(
+            hour=window.get("startHour", 0),
+            minute=window.get("startMinute", 0),
+            second=0,
+            microsecond=0,
+        )
+        if start <= now < start + timedelta(minutes=window.get("duration", 0)):
+            return f"{day_name} {name}"
+    return None
+
+
+def _local(timestamp: float) -> datetime:
+    """Return a timestamp as a local datetime."""
+    return dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
@@ -0,0 +1,216 @@
+"""Immutable per-device snapshots of the AL-KO reported state."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from pyalko.objects.device import AlkoDevice
+
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import EntityDescription
+
+from .const import DOMAIN, ERROR_CODE_NONE
+
+EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+
+MOWER_STATES = {
+    "IDLE": "paused",
+    "WORKING": "mowing",
+    "HOMING": "returning",
+    "CHARGING": "docked",
+    "IDLE_BASE_STATION": "docked",
+}
+
+
+def normalize_model(model: str) -> str:
+    """Normalize the device model for use in entity IDs."""
+    # Convert to lowercase and replace spaces with underscores
+    normalized = model.lower().replace(" ", "_")
+    # Remove any special characters except underscores
+    return "".join(c for c in normalized if c.isalnum() or c == "_")
+
+
+def _mapping(value: Any) -> Mapping[str, Any]:
+    """Return a read-only view of a nested shadow object."""
+    if isinstance(value, dict):
+        return MappingProxyType(value)
+    return EMPTY_MAPPING
+
+
+@dataclass(frozen=True, kw_only=True)
+class AlkoEntityDescription(EntityDescription):
+    """Describes how an AL-KO entity reads its value from a snapshot."""
+
+    value_fn: Callable[[AlkoDeviceSnapshot], Any]
+    exists_fn: Callable[[AlkoDeviceSnapshot], bool] = lambda _: True
+    attributes_fn: Callable[[AlkoDeviceSnapshot], dict[str, Any]] | None = None
+    # Keep the entity available while the mower reports it is offline
+    available_offline: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class AlkoDeviceMeta:
+    """Static device metadata, shared by every entity of a device."""
+
+    thing_name: str
+    thing_type: str
+    model: str
+    model_slug: str
+    firmware_main: str
+    hardware_main: str
+    serial_number: str
+    device_info: DeviceInfo
+
+    @classmethod
+    def from_device(cls, device: AlkoDevice) -> AlkoDeviceMeta:
+        """Build metadata from the device thing attributes."""
+        attributes = device.attributes.get("thingAttributes") or {}
+        thing_name = attributes.get("thingName") or device.thingName
+        model = attributes.get("thingModel", "")
+        firmware_main = attributes.get("firmwareMain", "")
+        hardware_main = attributes.get("hardwareVersionMain", "")
+        serial_number = attributes.get("serialNumber", "")
+
+        return cls(
+            thing_name=thing_name,
+            thing_type=attributes.get("thingType", ""),
+            model=model,
+            model_slug=normalize_model(model),
+            firmware_main=firmware_main,
+            hardware_main=hardware_main,
+            serial_number=serial_number,
+            device_info=DeviceInfo(
+                identifiers={(DOMAIN, thing_name)},
+                manufacturer="AL-KO",
+                model=model,
+                name=model,
+                sw_version=firmware_main,
+                hw_version=hardware_main,
+                serial_number=serial_number,
+            ),
+        )
+
+    def matches(self, device: AlkoDevice) -> bool:
+        """Return True if the device attributes still match this metadata."""
+        attributes = device.attributes.get("thingAttributes") or {}
+        return (
+            attributes.get("thingModel", "") == self.model
+            and attributes.get("firmwareMain", "") == self.firmware_main
+            and attributes.get("hardwareVersionMain", "") == self.hardware_main
+            and attributes.get("serialNumber", "") == self.serial_number
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class AlkoDeviceSnapshot:
+    """Reported state of a single device, built once per refresh."""
+
+    thing_name: str
+    meta: AlkoDeviceMeta
+    device: AlkoDevice
+    reported: Mapping[str, Any]
+    situation_flags: Mapping[str, Any]
+    operation_error: Mapping[str, Any]
+    is_connected: bool
+    has_error: bool
+    is_locked: bool
+    mower_state: str
+    last_updated: datetime
+    values: Mapping[str, Any]
+    attributes: Mapping[str, Mapping[str, Any]]
+
+    @classmethod
+    def from_device(
+        cls,
+        device: AlkoDevice,
+        meta: AlkoDeviceMeta,
+        last_updated: datetime,
+        descriptions: Iterable[AlkoEntityDescription] = (),
+    ) -> AlkoDeviceSnapshot:
+        """Build a snapshot from the raw device shadow.
+
+        Every description the device supports is evaluated once here, so
+        entities only look up their precomputed value by key.
+        """
+        thing_state = device.attributes.get("thingState") or {}
+        reported = (thing_state.get("state") or {}).get("reported") or {}
+        situation_flags = _mapping(reported.get("situationFlags"))
+        operation_error = _mapping(reported.get("operationError"))
+
+        is_connected = bool(reported.get("isConnected"))
+        has_error = operation_error.get("code") != ERROR_CODE_NONE
+        is_locked = (
+            reported.get("operationSubState") == "LOCKED_PIN"
+            or reported.get("operationSituation") == "OPERATION_NOT_PERMITTED_LOCKED"
+        )
+
+        if not is_connected:
+            mower_state = "unavailable"
+        elif has_error or is_locked:
+            mower_state = "error"
+        else:
+            mower_state = MOWER_STATES.get(reported.get("operationState"), "unknown")
+
+        values: dict[str, Any] = {}
+        attributes: dict[str, Mapping[str, Any]] = {}
+        snapshot = cls(
+            thing_name=device.thingName,
+            meta=meta,
+            device=device,
+            reported=MappingProxyType(reported),
+            situation_flags=situation_flags,
+            operation_error=operation_error,
+            is_connected=is_connected,
+            has_error=has_error,
+            is_locked=is_locked,
+            mower_state=mower_state,
+            last_updated=last_updated,
+            values=MappingProxyType(values),
+            attributes=MappingProxyType(attributes),
+        )
+
+        for description in descriptions:
+            if not description.exists_fn(snapshot):
+                continue
+            values[description.key] = description.value_fn(snapshot)
+            if description.attributes_fn is not None:
+                attributes[description.key] = description.attributes_fn(snapshot)
+
+        return snapshot
+
+    def with_descriptions(
+        self, descriptions: Iterable[AlkoEntityDescription]
+    ) -> AlkoDeviceSnapshot:
+        """Re-evaluate descriptions without touching the update time."""
+        return AlkoDeviceSnapshot.from_device(
+            self.device, self.meta, self.last_updated, descriptions
+        )
+
+    @property
+    def is_offline(self) -> bool:
+        """Return True if the mower explicitly reports it is not connected."""
+        return self.reported.get("isConnected", True) is False
+
+    def supports(self, description: AlkoEntityDescription) -> bool:
+        """Return True if the description was evaluated for this device."""
+        return description.key in self.values
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a reported field."""
+        return self.reported.get(key, default)
+
+    def has(self, key: str) -> bool:
+        """Return True if the device reports the field."""
+        return key in self.reported
+
+    def flag(self, key: str) -> Any:
+        """Return a situation flag."""
+        return self.situation_flags.get(key)
+
+    def has_flag(self, key: str) -> bool:
+        """Return True if the device reports the situation flag."""
+        return key in self.situation_flags
@@ -1,260 +1,130 @@
 """Support for AL-KO switch platform."""
+from __future__ import annotations
+
+from dataclasses import dataclass
 import logging
 from typing import Any
-from datetime import datetime
 
-from pyalko import Alko
-from pyalko.objects.device import AlkoDevice
 from pyalko.exceptions import AlkoException
 
-from homeassistant.components.switch import SwitchEntity
+from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
-from . import AlkoDeviceEntity
+from . import AlkoDescriptionEntity, async_add_device_entities
 from .const import DOMAIN
+from .coordinator import AlkoDataUpdateCoordinator
+from .snapshot import AlkoDeviceSnapshot, AlkoEntityDescription
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class AlkoSwitchEntityDescription(AlkoEntityDescription, SwitchEntityDescription):
+    """Describes an AL-KO switch."""
+
+    # Desired state field written when the switch is toggled
+    update_key: str
+
+
+def _field_description(
+    key: str, name: str, field: str, icon: str
+) -> AlkoSwitchEntityDescription:
+    """Describe a switch backed by a reported field."""
+    return AlkoSwitchEntityDescription(
+        key=key,
+        name=name,
+        icon=icon,
+        update_key=field,
+        value_fn=lambda snapshot: snapshot.get(field),
+        exists_fn=lambda snapshot: snapshot.has(field),
+    )
+
+
+SWITCHES: tuple[AlkoSwitchEntityDescription, ...] = (
+    _field_description("eco_mode", "Eco Mode", "ecoMode", "mdi:tree"),
+    _field_description(
+        "rain_sensor", "Rain Sensor", "rainSensor", "mdi:weather-rainy"
+    ),
+    _field_description(
+        "frost_sensor", "Frost Sensor", "frostSensor", "mdi:snowflake"
+    ),
+    AlkoSwitchEntityDescription(
+        key="cancel_today",
+        name="Paused for Today",
+        icon="mdi:calendar-remove",
+        update_key="dayCancelled",
+        value_fn=lambda snapshot: snapshot.flag("dayCancelled"),
+        exists_fn=lambda snapshot: snapshot.has_flag("dayCancelled"),
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the AL-KO switch platform based on a config entry."""
-    coordinator: DataUpdateCoordinator[Alko] = hass.data[DOMAIN][entry.entry_id]
-
-    entities = []
-
-    for device in coordinator.data.devices:
-        cls_list = []
-        if device.thingState.state.reported is not None:
-            if hasattr(device.thingState.state.reported, "ecoMode"):
-                cls_list.append(AlkoEcoModeSwitch)
-            if hasattr(device.thingState.state.reported, "rainSensor"):
-                cls_list.append(AlkoRainSensorSwitch)
-            if hasattr(device.thingState.state.reported, "frostSensor"):
-                cls_list.append(AlkoFrostSensorSwitch)
-            if hasattr(device.thingState.state.reported.situationFlags, "dayCancelled"):
-                cls_list.append(AlkoCancelTodaySwitch)
-
-        for cls in cls_list:
-            entities.append(
-                cls(
-                    coordinator,
-                    device,
-                )
-            )
-
-    async_add_entities(entities, True)
-
-
-class AlkoEcoModeSwitch(AlkoDeviceEntity, SwitchEntity):
-    """Defines an AL-KO switch."""
-
-    _attr_icon = "mdi:tree"
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice
-    ) -> None:
-        """Initialize AL-KO switch."""
-        super().__init__(
-            coordinator,
-            device,
-            "eco_mode",
-            "Eco Mode",
-        )
-        self._state = self.device.thingState.state.reported.ecoMode
-
-    @property
-    def is_on(self) -> bool:
-        """Return the state of the switch."""
-        return self._state
-
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        new_state = self.device.thingState.state.reported.ecoMode
-        if new_state != self._state:
-            self._state = new_state
-        super()._handle_coordinator_update()
-
-    async def async_turn_off(self, **kwargs: Any) -> None:
-        """Turn off eco mode switch."""
-        try:
-            rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, ecoMode=False, rtc=rtc)
-            self._state = False
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error(exception)
-
-    async def async_turn_on(self, **kwargs: Any) -> None:
-        """Turn on eco mode switch."""
-        try:
-            rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, ecoMode=True, rtc=rtc)
-            self._state = True
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error(exception)
-
-
-class AlkoRainSensorSwitch(AlkoDeviceEntity, SwitchEntity):
+    coordinator: AlkoDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_add_descriptions(SWITCHES)
+
+    async_add_device_entities(
+        coordinator,
+        entry,
+        async_add_entities,
+        lambda snapshot: (
+            AlkoSwitch(coordinator, snapshot, description)
+            for description in SWITCHES
+            if snapshot.supports(description)
+        ),
+    )
+
+
+class AlkoSwitch(AlkoDescriptionEntity, SwitchEntity):
     """Defines an AL-KO switch."""
 
-    _attr_icon = "mdi:weather-rainy"
+    entity_description: AlkoSwitchEntityDescription
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice
+        coordinator: AlkoDataUpdateCoordinator,
+        snapshot: AlkoDeviceSnapshot,
+        description: AlkoSwitchEntityDescription,
     ) -> None:
         """Initialize AL-KO switch."""
-        super().__init__(
-            coordinator,
-            device,
-            "rain_sensor",
-            "Rain Sensor",
-        )
-        self._state = self.device.thingState.state.reported.rainSensor
-
-    @property
-    def is_on(self) -> bool:
-        """Return the state of the switch."""
-        return self._state
-
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        new_state = self.device.thingState.state.reported.rainSensor
-        if new_state != self._state:
-            self._state = new_state
-        super()._handle_coordinator_update()
-
-    async def async_turn_off(self, **kwargs: Any) -> None:
-        """Turn off rain sensor switch."""
-        try:
-            rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, rainSensor=False, rtc=rtc)
-            self._state = False
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error(exception)
-
-    async def async_turn_on(self, **kwargs: Any) -> None:
-        """Turn on rain sensor switch."""
-        try:
-            rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, rainSensor=True, rtc=rtc)
-            self._state = True
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error(exception)
-
-
-class AlkoFrostSensorSwitch(AlkoDeviceEntity, SwitchEntity):
-    """Defines an AL-KO frost sensor switch."""
-
-    _attr_icon = "mdi:snowflake"
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice
-    ) -> None:
-        """Initialize AL-KO frost sensor switch."""
-        super().__init__(
-            coordinator,
-            device,
-            "frost_sensor",
-            "Frost Sensor",
-        )
-        self._state = self.device.thingState.state.reported.frostSensor
+        super().__init__(coordinator, snapshot, description)
+        self._state = self.value
 
     @property
     def is_on(self) -> bool:
         """Return the state of the switch."""
         return self._state
 
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        new_state = self.device.thingState.state.reported.frostSensor
-        if new_state != self._state:
-            self._state = new_state
-        super()._handle_coordinator_update()
-
-    async def async_turn_off(self, **kwargs: Any) -> None:
-        """Turn off the frost sensor."""
-        try:
-            rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, frostSensor=False, rtc=rtc)
-            self._state = False
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error(exception)
+    @callback
+    def _async_update_from_snapshot(self, snapshot: AlkoDeviceSnapshot) -> None:
+        """Take the reported state from a new snapshot."""
+        self._state = snapshot.values.get(self.entity_description.key)
 
-    async def async_turn_on(self, **kwargs: Any) -> None:
-        """Turn on the frost sensor."""
+    async def _async_set_state(self, state: bool) -> None:
+        """Write the desired state and update optimistically once it is sent."""
         try:
             rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, frostSensor=True, rtc=rtc)
-            self._state = True
+            if not await self._update_device(
+                self.device,
+                rtc=rtc,
+                **{self.entity_description.update_key: state},
+            ):
+                return
+            self._state = state
             self.async_write_ha_state()
         except AlkoException as exception:
             _LOGGER.error(exception)
 
-
-class AlkoCancelTodaySwitch(AlkoDeviceEntity, SwitchEntity):
-    """Defines an AL-KO cancel today switch."""
-
-    _attr_icon = "mdi:calendar-remove"
-    _attr_name = "Paused for Today"
-
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator,
-        device: AlkoDevice
-    ) -> None:
-        """Initialize AL-KO cancel today switch."""
-        super().__init__(
-            coordinator,
-            device,
-            "cancel_today",
-            "Paused for Today"
-        )
-        self._state = self.device.thingState.state.reported.situationFlags.dayCancelled
-
-    @property
-    def is_on(self) -> bool:
-        """Return the state of the switch."""
-        return self._state
-
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        new_state = self.device.thingState.state.reported.situationFlags.dayCancelled
-        if new_state != self._state:
-            self._state = new_state
-        super()._handle_coordinator_update()
-
     async def async_turn_off(self, **kwargs: Any) -> None:
-        """Turn off cancel today switch."""
-        try:
-            rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, dayCancelled=False, rtc=rtc)
-            self._state = False
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error(exception)
+        """Turn off the switch."""
+        await self._async_set_state(False)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
-        """Turn on cancel today switch."""
-        try:
-            rtc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%S")
-            await self._update_device(self.device, dayCancelled=True, rtc=rtc)
-            self._state = True
-            self.async_write_ha_state()
-        except AlkoException as exception:
-            _LOGGER.error(exception)
+        """Turn on the switch."""
+        await self._async_set_state(True)
@@ -0,0 +1,206 @@
+"""In-memory history of key AL-KO device readings."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+import math
+
+from .snapshot import AlkoDeviceSnapshot
+
+# Numeric shadow fields kept per sample
+TELEMETRY_FIELDS = (
+    "batteryLevel",
+    "rssi",
+    "operationTimeBlade",
+    "operationTimeMowing",
+    "remainingBladeLifetime",
+)
+
+# Hours of history kept per device, and the length in seconds of the slots
+# samples are bucketed into, a newer sample in the same slot replaces its
+# values but keeps the time the slot was started, so level changes seen on
+# the first poll of a slot keep their exact spacing
+TELEMETRY_HOURS = 24
+TELEMETRY_RESOLUTION = 60
+
+NO_STATE = 0
+
+
+class AlkoTelemetryBuffer:
+    """Fixed-size ring of samples for one device, backed by typed arrays.
+
+    Timestamps are stored in seconds, fields as 32-bit floats with NaN
+    for missing values, and the operation state as a code into a small
+    per-device table, so a day of samples takes about 42 kB. The battery,
+    blade and anomaly estimators take their samples from here.
+    """
+
+    def __init__(
+        self,
+        hours: float = TELEMETRY_HOURS,
+        resolution: float = TELEMETRY_RESOLUTION,
+    ) -> None:
+        """Initialize the buffer."""
+        self.capacity = math.ceil(hours * 3600 / resolution)
+        self.resolution = resolution
+        self.times = array("d", bytes(8 * self.capacity))
+        self.fields = {
+            field: array("f", [math.nan]) * self.capacity
+            for field in TELEMETRY_FIELDS
+        }
+        self.state_codes = array("B", bytes(self.capacity))
+        self.states: list[str | None] = [None]
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the sample arrays."""
+        arrays = [self.times, self.state_codes, *self.fields.values()]
+        return sum(len(values) * values.itemsize for values in arrays)
+
+    @property
+    def last_time(self) -> float | None:
+        """Return the timestamp of the newest sample."""
+        return self._last_time if self._count else None
+
+    @property
+    def state(self) -> str | None:
+        """Return the operation state of the newest sample."""
+        if not self._count:
+            return None
+        return self.states[self.state_codes[self._index(self._count - 1)]]
+
+    def last(self, field: str) -> float | None:
+        """Return the newest value of a field, None if it was missing."""
+        if not self._count:
+            return None
+        value = self.fields[field][self._index(self._count - 1)]
+        return None if math.isnan(value) else value
+
+    @property
+    def span(self) -> float:
+        """Return the seconds between the oldest and newest sample."""
+        if not self._count:
+            return 0
+        return self.times[self._index(self._count - 1)] - self.times[self._index(0)]
+
+    def append(self, snapshot: AlkoDeviceSnapshot) -> None:
+        """Add a sample taken from a fresh snapshot."""
+        timestamp = snapshot.last_updated.timestamp()
+        if self._count and self._bucket(timestamp) == self._bucket(self._last_time):
+            slot = self._index(self._count - 1)
+        else:
+            slot = self._head
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self.times[slot] = timestamp
+
+        for field, values in self.fields.items():
+            value = snapshot.get(field)
+            values[slot] = value if isinstance(value, (int, float)) else math.nan
+        self.state_codes[slot] = self._state_code(snapshot.get("operationState"))
+
+    def series(
+        self, field: str, since: float | None = None
+    ) -> Iterator[tuple[float, float]]:
+        """Yield (timestamp, value) pairs of a field, oldest first."""
+        values = self.fields[field]
+        for slot in self._slots(since):
+            if not math.isnan(value := values[slot]):
+                yield self.times[slot], value
+
+    def run(
+        self, *fields: str, max_gap: float | None = None
+    ) -> Iterator[tuple[float, ...]]:
+        """Yield (timestamp, *values) of the current operation state, newest first.
+
+        Stops at the first sample in another state or before a gap longer
+        than max_gap. Missing values are NaN.
+        """
+        if not self._count:
+            return
+        newest = self._index(self._count - 1)
+        state_code = self.state_codes[newest]
+        later = self.times[newest]
+        for position in range(self._count - 1, -1, -1):
+            slot = self._index(position)
+            timestamp = self.times[slot]
+            if self.state_codes[slot] != state_code or (
+                max_gap is not None and later - timestamp > max_gap
+            ):
+                return
+            later = timestamp
+            yield (timestamp, *(self.fields[field][slot] for field in fields))
+
+    def state_series(
+        self, since: float | None = None
+    ) -> Iterator[tuple[float, str | None]]:
+        """Yield (timestamp, operation state) pairs, oldest first."""
+        for slot in self._slots(since):
+            yield self.times[slot], self.states[self.state_codes[slot]]
+
+    def time_in_state(self, state: str, since: float | None = None) -> float:
+        """Return the seconds spent in an operation state.
+
+        Each sample counts until the next one, gaps longer than a few
+        resolutions count as unknown.
+        """
+        total = 0.0
+        previous: tuple[float, str | None] | None = None
+        for timestamp, current in self.state_series(since):
+            if previous is not None and previous[1] == state:
+                total += min(timestamp - previous[0], 5 * self.resolution)
+            previous = (timestamp, current)
+        return total
+
+    def rate(self, field: str, since: float | None = None) -> float | None:
+        """Return the change of a field per hour over the window."""
+        first = last = None
+        for sample in self.series(field, since):
+            first = first or sample
+            last = sample
+        if first is None or last is None or last[0] <= first[0]:
+            return None
+        return (last[1] - first[1]) / (last[0] - first[0]) * 3600
+
+    @property
+    def _last_time(self) -> float:
+        """Return the timestamp of the newest sample."""
+        return self.times[self._index(self._count - 1)]
+
+    def _bucket(self, timestamp: float) -> int:
+        """Return the resolution bucket a timestamp falls in."""
+        return int(timestamp // self.resolution)
+
+    def _index(self, position: int) -> int:
+        """Return the slot of the sample at a position, 0 being the oldest."""
+        return (self._head - self._count + position) % self.capacity
+
+    def _slots(self, since: float | None) -> Iterator[int]:
+        """Yield the slots of samples taken at or after since, oldest first."""
+        low, high = 0, self._count
+        # Samples are in time order, so find the first one by bisection
+        while since is not None and low < high:
+            middle = (low + high) // 2
+            if self.times[self._index(middle)] < since:
+                low = middle + 1
+            else:
+                high = middle
+        for position in range(low, self._count):
+            yield self._index(position)
+
+    def _state_code(self, state: str | None) -> int:
+        """Return the code of an operation state, adding it when new."""
+        if state is None:
+            return NO_STATE
+        try:
+            return self.states.index(state)
+        except ValueError:
+            self.states.append(state)
+            return len(self.states) - 1
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""Benchmarks for the AL-KO integration.
+
+Sets the integration up in a bare Home Assistant instance against
+scripts/mock_cloud.py and measures, per fleet size:
+
+- setup time of all platforms
+- refresh wall time and peak allocations
+- entity fan-out time and state writes per refresh
+
+It also measures the next operation sensor and the calendar against a
+dense schedule. Results are written as JSON and checked against
+scripts/benchmark_thresholds.json; the exit code is 1 on a regression.
+With --replay the fleet comes from a traffic capture instead, see
+scripts/replay.py.
+
+    python3 scripts/benchmark.py --output bench.json
+    python3 scripts/benchmark.py --baseline bench.json
+    python3 scripts/benchmark.py --replay alko_capture.ndjson.gz --speed 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import timedelta
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from mock_cloud import DAYS, MockAlkoCloud, _window
+from replay import ReplayAlkoCloud, load_capture
+
+ROOT = Path(__file__).resolve().parent.parent
+THRESHOLDS = Path(__file__).resolve().parent / "benchmark_thresholds.json"
+
+
+async def async_start_hass(config_dir: str):
+    """Start a bare Home Assistant instance that can load the integration."""
+    from homeassistant import auth, core, loader
+    from homeassistant.config_entries import ConfigEntries
+    from homeassistant.helpers import (
+        area_registry,
+        category_registry,
+        device_registry,
+        entity_registry,
+        floor_registry,
+        frame,
+        issue_registry,
+        label_registry,
+    )
+    from homeassistant.setup import async_setup_component
+
+    hass = core.HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    frame.async_setup(hass)
+    for registry in (
+        area_registry,
+        category_registry,
+        device_registry,
+        entity_registry,
+        floor_registry,
+        issue_registry,
+        label_registry,
+    ):
+        await registry.async_load(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    # The OAuth implementation is registered directly, skip the frontend parts
+    hass.config.components.update({"application_credentials", "diagnostics"})
+    hass.set_state(core.CoreState.running)
+    # The calendar needs the HTTP server, keep it off the default port
+    hass.auth = await auth.auth_manager_from_config(hass, [], [])
+    await async_setup_component(
+        hass,
+        "http",
+        {"http": {"server_host": ["127.0.0.1"], "server_port": free_port()}},
+    )
+    await async_setup_component(hass, "network", {})
+    return hass
+
+
+async def async_add_entry(hass, cloud_url: str):
+    """Register the OAuth implementation and add a config entry."""
+    from aiohttp import ClientSession
+
+    from homeassistant.components.application_credentials import (
+        AuthorizationServer,
+        ClientCredential,
+    )
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.helpers import config_entry_oauth2_flow
+
+    from custom_components.alko.api import AlkoLocalOAuth2Implementation
+    from custom_components.alko.const import DOMAIN, OAUTH2_TOKEN
+
+    config_entry_oauth2_flow.async_register_implementation(
+        hass,
+        DOMAIN,
+        AlkoLocalOAuth2Implementation(
+            hass,
+            DOMAIN,
+            ClientCredential("benchmark", "benchmark"),
+            AuthorizationServer(authorize_url="", token_url=OAUTH2_TOKEN),
+        ),
+    )
+    async with ClientSession() as session:
+        response = await session.post(f"{cloud_url}/connect/token")
+        token = await response.json()
+    token["expires_at"] = time.time() + 3600
+
+    return ConfigEntry(
+        data={"auth_implementation": DOMAIN, "token": token},
+        discovery_keys={},
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source="user",
+        subentries_data=None,
+        title="Benchmark",
+        unique_id=DOMAIN,
+        version=1,
+    )
+
+
+def _entity(hass, entity_id: str):
+    """Return the entity object behind an entity ID."""
+    from homeassistant.helpers import entity_platform
+
+    for entity_platform_ in entity_platform.async_get_platforms(hass, "alko"):
+        if entity_id in entity_platform_.entities:
+            return entity_platform_.entities[entity_id]
+    raise LookupError(entity_id)
+
+
+def _dense_schedule() -> dict[str, Any]:
+    """Return a schedule with both windows active on every day."""
+    return {
+        day: {
+            "window_1": _window(6 + index, 15, 180),
+            "window_2": _window(14 + index % 5, 45, 120),
+        }
+        for index, day in enumerate(DAYS)
+    }
+
+
+async def _async_bench_fleet(
+    cloud: MockAlkoCloud | ReplayAlkoCloud,
+    devices: int | str,
+    repeat: int,
+    port: int,
+    schedule: bool,
+) -> dict[str, float]:
+    """Benchmark one fleet in a fresh instance."""
+    from homeassistant.config_entries import ConfigEntryState
+    from homeassistant.const import EVENT_STATE_CHANGED
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.util import dt as dt_util
+
+    from custom_components.alko.const import DOMAIN
+
+    cloud_url = await cloud.start(port=port)
+
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.symlink(ROOT / "custom_components", Path(config_dir) / "custom_components")
+        hass = await async_start_hass(config_dir)
+        try:
+            entry = await async_add_entry(hass, cloud_url)
+            start = time.perf_counter()
+            await hass.config_entries.async_add(entry)
+            await hass.async_block_till_done()
+            results[f"setup_ms/{devices}"] = (time.perf_counter() - start) * 1000
+            if entry.state is not ConfigEntryState.LOADED:
+                raise RuntimeError(f"Setup failed: {entry.state}")
+            coordinator = hass.data[DOMAIN][entry.entry_id]
+
+            # Count every state write and every actual state change
+            writes = 0
+            write_ha_state = Entity._async_write_ha_state
+
+            def _counting_write(entity: Entity) -> None:
+                nonlocal writes
+                writes += 1
+                write_ha_state(entity)
+
+            changes = 0
+
+            def _count_change(_event) -> None:
+                nonlocal changes
+                changes += 1
+
+            unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _count_change)
+            Entity._async_write_ha_state = _counting_write
+            timings = []
+            try:
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    await coordinator.async_refresh()
+                    await hass.async_block_till_done()
+                    timings.append(time.perf_counter() - start)
+            finally:
+                Entity._async_write_ha_state = write_ha_state
+                unsub()
+
+            results[f"refresh_ms/{devices}"] = statistics.median(timings) * 1000
+            results[f"fanout_ms/{devices}"] = coordinator.metrics.summary("fanout")[
+                "p50"
+            ]
+            results[f"state_writes/{devices}"] = writes / repeat
+            results[f"state_changes/{devices}"] = changes / repeat
+
+            tracemalloc.start()
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[f"refresh_peak_kib/{devices}"] = peak / 1024
+
+            if schedule:
+                thing_name = next(iter(coordinator.data))
+                slug = coordinator.data[thing_name].meta.model_slug
+                sensor = _entity(hass, f"sensor.{slug}_next_operation")
+                calls = 1000
+                start = time.perf_counter()
+                for _ in range(calls):
+                    sensor.state  # noqa: B018
+                results["next_operation_us"] = (
+                    (time.perf_counter() - start) / calls * 1_000_000
+                )
+
+                calendar = _entity(hass, f"calendar.{slug}_mowing_schedule")
+                now = dt_util.now()
+                for days in (7, 30):
+                    calls = 200
+                    start = time.perf_counter()
+                    for _ in range(calls):
+                        await calendar.async_get_events(
+                            hass, now, now + timedelta(days=days)
+                        )
+                    results[f"calendar_events_ms/{days}d"] = (
+                        (time.perf_counter() - start) / calls * 1000
+                    )
+        finally:
+            await hass.async_stop(force=True)
+            await cloud.stop()
+
+    return {name: round(value, 3) for name, value in results.items()}
+
+
+def _check(
+    results: dict[str, float],
+    thresholds: dict[str, float],
+    baseline: dict[str, Any] | None,
+) -> tuple[dict[str, Any], bool]:
+    """Compare results against thresholds and an optional baseline run."""
+    report: dict[str, Any] = {}
+    passed = True
+    for name, value in results.items():
+        entry: dict[str, Any] = {"value": value}
+        if (threshold := thresholds.get(name)) is not None:
+            entry["threshold"] = threshold
+            entry["ok"] = value <= threshold
+            passed &= entry["ok"]
+        if baseline and (previous := baseline.get(name, {}).get("value")):
+            entry["baseline"] = previous
+            entry["change_pct"] = round((value - previous) / previous * 100, 1)
+        report[name] = entry
+    return report, passed
+
+
+async def _async_main(args: argparse.Namespace, port: int) -> int:
+    """Run all benchmarks and write the report."""
+    results: dict[str, float] = {}
+    if args.replay:
+        # Benchmarks time the integration, not the recorded pace of the session
+        cloud = ReplayAlkoCloud(load_capture(args.replay), args.speed, pace=False)
+        print(f"Benchmarking replay of {len(cloud.things)} devices", file=sys.stderr)
+        results.update(
+            await _async_bench_fleet(cloud, "replay", args.repeat, port, schedule=False)
+        )
+
+    for index, devices in enumerate([] if args.replay else args.devices):
+        print(f"Benchmarking {devices} devices", file=sys.stderr)
+        cloud = MockAlkoCloud(devices)
+        for thing in cloud.things.values():
+            reported = thing["thingState"]["state"]["reported"]
+            reported["mowingWindows"] = _dense_schedule()
+        results.update(
+            await _async_bench_fleet(
+                cloud, devices, args.repeat, port, schedule=index == 0
+            )
+        )
+
+    thresholds = json.loads(args.thresholds.read_text()) if args.thresholds else {}
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+    report, passed = _check(results, thresholds, baseline)
+
+    from homeassistant.const import __version__ as ha_version
+
+    output = json.dumps(
+        {
+            "python": platform.python_version(),
+            "homeassistant": ha_version,
+            "machine": platform.machine(),
+            "passed": passed,
+            "results": report,
+        },
+        indent=2,
+    )
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+
+    for name, entry in report.items():
+        if entry.get("ok") is False:
+            print(
+                f"REGRESSION {name}: {entry['value']} > {entry['threshold']}",
+                file=sys.stderr,
+            )
+    return 0 if passed else 1
+
+
+def main() -> None:
+    """Parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=0, help="mock cloud port")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path, help="earlier --output to compare")
+    parser.add_argument("--thresholds", type=Path, default=THRESHOLDS)
+    parser.add_argument("--replay", type=Path, help="capture to serve instead")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed")
+    args = parser.parse_args()
+
+    port = args.port or free_port()
+    use_local_cloud(port)
+    sys.exit(asyncio.run(_async_main(args, port)))
+
+
+def use_local_cloud(port: int) -> None:
+    """Point the integration at a local cloud and make it importable.
+
+    The endpoints are read when the integration is imported, so this has
+    to run before anything from it is loaded.
+    """
+    os.environ["ALKO_BASE_URL"] = f"http://127.0.0.1:{port}/v1/iot/things"
+    os.environ["ALKO_OAUTH2_TOKEN"] = f"http://127.0.0.1:{port}/connect/token"
+    sys.path.insert(0, str(ROOT))
+
+
+def free_port() -> int:
+    """Return a free TCP port on the loopback interface."""
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""Local stand-in for the AL-KO cloud.
+
+Serves the OAuth token endpoint and the things/shadow API with a
+configurable fleet, latency and injected 429/5xx errors. Point the
+integration at it with the const.py overrides:
+
+    ALKO_BASE_URL=http://127.0.0.1:8765/v1/iot/things \\
+    ALKO_OAUTH2_TOKEN=http://127.0.0.1:8765/connect/token \\
+    scripts/develop
+
+Any username, password and client credentials are accepted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+from dataclasses import dataclass, field
+import logging
+import random
+import secrets
+from typing import Any
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def _window(
+    start_hour: int, start_minute: int, duration: int, active: bool = True
+) -> dict[str, Any]:
+    """Return a mowing window."""
+    return {
+        "activityMode": active,
+        "marginMode": False,
+        "narrowPassageMode": False,
+        "startHour": start_hour,
+        "startMinute": start_minute,
+        "duration": duration,
+        "entryPoint": 1,
+    }
+
+
+def make_reported(index: int) -> dict[str, Any]:
+    """Return a reported shadow with the fields from DEVICE_CAPABILITIES.md."""
+    return {
+        "isConnected": True,
+        "rssi": -55 - index % 30,
+        "batteryLevel": 100 - index * 7 % 60,
+        "battery": {"voltage": 20500, "chargingCurrent": 0},
+        "temperature": {"battery": 21, "motor": 30, "environment": 18},
+        "operationState": "IDLE_BASE_STATION",
+        "operationSubState": "NONE",
+        "operationSituation": "NONE",
+        "operationError": {"code": 999, "type": "NONE", "description": ""},
+        "nextOperation": "2025-01-01T09:00:00",
+        "remainingBladeLifetime": 120,
+        "remainingDuration": 0,
+        "remainingDurationPercentage": 0,
+        "operationTimeTotal": 1500,
+        "operationTimeMowing": 1200,
+        "operationTimeWheelMotorLeft": 1150,
+        "operationTimeWheelMotorRight": 1150,
+        "operationTimeBlade": 80,
+        "mowingCycles": 400,
+        "chargingCycles": 390,
+        "ecoMode": False,
+        "rainSensor": True,
+        "rainSensitivity": 5,
+        "rainDelay": 60,
+        "frostSensor": True,
+        "frostThreshold": 3,
+        "frostDelay": 30,
+        "tiltSlope": 0,
+        "demoMode": False,
+        "marginMowing": 0,
+        "manualMarginMowing": False,
+        "boundaryOverlap": 0,
+        "bladeSpeed": 1,
+        "resetBladesService": False,
+        "hall": {"bumperTriggered": False},
+        "languageSettings": {"selected": "en"},
+        "situationFlags": {
+            "rainDetected": False,
+            "rainAllowsMowing": True,
+            "frostDetected": False,
+            "frostAllowsMowing": True,
+            "chargerActive": False,
+            "chargerContact": True,
+            "robotIsActive": False,
+            "dayCancelled": False,
+            "userInteraction": False,
+            "operationPermitted": True,
+        },
+        "mowingWindows": {
+            day: {"window_1": _window(9, 0, 120), "window_2": _window(0, 0, 0, False)}
+            for day in DAYS
+        },
+        "manualMowing": {"activityMode": False, "startHour": 0, "startMinute": 0},
+    }
+
+
+def make_thing(index: int) -> dict[str, Any]:
+    """Return a thing as listed by the things endpoint."""
+    thing_name = f"mock{index:04d}"
+    return {
+        "thingName": thing_name,
+        "thingType": "ROBOLINHO",
+        "thingAttributes": {
+            "thingName": thing_name,
+            "thingType": "ROBOLINHO",
+            "thingModel": f"Robolinho Mock {index}",
+            "serialNumber": f"SN{index:08d}",
+            "firmwareMain": "9.9.9",
+            "hardwareVersionMain": "1",
+        },
+        "thingState": {"state": {"reported": make_reported(index)}},
+    }
+
+
+def merge(target: dict[str, Any], update: dict[str, Any]) -> None:
+    """Merge a desired state write into the reported shadow."""
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+@dataclass
+class Faults:
+    """Latency and errors injected into every API response."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    seed: int | None = None
+    random: random.Random = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Seed the random source so runs are reproducible."""
+        self.random = random.Random(self.seed)
+
+    def delay(self) -> float:
+        """Return the delay for the next response in seconds."""
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def status(self) -> int | None:
+        """Return an injected error status, if any."""
+        roll = self.random.random()
+        if roll < self.rate_429:
+            return 429
+        if roll < self.rate_429 + self.rate_5xx:
+            return self.random.choice((500, 502, 503))
+        return None
+
+
+class MockAlkoCloud:
+    """In-memory AL-KO cloud."""
+
+    def __init__(self, devices: int = 1, faults: Faults | None = None) -> None:
+        """Initialize the mock cloud."""
+        self.faults = faults or Faults()
+        self.things = {
+            thing["thingName"]: thing for thing in map(make_thing, range(devices))
+        }
+        self.tokens: set[str] = set()
+        self.requests = 0
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_post("/connect/token", self._token)
+        self.app.router.add_get("/v1/iot/things", self._things)
+        self.app.router.add_get("/v1/iot/things/{thing}", self._thing)
+        self.app.router.add_patch("/v1/iot/things/{thing}/state/desired", self._desired)
+        self._runner: web.AppRunner | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        """Inject latency and errors, and check the bearer token."""
+        self.requests += 1
+        await asyncio.sleep(self.faults.delay())
+        if (status := self.faults.status()) is not None:
+            return web.json_response({"message": "injected error"}, status=status)
+
+        if request.path != "/connect/token":
+            token = request.headers.get("authorization", "").removeprefix("Bearer ")
+            if token not in self.tokens:
+                return web.json_response({"message": "unauthorized"}, status=401)
+        return await handler(request)
+
+    async def _token(self, request: web.Request) -> web.Response:
+        """Issue a token for any password or refresh token grant."""
+        access_token = secrets.token_hex(16)
+        self.tokens.add(access_token)
+        return web.json_response(
+            {
+                "access_token": access_token,
+                "refresh_token": secrets.token_hex(16),
+                "expires_in": 3600,
+                "token_type": "Bearer",
+                "scope": "alkoCustomerId alkoCulture offline_access introspection",
+            }
+        )
+
+    async def _things(self, request: web.Request) -> web.Response:
+        """List things, with their shadow when thingState=true."""
+        if request.query.get("thingState") == "true":
+            return web.json_response(list(self.things.values()))
+        return web.json_response(
+            [
+                {key: value for key, value in thing.items() if key != "thingState"}
+                for thing in self.things.values()
+            ]
+        )
+
+    async def _thing(self, request: web.Request) -> web.Response:
+        """Return a single thing."""
+        thing = self.things.get(request.match_info["thing"])
+        if thing is None:
+            return web.json_response({"message": "not found"}, status=404)
+        return web.json_response(thing)
+
+    async def _desired(self, request: web.Request) -> web.Response:
+        """Apply a desired state write to the reported shadow right away."""
+        thing = self.things.get(request.match_info["thing"])
+        if thing is None:
+            return web.json_response({"message": "not found"}, status=404)
+        desired = await request.json()
+        desired.pop("rtc", None)
+        reported = thing["thingState"]["state"]["reported"]
+        if "dayCancelled" in desired:
+            reported["situationFlags"]["dayCancelled"] = desired.pop("dayCancelled")
+        merge(reported, desired)
+        return web.json_response({"state": {"desired": desired}})
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    """Run the mock cloud until interrupted."""
+    cloud = MockAlkoCloud(
+        args.devices,
+        Faults(
+            latency=args.latency / 1000,
+            jitter=args.jitter / 1000,
+            rate_429=args.rate_429,
+            rate_5xx=args.rate_5xx,
+            seed=args.seed,
+        ),
+    )
+    url = await cloud.start(args.host, args.port)
+    print(f"ALKO_BASE_URL={url}/v1/iot/things")
+    print(f"ALKO_OAUTH2_TOKEN={url}/connect/token")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await cloud.stop()
+
+
+def main() -> None:
+    """Parse arguments and serve."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds")
+    parser.add_argument("--jitter", type=float, default=0, help="milliseconds")
+    parser.add_argument("--rate-429", type=float, default=0, help="0-1")
+    parser.add_argument("--rate-5xx", type=float, default=0, help="0-1")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
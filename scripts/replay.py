@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Serve recorded AL-KO cloud traffic back to the integration.
+
+Reads a capture written with the "Record cloud traffic" option and
+answers every request with the next recorded response for the same
+endpoint, including its status and latency. A response is not sent
+before its recorded offset from the first request, so device states
+change at the pace they did while recording. Offsets and latencies are
+divided by --speed, responses cycle once an endpoint runs out of
+recordings, and --no-pace answers as soon as the latency has passed.
+
+    python3 scripts/replay.py /config/alko_capture_20250601_120000.ndjson.gz
+    ALKO_BASE_URL=http://127.0.0.1:8765/v1/iot/things \\
+    ALKO_OAUTH2_TOKEN=http://127.0.0.1:8765/connect/token \\
+    scripts/develop
+
+scripts/benchmark.py --replay runs the benchmarks against a capture.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter, deque
+import gzip
+import json
+import logging
+from pathlib import Path
+import secrets
+from typing import Any
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+# Capture layout understood by this script, see custom_components/alko/capture.py
+CAPTURE_VERSION = 1
+
+THINGS_PATH = "/v1/iot/things"
+
+
+def load_capture(path: str | Path) -> list[dict[str, Any]]:
+    """Return the exchanges of a capture in recorded order."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file if line.strip()]
+    if not lines or lines[0].get("capture") != CAPTURE_VERSION:
+        raise ValueError(f"{path} is not a version {CAPTURE_VERSION} AL-KO capture")
+    return sorted(
+        (line for line in lines if "capture" not in line), key=lambda line: line["t"]
+    )
+
+
+class ReplayAlkoCloud:
+    """AL-KO cloud answering from a capture."""
+
+    def __init__(
+        self,
+        exchanges: list[dict[str, Any]],
+        speed: float = 1.0,
+        pace: bool = True,
+    ) -> None:
+        """Initialize the replay."""
+        self.speed = speed
+        self.pace = pace
+        # Recorded offsets are relative to the first exchange, a cycle through
+        # an endpoint's recordings takes as long as the whole capture
+        self.origin = exchanges[0]["t"] if exchanges else 0.0
+        self.duration = max(
+            (
+                exchange["t"] + exchange["ms"] / 1000 - self.origin
+                for exchange in exchanges
+            ),
+            default=0.0,
+        )
+        self._started: float | None = None
+        self.queues: dict[tuple[str, str], deque[dict[str, Any]]] = {}
+        for exchange in exchanges:
+            key = (exchange["method"], exchange["endpoint"])
+            self.queues.setdefault(key, deque()).append(exchange)
+        self.served: Counter[tuple[str, str]] = Counter()
+        self.unmatched = 0
+        self.app = web.Application()
+        self.app.router.add_post("/connect/token", self._token)
+        self.app.router.add_route("*", THINGS_PATH + "{tail:.*}", self._replay)
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def things(self) -> set[str]:
+        """Return the thing names in the recorded device lists."""
+        return {
+            thing["thingName"]
+            for (method, endpoint), queue in self.queues.items()
+            if method == "GET" and endpoint.startswith("?")
+            for exchange in queue
+            if isinstance(exchange["response"], list)
+            for thing in exchange["response"]
+        }
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _token(self, request: web.Request) -> web.Response:
+        """Issue a token for any grant, the capture holds none."""
+        return web.json_response(
+            {
+                "access_token": secrets.token_hex(16),
+                "refresh_token": secrets.token_hex(16),
+                "expires_in": 3600,
+                "token_type": "Bearer",
+                "scope": "alkoCustomerId alkoCulture offline_access introspection",
+            }
+        )
+
+    async def _replay(self, request: web.Request) -> web.Response:
+        """Answer with the next recorded exchange for the endpoint."""
+        endpoint = request.path_qs.removeprefix(THINGS_PATH) or "/"
+        key = (request.method, endpoint)
+        queue = self.queues.get(key)
+        if not queue:
+            self.unmatched += 1
+            _LOGGER.warning("No recording for %s %s", *key)
+            if request.method == "PATCH":
+                return web.json_response(await request.json())
+            return web.json_response({"message": "not recorded"}, status=404)
+
+        exchange = queue[0]
+        queue.rotate(-1)
+        cycle = self.served[key] // len(queue)
+        self.served[key] += 1
+        if self.pace:
+            await self._async_wait_for(exchange["t"] + cycle * self.duration)
+        await asyncio.sleep(exchange["ms"] / 1000 / self.speed)
+
+        status = exchange["status"] or 503
+        response = exchange["response"]
+        if isinstance(response, str):
+            return web.Response(text=response, status=status)
+        return web.json_response(response, status=status)
+
+
+    async def _async_wait_for(self, offset: float) -> None:
+        """Wait until a recorded offset is reached, counted from the first request."""
+        loop = asyncio.get_running_loop()
+        if self._started is None:
+            self._started = loop.time()
+        due = self._started + (offset - self.origin) / self.speed
+        if (delay := due - loop.time()) > 0:
+            await asyncio.sleep(delay)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    """Replay a capture until interrupted."""
+    cloud = ReplayAlkoCloud(load_capture(args.capture), args.speed, args.pace)
+    url = await cloud.start(args.host, args.port)
+    print(f"Replaying {sum(map(len, cloud.queues.values()))} exchanges")
+    print(f"ALKO_BASE_URL={url}{THINGS_PATH}")
+    print(f"ALKO_OAUTH2_TOKEN={url}/connect/token")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await cloud.stop()
+        for (method, endpoint), count in cloud.served.most_common():
+            print(f"{count:6d} {method} {endpoint}")
+
+
+def main() -> None:
+    """Parse arguments and serve."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="offset and latency divisor"
+    )
+    parser.add_argument(
+        "--no-pace",
+        dest="pace",
+        action="store_false",
+        help="answer without waiting for the recorded offsets",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""Run the schedule entities against a virtual clock.
+
+Steps a fake clock through a simulated period, by default a year in
+30 minute ticks, in a time zone with daylight saving time. Along the way
+the mower schedule is edited, days are cancelled and manual mowing is
+started at random. On every tick the next operation sensor and the
+calendar are evaluated and compared with a reference expansion of the
+schedule, and the evaluation cost is recorded.
+
+    python3 scripts/simulate_schedule.py --days 365 --tick 30
+    python3 scripts/simulate_schedule.py --time-zone America/New_York --strict
+
+The report is JSON. With --strict the exit code is 1 on any mismatch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time as dt_time, timedelta, tzinfo
+import json
+from pathlib import Path
+import random
+import statistics
+import sys
+import time
+from typing import Any
+
+from mock_cloud import DAYS, _window, make_thing
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Mismatches listed in the report per check
+EXAMPLES = 10
+
+
+@dataclass
+class VirtualClock:
+    """Clock the entities read through dt_util.now()."""
+
+    current: datetime
+
+    def now(self, time_zone: tzinfo | None = None) -> datetime:
+        """Return the virtual time, like dt_util.now()."""
+        from homeassistant.util import dt as dt_util
+
+        return self.current.astimezone(time_zone or dt_util.get_default_time_zone())
+
+
+@dataclass
+class Fleet:
+    """Holds the snapshots the entities read, in place of a coordinator."""
+
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Check:
+    """Cost and mismatches of one evaluated entity."""
+
+    timings: list[float] = field(default_factory=list)
+    mismatches: int = 0
+    examples: list[dict[str, Any]] = field(default_factory=list)
+
+    def mismatch(self, **example: Any) -> None:
+        """Count a mismatch, keeping the first few as examples."""
+        self.mismatches += 1
+        if len(self.examples) < EXAMPLES:
+            self.examples.append(example)
+
+    def report(self) -> dict[str, Any]:
+        """Return the evaluation cost in microseconds and the mismatches."""
+        ordered = sorted(self.timings)
+        return {
+            "evaluations": len(ordered),
+            "p50_us": round(statistics.median(ordered) * 1_000_000, 1),
+            "p95_us": round(ordered[int(len(ordered) * 0.95)] * 1_000_000, 1),
+            "max_us": round(ordered[-1] * 1_000_000, 1),
+            "mismatches": self.mismatches,
+            "examples": self.examples,
+        }
+
+
+class Reference:
+    """Straightforward expansion of a schedule into dated occurrences.
+
+    Occurrences are compared in UTC, so wall clock times skipped or
+    repeated by a DST shift still order correctly.
+    """
+
+    def __init__(self, reported: dict[str, Any], tz: tzinfo) -> None:
+        """Initialize the reference for the current shadow."""
+        self.reported = reported
+        self.tz = tz
+        self.cancelled: date | None = None
+        self.manual: date | None = None
+
+    def occurrences(self, day: date) -> list[tuple[datetime, datetime]]:
+        """Return the mowing occurrences starting on a local date."""
+        windows = []
+        if day != self.cancelled:
+            day_windows = self.reported["mowingWindows"].get(DAYS[day.weekday()], {})
+            windows = [
+                window
+                for window in (day_windows.get("window_1"), day_windows.get("window_2"))
+                if window and window.get("activityMode")
+            ]
+        if day == self.manual:
+            windows.append(self.reported["manualMowing"])
+
+        result = []
+        for window in windows:
+            start = datetime.combine(
+                day,
+                dt_time(window.get("startHour", 0), window.get("startMinute", 0)),
+                tzinfo=self.tz,
+            ).astimezone(UTC)
+            result.append((start, start + timedelta(minutes=window.get("duration", 0))))
+        return sorted(result)
+
+    def next_start(self, now: datetime) -> datetime | None:
+        """Return the first occurrence starting after now."""
+        today = now.date()
+        for offset in range(8):
+            for start, _ in self.occurrences(today + timedelta(days=offset)):
+                if start > now:
+                    return start
+        return None
+
+    def events(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[datetime, datetime]]:
+        """Return the occurrences overlapping a period."""
+        day = start.date() - timedelta(days=1)
+        result = []
+        while day <= end.date():
+            result.extend(
+                occurrence
+                for occurrence in self.occurrences(day)
+                if occurrence[0] <= end and occurrence[1] >= start
+            )
+            day += timedelta(days=1)
+        return result
+
+
+def _local(value: datetime, tz: tzinfo) -> str:
+    """Return a timestamp in the simulated time zone."""
+    return value.astimezone(tz).isoformat()
+
+
+def _random_schedule(rng: random.Random) -> dict[str, Any]:
+    """Return a schedule with a random mix of active windows."""
+    schedule = {}
+    for day in DAYS:
+        # Early starts are common and land inside DST gaps and overlaps
+        window_1 = _window(
+            rng.choice((1, 2, 3, 6, 8, 9, 10)),
+            rng.choice((0, 15, 30, 45)),
+            rng.randint(30, 240),
+            rng.random() < 0.7,
+        )
+        window_2 = _window(
+            rng.randint(12, 22),
+            rng.choice((0, 30)),
+            rng.randint(30, 120),
+            rng.random() < 0.3,
+        )
+        schedule[day] = {"window_1": window_1, "window_2": window_2}
+    return schedule
+
+
+async def _async_simulate(args: argparse.Namespace) -> dict[str, Any]:
+    """Step the clock through the simulated period."""
+    from pyalko.objects.device import AlkoDevice
+
+    from homeassistant.util import dt as dt_util
+
+    from custom_components.alko.calendar import AlkoMowingCalendar
+    from custom_components.alko.sensor import AlkoNextOperationSensor
+    from custom_components.alko.snapshot import AlkoDeviceMeta, AlkoDeviceSnapshot
+
+    tz = dt_util.get_time_zone(args.time_zone)
+    if tz is None:
+        raise SystemExit(f"Unknown time zone {args.time_zone}")
+    dt_util.set_default_time_zone(tz)
+
+    rng = random.Random(args.seed)
+    thing = make_thing(0)
+    reported = thing["thingState"]["state"]["reported"]
+    reported["mowingWindows"] = _random_schedule(rng)
+    reported["manualMowing"] = {"activityMode": False, "startHour": 0, "startMinute": 0}
+    device = AlkoDevice(None, thing)
+    meta = AlkoDeviceMeta.from_device(device)
+
+    clock = VirtualClock(datetime.combine(args.start, dt_time(), tzinfo=tz))
+    end = clock.current + timedelta(days=args.days)
+    fleet = Fleet()
+    reference = Reference(reported, tz)
+
+    def publish() -> None:
+        """Build a new snapshot from the shadow, like a refresh does."""
+        fleet.data[device.thingName] = AlkoDeviceSnapshot.from_device(
+            AlkoDevice(None, copy.deepcopy(thing)), meta, clock.now()
+        )
+
+    publish()
+    sensor = AlkoNextOperationSensor(fleet, fleet.data[device.thingName])
+    calendar = AlkoMowingCalendar(fleet, fleet.data[device.thingName])
+
+    next_operation = Check()
+    events = Check()
+    transitions: dict[str, int] = {
+        "schedule_edits": 0,
+        "days_cancelled": 0,
+        "manual_mowing": 0,
+        "dst_shifts": 0,
+    }
+    tick = timedelta(minutes=args.tick)
+    ticks = 0
+    current_day = clock.now().date()
+    last_offset = clock.now().utcoffset()
+
+    real_now = dt_util.now
+    dt_util.now = clock.now
+    start = time.perf_counter()
+    try:
+        while clock.current < end:
+            now = clock.now()
+            if now.utcoffset() != last_offset:
+                transitions["dst_shifts"] += 1
+                last_offset = now.utcoffset()
+
+            # Synthetic state transitions, flags reset at midnight
+            changed = False
+            if now.date() != current_day:
+                current_day = now.date()
+                changed = True
+                reported["situationFlags"]["dayCancelled"] = False
+                reported["manualMowing"]["activityMode"] = False
+                reference.cancelled = reference.manual = None
+            if rng.random() < args.edit_rate:
+                reported["mowingWindows"] = _random_schedule(rng)
+                transitions["schedule_edits"] += 1
+                changed = True
+            if rng.random() < args.cancel_rate and reference.cancelled is None:
+                reported["situationFlags"]["dayCancelled"] = True
+                reference.cancelled = current_day
+                transitions["days_cancelled"] += 1
+                changed = True
+            if rng.random() < args.manual_rate and reference.manual is None:
+                manual_start = now + timedelta(minutes=rng.randint(5, 240))
+                if manual_start.date() == current_day:
+                    reported["manualMowing"] = {
+                        "activityMode": True,
+                        "startHour": manual_start.hour,
+                        "startMinute": manual_start.minute,
+                        "duration": rng.randint(30, 120),
+                    }
+                    reference.manual = current_day
+                    transitions["manual_mowing"] += 1
+                    changed = True
+            if changed or ticks == 0:
+                publish()
+
+            evaluated = time.perf_counter()
+            state = sensor.state
+            next_operation.timings.append(time.perf_counter() - evaluated)
+            actual = dt_util.parse_datetime(state) if state != "N/A" else None
+            expected = reference.next_start(now)
+            if actual != expected:
+                next_operation.mismatch(
+                    now=now.isoformat(),
+                    expected=expected and _local(expected, tz),
+                    actual=state,
+                )
+
+            period_end = now + timedelta(days=args.calendar_days)
+            evaluated = time.perf_counter()
+            calendar_events = await calendar.async_get_events(None, now, period_end)
+            events.timings.append(time.perf_counter() - evaluated)
+            actual_events = sorted((item.start, item.end) for item in calendar_events)
+            expected_events = reference.events(now, period_end)
+            if actual_events != expected_events:
+                missing = set(expected_events) - set(actual_events)
+                extra = set(actual_events) - set(expected_events)
+                events.mismatch(
+                    now=now.isoformat(),
+                    missing=[_local(start, tz) for start, _ in sorted(missing)][:3],
+                    extra=[_local(start, tz) for start, _ in sorted(extra)][:3],
+                )
+
+            clock.current += tick
+            ticks += 1
+    finally:
+        dt_util.now = real_now
+    duration = time.perf_counter() - start
+
+    return {
+        "time_zone": args.time_zone,
+        "start": args.start.isoformat(),
+        "days": args.days,
+        "tick_minutes": args.tick,
+        "ticks": ticks,
+        "seed": args.seed,
+        "wall_seconds": round(duration, 2),
+        "transitions": transitions,
+        "next_operation": next_operation.report(),
+        "calendar": events.report(),
+    }
+
+
+def main() -> None:
+    """Parse arguments and run the simulation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--tick", type=int, default=30, help="minutes")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument("--time-zone", default="Europe/Berlin")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--edit-rate", type=float, default=0.002, help="per tick")
+    parser.add_argument("--cancel-rate", type=float, default=0.005, help="per tick")
+    parser.add_argument("--manual-rate", type=float, default=0.002, help="per tick")
+    parser.add_argument("--calendar-days", type=int, default=7)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--strict", action="store_true")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    report = asyncio.run(_async_simulate(args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+
+    mismatches = sum(
+        report[check]["mismatches"] for check in ("next_operation", "calendar")
+    )
+    sys.exit(1 if args.strict and mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Soak test the integration for leaks and latency drift.
+
+Runs the integration against scripts/mock_cloud.py through days of polls
+back to back. The fleet's shadows change on every poll. Commands are
+sent at random, and outages come and go with fail-fast and queued writes.
+After a warm-up, tracemalloc snapshots are taken at intervals together
+with the number of running tasks and coordinator listeners, and the
+refresh latency is tracked.
+
+The JSON report lists the biggest growth by allocation site. The exit
+code is 1 when memory, tasks or latency grow past the limits.
+
+    python3 scripts/soak.py --days 3 --devices 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+from pathlib import Path
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from benchmark import (
+    ROOT,
+    async_add_entry,
+    async_start_hass,
+    free_port,
+    use_local_cloud,
+)
+from mock_cloud import MockAlkoCloud
+
+# Allocation sites listed in the report
+TOP_SITES = 15
+
+
+def _churn(cloud: MockAlkoCloud, rng: random.Random) -> None:
+    """Move the reported state of a few devices, like a real fleet does."""
+    things = list(cloud.things.values())
+    for thing in rng.sample(things, k=min(3, len(things))):
+        reported = thing["thingState"]["state"]["reported"]
+        reported["rssi"] = rng.randint(-90, -40)
+        reported["batteryLevel"] = rng.randint(10, 100)
+        reported["operationState"] = rng.choice(
+            ("IDLE_BASE_STATION", "WORKING", "HOMING", "CHARGING")
+        )
+
+
+async def _async_soak(args: argparse.Namespace, port: int) -> dict[str, Any]:
+    """Run the soak test and return the report."""
+    from homeassistant.config_entries import ConfigEntryState
+    from homeassistant.helpers import entity_registry as er
+
+    from custom_components.alko.const import DOMAIN, UPDATE_INTERVAL
+
+    rng = random.Random(args.seed)
+    cloud = MockAlkoCloud(args.devices)
+    cloud_url = await cloud.start(port=port)
+    iterations = round(args.days * 86400 / UPDATE_INTERVAL)
+    warmup = min(args.warmup, iterations // 4)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.symlink(ROOT / "custom_components", Path(config_dir) / "custom_components")
+        hass = await async_start_hass(config_dir)
+        try:
+            entry = await async_add_entry(hass, cloud_url)
+            await hass.config_entries.async_add(entry)
+            await hass.async_block_till_done()
+            if entry.state is not ConfigEntryState.LOADED:
+                raise RuntimeError(f"Setup failed: {entry.state}")
+            coordinator = hass.data[DOMAIN][entry.entry_id]
+            # Time is accelerated, so probe right away once the circuit opens
+            coordinator.client.breaker.reset_timeout = 0
+
+            registry = er.async_get(hass)
+            entities = er.async_entries_for_config_entry(registry, entry.entry_id)
+            mowers = [e.entity_id for e in entities if e.domain == "lawn_mower"]
+            calendars = [e.entity_id for e in entities if e.domain == "calendar"]
+
+            samples: list[dict[str, Any]] = []
+            latencies: list[float] = []
+            outage_left = 0
+            outages = commands = 0
+            first_snapshot = None
+            start = time.perf_counter()
+
+            for iteration in range(iterations):
+                _churn(cloud, rng)
+                if outage_left == 0 and rng.random() < args.outage_rate:
+                    outage_left = rng.randint(2, 10)
+                    outages += 1
+                cloud.faults.rate_5xx = 1.0 if outage_left else 0.0
+                outage_left = max(0, outage_left - 1)
+
+                started = time.perf_counter()
+                await coordinator.async_refresh()
+                await hass.async_block_till_done()
+                latencies.append(time.perf_counter() - started)
+
+                if mowers and rng.random() < args.command_rate:
+                    commands += 1
+                    await hass.services.async_call(
+                        "lawn_mower",
+                        rng.choice(("start_mowing", "dock", "pause")),
+                        {"entity_id": rng.choice(mowers)},
+                        blocking=True,
+                    )
+                if calendars:
+                    await hass.services.async_call(
+                        "calendar",
+                        "get_events",
+                        {"entity_id": rng.choice(calendars), "duration": {"days": 7}},
+                        blocking=True,
+                        return_response=True,
+                    )
+
+                if iteration == warmup:
+                    gc.collect()
+                    tracemalloc.start(args.frames)
+                    first_snapshot = tracemalloc.take_snapshot()
+                due = (iteration - warmup) % args.sample == 0
+                if iteration >= warmup and (due or iteration == iterations - 1):
+                    gc.collect()
+                    current, _ = tracemalloc.get_traced_memory()
+                    samples.append(
+                        {
+                            "iteration": iteration,
+                            "simulated_hours": round(
+                                iteration * UPDATE_INTERVAL / 3600, 1
+                            ),
+                            "traced_kib": round(current / 1024, 1),
+                            "tasks": len(asyncio.all_tasks()),
+                            "listeners": len(coordinator._listeners),
+                            "refresh_ms": round(
+                                statistics.median(latencies[-args.sample :]) * 1000, 2
+                            ),
+                        }
+                    )
+            last_snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            duration = time.perf_counter() - start
+
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+        finally:
+            await hass.async_stop(force=True)
+            await cloud.stop()
+
+    # Leave out what this script and tracemalloc itself keep around
+    ignore = [
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ]
+    growth = last_snapshot.filter_traces(ignore).compare_to(
+        first_snapshot.filter_traces(ignore), "lineno"
+    )
+    window = max(1, len(latencies) // 10)
+    early = statistics.median(latencies[warmup : warmup + window])
+    late = statistics.median(latencies[-window:])
+    first, last = samples[0], samples[-1]
+
+    return {
+        "devices": args.devices,
+        "simulated_days": args.days,
+        "iterations": iterations,
+        "outages": outages,
+        "commands": commands,
+        "wall_seconds": round(duration, 1),
+        "memory_growth_kib": round(sum(stat.size_diff for stat in growth) / 1024, 1),
+        "task_growth": last["tasks"] - first["tasks"],
+        "listener_growth": last["listeners"] - first["listeners"],
+        "latency_drift_pct": round((late - early) / early * 100, 1),
+        "top_growth": [
+            {
+                "site": str(stat.traceback),
+                "size_kib": round(stat.size_diff / 1024, 1),
+                "count": stat.count_diff,
+            }
+            for stat in growth[:TOP_SITES]
+            if stat.size_diff > 0
+        ],
+        "samples": samples,
+    }
+
+
+def main() -> None:
+    """Parse arguments and run the soak test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=float, default=3, help="simulated days")
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=200, help="polls")
+    parser.add_argument("--sample", type=int, default=240, help="polls per sample")
+    parser.add_argument("--frames", type=int, default=1, help="traceback depth")
+    parser.add_argument("--outage-rate", type=float, default=0.005, help="per poll")
+    parser.add_argument("--command-rate", type=float, default=0.05, help="per poll")
+    parser.add_argument("--max-growth-kib", type=float, default=1024)
+    parser.add_argument("--max-task-growth", type=int, default=2)
+    parser.add_argument("--max-drift-pct", type=float, default=50)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    # Outages are expected, keep their warnings out of the report
+    logging.getLogger("custom_components.alko").setLevel(
+        logging.DEBUG if args.verbose else logging.ERROR
+    )
+
+    port = free_port()
+    use_local_cloud(port)
+    report = asyncio.run(_async_soak(args, port))
+
+    failures = [
+        f"{name} {report[name]} > {limit}"
+        for name, limit in (
+            ("memory_growth_kib", args.max_growth_kib),
+            ("task_growth", args.max_task_growth),
+            ("listener_growth", 0),
+            ("latency_drift_pct", args.max_drift_pct),
+        )
+        if report[name] > limit
+    ]
+    report["passed"] = not failures
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
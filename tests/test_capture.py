@@ -0,0 +1,98 @@
+"""Tests for the AL-KO traffic capture."""
+
+import asyncio
+import gzip
+import json
+from types import SimpleNamespace
+
+from custom_components.alko.capture import AlkoTrafficRecorder, _append
+
+ACCESS = {
+    "accessId": "access-1",
+    "thingName": "thing0",
+    "userId": "user-1",
+    "idpAccountId": "account-1",
+    "userEmail": "owner@example.com",
+    "accessAlias": "Robolinho",
+    "accessAdmin": True,
+}
+
+
+def test_get_devices_capture_is_redacted(tmp_path):
+    """Account identifiers in a get_devices body never reach the capture."""
+    hass = SimpleNamespace(config=SimpleNamespace(path=tmp_path.joinpath))
+    recorder = AlkoTrafficRecorder(hass)
+    recorder.record(
+        method="GET",
+        endpoint="/v1/iot/things",
+        status=200,
+        latency=0.1,
+        request=None,
+        response=[
+            {
+                "thingName": "thing0",
+                "thingAttributes": {"serialNumberWifi": "wifi-1"},
+                "accessInformation": dict(ACCESS),
+                "accesses": [dict(ACCESS)],
+            }
+        ],
+    )
+    path = tmp_path / "capture.ndjson.gz"
+    _append(path, recorder._buffer)
+
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        text = file.read()
+    device = json.loads(text.splitlines()[1])["response"][0]
+
+    for access in (device["accessInformation"], *device["accesses"]):
+        assert access["thingName"] == "thing0"
+        for key in ("userId", "idpAccountId", "userEmail"):
+            assert access[key] == "**REDACTED**"
+    assert device["thingAttributes"]["serialNumberWifi"] == "**REDACTED**"
+    for value in ("user-1", "account-1", "owner@example.com", "wifi-1"):
+        assert value not in text
+
+
+def test_flushes_append_in_order(tmp_path):
+    """An unload flush waits for a batch flush still writing."""
+    asyncio.run(_flush_during_flush(tmp_path))
+
+
+async def _flush_during_flush(tmp_path):
+    """Flush a second batch while the first one is still being written."""
+    calls = []
+
+    async def run_in_thread(target, *args):
+        calls.append(target)
+        if len(calls) == 1:
+            # The first batch is slow to reach the disk
+            await asyncio.sleep(0.05)
+        return await asyncio.to_thread(target, *args)
+
+    hass = SimpleNamespace(
+        config=SimpleNamespace(path=tmp_path.joinpath),
+        async_add_executor_job=run_in_thread,
+    )
+    recorder = AlkoTrafficRecorder(hass)
+
+    def record(batch):
+        for request in range(3):
+            recorder.record(
+                method="GET",
+                endpoint=f"/{batch}/{request}",
+                status=200,
+                latency=0.1,
+                request=None,
+                response=None,
+            )
+
+    record(0)
+    batch_flush = asyncio.ensure_future(recorder.async_flush())
+    await asyncio.sleep(0)
+    record(1)
+    await recorder.async_flush()
+    await batch_flush
+
+    with gzip.open(recorder.path, "rt", encoding="utf-8") as file:
+        endpoints = [json.loads(line).get("endpoint") for line in file][1:]
+    assert endpoints == [f"/{b}/{r}" for b in range(2) for r in range(3)]
@@ -0,0 +1,50 @@
+"""Tests for the AL-KO mowing session log."""
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from custom_components.alko.sessions import SESSION_PAUSE_TIMEOUT, AlkoSessionLog
+
+START = datetime(2025, 6, 1, 10, tzinfo=UTC)
+
+
+def _snapshot(minute: float, state: str):
+    """Return a stand-in for a snapshot taken minutes after START."""
+    reported = {"operationState": state, "batteryLevel": 80}
+    return SimpleNamespace(
+        last_updated=START + timedelta(minutes=minute),
+        get=reported.get,
+        flag=lambda name: False,
+        has_error=False,
+    )
+
+
+def _run(log: AlkoSessionLog, steps: list[tuple[float, str]]) -> None:
+    """Feed a sequence of (minute, operation state) to a log."""
+    for minute, state in steps:
+        log.update(_snapshot(minute, state))
+
+
+def test_short_pause_resumes_session():
+    """A pause followed by more mowing stays one session."""
+    log = AlkoSessionLog()
+    _run(
+        log,
+        [(0, "WORKING"), (20, "IDLE"), (35, "IDLE"), (40, "WORKING"), (60, "HOMING")]
+        + [(65, "CHARGING")],
+    )
+    assert [session.duration for session in log.sessions] == [65 * 60]
+    assert log.current is None
+
+
+def test_long_pause_ends_session():
+    """A mower left paused ends its session when the pause started."""
+    log = AlkoSessionLog()
+    pause = SESSION_PAUSE_TIMEOUT / 60
+    _run(
+        log,
+        [(0, "WORKING"), (30, "IDLE"), (30 + pause, "IDLE"), (31 + pause, "IDLE")]
+        + [(600, "IDLE"), (601, "WORKING"), (631, "HOMING"), (640, "CHARGING")],
+    )
+    assert [session.duration for session in log.sessions] == [30 * 60, 39 * 60]
+    assert log.current is None
@@ -0,0 +1,72 @@
+"""Tests for the estimators reading from the AL-KO telemetry buffer."""
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from custom_components.alko.analytics import AlkoBatteryEstimator
+from custom_components.alko.anomalies import (
+    ANOMALY_LOOPING_HOME,
+    ANOMALY_STUCK,
+    AlkoAnomalyDetector,
+)
+from custom_components.alko.telemetry import AlkoTelemetryBuffer
+
+START = datetime(2025, 6, 1, 10, tzinfo=UTC)
+
+
+def _snapshot(seconds: float, **reported):
+    """Return a stand-in for a snapshot taken seconds after START."""
+    return SimpleNamespace(
+        last_updated=START + timedelta(seconds=seconds),
+        get=reported.get,
+        has_error=False,
+        flag=lambda name: False,
+    )
+
+
+def test_battery_rates_from_buffer():
+    """Rates are taken between level changes found in the buffer."""
+    buffer = AlkoTelemetryBuffer()
+    battery = AlkoBatteryEstimator(buffer)
+    # Polls every 30 seconds share a slot, one percent drops every 2 minutes
+    for step in range(40):
+        buffer.append(
+            _snapshot(
+                step * 30, operationState="WORKING", batteryLevel=90 - step // 4
+            )
+        )
+        battery.update()
+    assert battery.discharge_rate == 30.0
+    assert battery.charge_rate is None
+    assert battery.mowing_time_left == 162
+
+    # The first change after charging starts only anchors the measurement
+    buffer.append(_snapshot(1230, operationState="CHARGING", batteryLevel=81))
+    battery.update()
+    buffer.append(_snapshot(1290, operationState="CHARGING", batteryLevel=82))
+    battery.update()
+    assert battery.charge_rate is None
+
+
+def test_anomalies_from_buffer():
+    """Stalled progress and long trips home are read back from the buffer."""
+    buffer = AlkoTelemetryBuffer()
+    detector = AlkoAnomalyDetector(buffer)
+    flipped = []
+    for minute in range(80):
+        state = "WORKING" if minute < 50 else "HOMING"
+        snapshot = _snapshot(
+            minute * 60,
+            operationState=state,
+            # The battery drains on the way home, which is not progress there
+            batteryLevel=80 - (minute // 10 if state == "HOMING" else 0),
+            operationTimeMowing=10 + min(minute, 10) // 5,
+        )
+        buffer.append(snapshot)
+        flipped += [(minute, *change) for change in detector.update(snapshot)]
+
+    assert flipped == [
+        (40, ANOMALY_STUCK, True),
+        (50, ANOMALY_STUCK, False),
+        (70, ANOMALY_LOOPING_HOME, True),
+    ]